@@ -1,4 +1,4 @@
-import random
+from utils.rng import stream
 from time import sleep
 from utils.screenspace import MYCOLORS as c, g, Terminal, overwrite
 
@@ -38,7 +38,7 @@ def play(active_terminal: Terminal, bet) -> int:
     """
     score = [0, 0, 0, 0]
     active_terminal.update(header + "\n" + g['coin_flip_heads'])
-    flip = random.choice(['l', 'r'])
+    flip = stream("guessing_game").choice(['l', 'r'])
     #overwrite(COLORS.RED + flip)
     choice = ""
     choice = input(c.backYELLOW + c.BLACK + f"\rYou have been attacked! Left or Right? (L/R) ")
@@ -33,7 +33,8 @@ from modules_directory.shop import handle as handle_shop
 from modules_directory.deed import handle as handle_deed
 from modules_directory.balance import handle as handle_balance
 from modules_directory.chat import handle as handle_chat
-from modules_directory.trading import handle as handle_trading
+from modules_directory.trading import handle as handle_trading, auction_house, settle_lot
+import modules_directory.trading as trading
 from modules_directory.plist import handle as handle_plist
 from modules_directory.inventory import handle as handle_inventory
 from modules_directory.casino import handle as handle_casino
@@ -41,6 +42,15 @@ from modules_directory.fishing import handle as handle_fishing
 
 # Monopoly Game
 import monopoly_directory.monopoly as mply
+from monopoly_directory import savegame, tournament, turbo
+from monopoly_directory.gamelog import recover
+from monopoly_directory.engine import BUY, BUILD, ROLL_PHASE
+from monopoly_directory.bots import Bot, DIFFICULTIES, soak
+from monopoly_directory.leaderboard import NET_WORTH
+from utils import rng
+from utils.turn_controller import TurnController, TURN_TIMEOUT
+from utils.game_actor import GameActor
+from utils.spectators import SpectatorHub
 
 # Stop the loading animation after imports are complete
 loading = False
@@ -51,10 +61,26 @@ clients = []
 server_socket = None
 port = 3131
 num_players = 0
+num_bots = 0 # Seats filled by bots instead of people, set with -bots <number>
 play_monopoly = True
 monopoly_unit_test = 6 # assume 1 player, 2 owned properties. See monopoly.py unittest for more options
 messages = []
 DEBT_OK = False
+turn_timeout = TURN_TIMEOUT # Seconds per Monopoly turn, set with -turntimeout <seconds> (0 for no limit)
+turn_controller = None # TurnController handing Monopoly turns off, see monopoly_controller
+# Every change to the game (Monopoly actions, balances, loans, trades, terminal statuses) runs on this actor's
+# thread, one at a time. Other threads read the game through game_actor.view().
+game_actor = GameActor(mply.view, "MonopolyActor")
+# Read-only spectators, on the port three above the server's. Sent what changed on the board after every change to the game.
+spectator_hub = SpectatorHub(lambda: game_actor.submit(broadcast), lambda message: add_to_output_area("Main", message))
+
+def broadcast() -> None:
+    """
+    Sends spectators what changed on the board. Runs on the game actor after every command.
+    """
+    if mply.engine is not None:
+        spectator_hub.update(mply.state_version, mply.get_changes, mply.get_gameboard)
+game_actor.listeners.append(broadcast)
 
 def add_to_output_area(output_type: str, text: str, color: str = COLORS.WHITE) -> None:
     """
@@ -87,7 +113,8 @@ def start_server() -> socket.socket:
 
     Returns: Transmitter socket aka the Banker's sender socket.  
     """
-    global clients, port, server_socket
+    global clients, port, server_socket, num_bots
+    num_bots = min(num_bots, num_players)
     # Create a socket object
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
@@ -111,15 +138,16 @@ def start_server() -> socket.socket:
     server_socket.bind((host, port))
     print_w_dots(f"Server started on {ip_address} port {port}")
     server_socket.listen()
+    spectator_hub.start(host, port + 3) # Spectators can join from the lobby on
 
-    print_w_dots(f"Waiting for {num_players} clients...")
+    print_w_dots(f"Waiting for {num_players - num_bots} clients...")
     
     handshakes = [False] * num_players
 
     game_full = False
     while not game_full:
         # Accepts connections while there are less than <num_players> players
-        if len(clients) < num_players:
+        if len(clients) < num_players - num_bots:
             client_socket, addr = server_socket.accept()
             print(f"Got a connection from {addr}." if ss.VERBOSE else "Got a connection.")
             client_handler = threading.Thread(target=handshake, args=(client_socket,handshakes))
@@ -127,12 +155,17 @@ def start_server() -> socket.socket:
         else: 
             game_full = True
         sleep(0.5) 
+    # Bots take the remaining seats as virtual clients without a socket
+    for i in range(num_bots):
+        clients.append(Client(None, None, f"Bot {i + 1}", inv.Inventory()))
+        clients[-1].bot = Bot(DIFFICULTIES["normal"])
     print_w_dots("Game is full. Starting game")
     # Send a message to each client that the game is starting, allowing them to see their terminals screen
     for i in range(len(clients)): 
         clients[i].id = i
-        net.send_message(clients[i].socket, f"Game Start!{num_players} {i}")
-        sleep(0.5)
+        if clients[i].bot is None:
+            net.send_message(clients[i].socket, f"Game Start!{num_players} {i}")
+            sleep(0.5)
 
 def start_receivers() -> None:
     """
@@ -314,16 +347,19 @@ def change_balance(id: int, delta: int) -> int:
 
     This function updates the money attribute of the player identified by their ID.
     A positive delta increases the player's balance, while a negative delta decreases it.
+    Runs on the game actor, so concurrent changes can't lose each other's updates.
 
     Args:
         id (int): The unique identifier of the player whose balance needs to be adjusted.
         delta (int): The amount to add or subtract from the player's balance.
 
     Returns:
-        None
+        int: The player's new balance.
     """
-    clients[id].PlayerObject.cash += delta
-    return clients[id].PlayerObject.cash
+    def adjust() -> int:
+        mply.engine.adjust_cash(id, delta, "module") # Through the engine so it is logged and the leaderboard is redrawn
+        return clients[id].PlayerObject.cash
+    return game_actor.call(adjust)
 
 def handle_data(data: str, client: socket.socket) -> None:
     """
@@ -348,10 +384,10 @@ def handle_data(data: str, client: socket.socket) -> None:
     add_to_output_area("Main", f"Received data from {current_client.name}: \"{data}\"")
     
     if data == 'request_board': 
-        net.send_message(client, mply.get_gameboard())
+        net.send_message(client, game_actor.call(mply.get_gameboard))
     
     elif data.startswith('mply'):
-        monopoly_game(current_client, data)
+        game_actor.call(monopoly_game, current_client, data)
 
     # elif data.startswith('ttt'):
     #     handle_ttt(data, current_client)
@@ -361,13 +397,14 @@ def handle_data(data: str, client: socket.socket) -> None:
         handle_inventory(data, client, current_client.inventory)
 
     elif "chat" not in data and "shop" in data: # Ensure the chat module is not being called
-        handle_shop(data, client, current_client.inventory, current_client.PlayerObject.cash, current_client.id, change_balance)
+        handle_shop(data, client, current_client.inventory, game_actor.view().players[current_client.id].cash, current_client.id, change_balance)
 
     elif data.startswith('deed'):
         handle_deed(data, client, mply)
 
     elif data.startswith("bal"):
-        handle_balance(data, client, mply, current_client.PlayerObject.cash, current_client.PlayerObject.properties)
+        player_view = game_actor.view().players[current_client.id]
+        handle_balance(data, client, mply, player_view.cash, player_view.properties)
 
     elif data.startswith('casino'):
         handle_casino(data, client, change_balance, add_to_output_area, current_client.id, current_client.name, DEBT_OK)
@@ -383,7 +420,7 @@ def handle_data(data: str, client: socket.socket) -> None:
         handle_chat(data, client, messages, current_client.id, current_client.name)
 
     elif data.startswith('trade'):
-        handle_trading(data, pid, client, clients, add_to_output_area)
+        game_actor.call(handle_trading, data, pid, client, clients, add_to_output_area, mply)
         
     elif data.startswith('plist'):
         handle_plist(client, clients)
@@ -402,7 +439,7 @@ def handle_data(data: str, client: socket.socket) -> None:
         Player 1 expects value of success/fail (busy or already dead).
         Player 2 doesn't know unless it is successful.
         """
-        handle_term(data, current_client, client)
+        game_actor.call(handle_term, data, current_client, client)
 def handle_attack(cmds: str, current_client: Client, client: socket.socket) -> None:
     net.send_message(client, "\nInvalid you")
     """
@@ -424,16 +461,18 @@ def handle_attack(cmds: str, current_client: Client, client: socket.socket) -> N
         opponent = int(command_data[1])
         attacker = int(command_data[4])
         try:
-            if len(clients) <= opponent or clients[opponent] == None or clients[opponent] == clients[attacker]:
+            if len(clients) <= opponent or clients[opponent] == None or clients[opponent] == clients[attacker] or clients[opponent].bot is not None:
                 net.send_message(client, "\nInvalid opponent. Please select another player.")
                 return
         except:
             net.send_message(client, "\nInvalid opponent. Please select another player.")
         if str(command_data[2].strip()) == 'lose':
-            money = change_balance(opponent, 0 - (int(command_data[3])))
-            net.send_message(clients[opponent].socket, str(money))
-            money = change_balance(attacker, int(command_data[3]))
-            net.send_message(clients[attacker].socket, str(money))
+            def penalty() -> tuple:
+                # Both sides of the penalty in one command, so nothing sees the money missing from both players
+                return change_balance(opponent, 0 - (int(command_data[3]))), change_balance(attacker, int(command_data[3]))
+            opponent_money, attacker_money = game_actor.call(penalty)
+            net.send_message(clients[opponent].socket, str(opponent_money))
+            net.send_message(clients[attacker].socket, str(attacker_money))
             add_to_output_area("",
                                f"{clients[opponent].name}'s balance was reduced by {command_data[3]} as a result of an attack %. Current Statuses: {clients[opponent].money}")
             add_to_output_area("",
@@ -567,7 +606,7 @@ def get_client_by_socket(socket: socket.socket) -> Client:
         # Think: locally testing. This has proven to be an issue while testing tic tac toe on the same machine.
         # While this should work in a real-world scenario, it's not ideal for testing and is currently being 
         # ignored. TODO fix this. Not as simple as client.socket.getpeername()[1] == socket.getpeername()[1]
-        if client.socket.getpeername()[0] == socket.getpeername()[0]:
+        if client.socket is not None and client.socket.getpeername()[0] == socket.getpeername()[0]:
             return client
 
 def set_gamerules() -> None:
@@ -592,8 +631,10 @@ def monopoly_controller(unit_test) -> None:
     Controls the flow of the Monopoly game.
 
     This function initializes the Monopoly game, waits for players to connect,
-    and then enters a loop to manage turns. It sends the game board to the 
-    current player and prompts them to roll the dice.
+    and then starts a TurnController. Whenever the turn changes, the controller
+    sends the game board to the new current player and prompts them to roll the
+    dice (or plays the bot's turn), and skips turns that time out or whose
+    player has disconnected.
 
     This function does nothing if a Monopoly game is not set to play during Banker setup.
     It will still purchase properties and change player cash, though, if specified in the unit test.
@@ -609,24 +650,45 @@ def monopoly_controller(unit_test) -> None:
         ss.set_cursor(25, 5)
         print("Error: Monopoly game not started.")
         return
+    global turn_controller
     sleep(5) # Temporary sleep to give all players time to connect to the receiver TODO remove this and implement a better way to check all are connected to rcvr
-    net.send_notif(clients[mply.turn].socket, mply.get_gameboard() + ss.set_cursor_str(0, 38) + "Welcome to Monopoly! It's your turn. Type roll to roll the dice.", "MPLY:")
-    add_to_output_area("Monopoly", "Sent gameboard to player 0.")
-    last_turn = 0
-    while True:
-        sleep(1)
-        if mply.turn != last_turn:
-            # if disconnect, move to next player
-            try:
-                ss.set_cursor(0, 20)
-                last_turn = mply.turn
-                net.send_notif(clients[mply.turn].socket, mply.get_gameboard() + ss.set_cursor_str(0, 38) + "It's your turn. Type roll to roll the dice.", "MPLY:")
-                clients[mply.turn].can_roll = True
-                # ss.set_cursor(ss.MONOPOLY_OUTPUT_COORDINATES[0]+1, ss.MONOPOLY_OUTPUT_COORDINATES[1]+1)
-                add_to_output_area("Monopoly", f"Player turn: {mply.turn}. Sent gameboard to {clients[mply.turn].name}.")
-            except:
-                add_to_output_area("Monopoly", f"Player turn: {mply.turn}. Disconnected")
-                mply.end_turn()
+    first_turn = mply.turn
+
+    def hand_off(turn: int) -> None:
+        if turn != first_turn:
+            savegame.save(mply.engine, mply.history, clients) # Autosave every turn, written off this thread
+        client = clients[turn]
+        if client.bot is not None:
+            play_bot_turn(client)
+            return
+        greeting = "Welcome to Monopoly! " if turn_controller.handoffs == 1 else ""
+        net.send_notif(client.socket, mply.get_gameboard() + ss.set_cursor_str(0, 38) + greeting + "It's your turn. Type roll to roll the dice.", "MPLY:") # Raises if the player disconnected
+        client.can_roll = True
+        add_to_output_area("Monopoly", f"Player turn: {turn}. Sent gameboard to {client.name}.")
+
+    def skip(turn: int) -> None:
+        if mply.turn == turn:
+            mply.skip_turn()
+
+    # Both run on the game actor: the controller thread itself never touches the game
+    turn_controller = TurnController(lambda turn: game_actor.call(hand_off, turn), lambda turn: game_actor.call(skip, turn),
+                                     turn_timeout, lambda message: add_to_output_area("Monopoly", message))
+    mply.turn_listeners.append(turn_controller.turn_changed)
+    turn_controller.start(mply.turn)
+
+def play_bot_turn(client: Client) -> None:
+    """
+    Plays a bot's whole turn through monopoly.play, so the board and history update just like for people.
+
+    Parameters:
+        client (Client): Virtual client with a bot.
+
+    Returns:
+        None
+    """
+    actions = client.bot.play_turn(mply.engine, client.id, mply.play)
+    add_to_output_area("Monopoly", f"{client.name} played their turn ({actions} actions).")
+
 def monopoly_game(client: Client = None, cmd: str = None) -> None:
     """
     Description:
@@ -644,48 +706,42 @@ def monopoly_game(client: Client = None, cmd: str = None) -> None:
         Most of the game logic can be handled on the player side, but banker will
         have to preface the messages with cash, properties, etc. 
     """
-    dice = (0, -1)
     if mply.players[mply.turn].name == client.name: # Check if the client who sent data is the current player 
                                                     #TODO restrict name values so identical names are disallowed
-        action = cmd.split(',')[1]
+        cmds = cmd.split(',')
+        action = cmds[1] if len(cmds) > 1 else ''
+        property_id = cmds[2] if len(cmds) > 2 else ''
         if action == None or action == '':
             ret_val = mply.request_roll()
             net.send_notif(client.socket, ret_val, "MPLY:")
         elif action == 'roll' and client.can_roll:
-            dice = mply.roll()
-            client.num_rolls += 1
-            ret_val = mply.process_roll(client.num_rolls, dice)
-            if ret_val.startswith("player_choice"):
-                ret_val.replace("player_choice", "")
-                client.can_roll = False
+            ret_val = mply.process_roll()
             net.send_notif(client.socket, ret_val, "MPLY:")
         elif action == 'trybuy': #TODO Better handling of locations would be nice. 
-            mply.buy_logic("banker", "b")
-            ret_val = mply.get_gameboard()
-            # Need to check if doubles were rolled, otherwise end the rolling phase
-            if dice[0] != dice[1]:
-                client.can_roll = False
+            ret_val = mply.act(BUY)
             net.send_notif(client.socket, ret_val, "MPLY:")
-        elif action == 'propmgmt': #TODO This is almost complete. Still somewhat buggy.
-            try: 
-                property_id = cmd.split(',')[2]
-            except:
-                property_id = ""
-            ret_val = mply.housing_logic(mply.players[0], "banker", property_id)
+        elif action == 'propmgmt': # Builds one house on the given property
+            if property_id == "":
+                ret_val = mply.get_gameboard() + ss.set_cursor_str(0, 39) + f"[Property management]\nEnter an ID of one of your properties: {[propObject.location for propObject in client.PlayerObject.properties]}"
+            else:
+                ret_val = mply.act(BUILD, property_id)
             net.send_notif(client.socket, ret_val, "MPLY:")
-        elif action == 'deed': #TODO This is not yet complete. Very buggy. 
-            try: 
-                property_id = cmd.split(',')[2]
-            except:
-                property_id = ""
-            mply.update_status(mply.players[0], "deed", [], "banker", property_id)
+        elif action == 'deed':
+            if property_id != "":
+                message = mply.update_status(client.PlayerObject, "deed", property_id)
+                if message is not None:
+                    net.send_notif(client.socket, mply.get_gameboard() + ss.set_cursor_str(0, 39) + f"[Deed Viewer]\n{message}", "MPLY:")
         elif action == 'continue':
             ret_val = mply.get_gameboard()
             net.send_notif(client.socket, ret_val, "MPLY:")
         elif action == 'endturn' and not client.can_roll:
-            mply.end_turn()
-            ret_val = "ENDOFTURN" + mply.get_gameboard()
+            messages = mply.end_turn()
+            if mply.turn == client.id and messages: # Turn did not end
+                ret_val = mply.get_gameboard() + mply.prompt(messages)
+            else:
+                ret_val = "ENDOFTURN" + mply.get_gameboard()
             net.send_notif(client.socket, ret_val, "MPLY:")
+        client.can_roll = mply.turn == client.id and mply.engine.phase == ROLL_PHASE
 
 def handle_loan(data: str, client_socket: socket.socket, change_balance: callable, add_to_output_area: callable, player_id: int, player_name: str) -> None:
 
@@ -737,7 +793,10 @@ def handle_loan(data: str, client_socket: socket.socket, change_balance: callabl
         total_repayment = int(amount * (1 + interest_rate))
         
         # Add the loan amount to the player's balance
-        new_balance = change_balance(player_id, amount)
+        def take_loan() -> int:
+            clients[player_id].loans.append(player_loan)
+            return change_balance(player_id, amount)
+        new_balance = game_actor.call(take_loan)
         
         # Log the transaction
         add_to_output_area("Loans", f"{player_name} took out a {loan_type} interest loan of ${amount}. New balance: ${new_balance}")
@@ -755,6 +814,17 @@ if __name__ == "__main__":
     os.system('cls' if os.name == 'nt' else 'clear')
     print("Welcome to Terminal Monopoly, Banker!")
 
+    if "-turbo" in sys.argv: # Bot-only games as fast as they play, checking logs and saves. e.g. -turbo --games 200 --workers 4
+        sys.exit(turbo.main(sys.argv[sys.argv.index("-turbo") + 1:]))
+    if "-tournament" in sys.argv: # Rate bot strategies against each other. e.g. -tournament --format swiss --rounds 6
+        sys.exit(tournament.main(sys.argv[sys.argv.index("-tournament") + 1:]))
+
+    if "-soak" in sys.argv: # Bot-only games, no server. e.g. -soak 100
+        result = soak(int(sys.argv[sys.argv.index("-soak") + 1]))
+        print(f"{result['games']} bot games ({result['finished']} finished), {result['turns']} turns in {result['seconds']:.1f}s, "
+              f"{result['turns_per_second']:,.0f} turns/s, slowest decision {result['slowest_decision'] * 1000:.1f}ms")
+        sys.exit()
+
     if "-skipcalib" not in sys.argv and "-local" not in sys.argv:
         ss.calibrate_screen('banker')
 
@@ -764,11 +834,44 @@ if __name__ == "__main__":
     if "-debtok" in sys.argv:
         DEBT_OK = True
 
+    if "-seed" in sys.argv: # Replay a session's dice, cards and casino games. e.g. -seed 42 (or set TM_SEED)
+        rng.seed(int(sys.argv[sys.argv.index("-seed") + 1]))
+    print(f"Random seed: {rng.master_seed}")
+
+    if "-turntimeout" in sys.argv: # Seconds per Monopoly turn before it is skipped. e.g. -turntimeout 60
+        turn_timeout = float(sys.argv[sys.argv.index("-turntimeout") + 1])
+
+    if "-bots" in sys.argv: # Fill seats with bots. e.g. -bots 2
+        num_bots = int(sys.argv[sys.argv.index("-bots") + 1])
+
+    if "-networth" in sys.argv: # Rank the leaderboard by net worth (property and houses included) instead of cash
+        mply.set_ranking(NET_WORTH)
+
     set_unittest() 
     # set_gamerules()
     start_server()
     choose_colorset("DEFAULT_COLORS")
-    game = mply.start_game(STARTING_CASH, num_players, [clients[i].name for i in range(num_players)], clients)
+    saved, history = None, []
+    if "-recover" in sys.argv: # Carry on a crashed game from its log. e.g. -recover logs/20250101-120000.tmlog
+        saved = recover(sys.argv[sys.argv.index("-recover") + 1])
+    elif "-load" in sys.argv: # Load a saved game, saves/autosave.tmsave by default. e.g. -load or -load my.tmsave
+        i = sys.argv.index("-load") + 1
+        saved, history = savegame.load(clients, sys.argv[i] if i < len(sys.argv) and not sys.argv[i].startswith("-") else savegame.AUTOSAVE)
+    game = mply.start_game(STARTING_CASH, num_players, [clients[i].name for i in range(num_players)], clients, saved, history)
+    game_actor.start()
+    # Auctions settle on the game actor. Bids, auction results and trade offers go out over the notification channel.
+    auction_house.settle = lambda lot: game_actor.call(settle_lot, lot, clients, mply)
+    def notify_player(player: int, message: str) -> None:
+        if clients[player].bot is None:
+            try:
+                net.send_notif(clients[player].socket, message)
+            except OSError:
+                add_to_output_area("Main", f"Could not notify {clients[player].name}: {message}", COLORS.RED)
+    auction_house.notify = notify_player
+    trading.notify = notify_player
+    auction_house.log = lambda message: add_to_output_area("Main", message)
+    savegame.log = lambda message: add_to_output_area("Main", message, COLORS.RED)
+    auction_house.start()
     ss.print_banker_frames()
     threading.Thread(target=monopoly_controller, args=[monopoly_unit_test], daemon=True).start()
     start_receivers()
\ No newline at end of file
@@ -1,5 +1,5 @@
 # BLACKJACK
-import random
+from utils.rng import stream
 from utils.screenspace import Terminal, g, overwrite
 game_title = "🃑 Blackjack"
 
@@ -49,7 +49,7 @@ def render_hand(active_terminal: Terminal, hand, dealer_hand):
     active_terminal.update(header + f"\n\n{dealer_hand_str}" + '\n' * 5 + f"{hand_str}")
 
 def draw(dealer, hidden,score):
-    card_type, card_value = random.choice(list(cards.items()))
+    card_type, card_value = stream("blackjack").choice(list(cards.items()))
     if(card_value == 11 and ((not dealer and score[0] + 11 > 21) or (dealer and score[1] + 11 > 21))):
         card_value = 1
         card_type = "1"
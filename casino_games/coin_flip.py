@@ -1,5 +1,5 @@
 # COIN FLIP
-import random
+from utils.rng import stream
 from time import sleep
 from utils.screenspace import Terminal, g, overwrite
 
@@ -20,7 +20,7 @@ def play(active_terminal: Terminal, bet: int):
     
     choice = input(f"\rHeads or Tails? (h/T) ")
     overwrite("\r" + " " * 40)
-    flip = random.choice(['heads', 'tails'])
+    flip = stream("coin_flip").choice(['heads', 'tails'])
     
     #TODO - Make the animation asynchrnous.
     active_terminal.update(header + "\n" + g['coin_flip_heads'])
@@ -1,5 +1,5 @@
 # BLACKJACK
-import random
+from utils.rng import stream
 from utils.screenspace import MYCOLORS as COLORS, Terminal, overwrite
 
 """
@@ -71,7 +71,7 @@ def findMult(hand, choice):
 
 #Draws a random card
 def draw():
-    card_type = random.choice(list(cards.keys()))
+    card_type = stream("higher_lower").choice(list(cards.keys()))
     return card_type
 #This is one turn of higher lower
 def turn(active_terminal, turn, bankroll, previous = "0"):
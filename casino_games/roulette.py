@@ -1,5 +1,5 @@
 import asyncio
-import random
+from utils.rng import stream
 import sys
 from utils.screenspace import Terminal, overwrite, get_valid_int, set_cursor_str, MYCOLORS as COLORS
 from time import sleep
@@ -17,8 +17,8 @@ blacks = [item for item in wheel if item[1] == "black"]
 greens = [item for item in wheel if item[1] == "green"]
 
 # Shuffle reds and blacks separately
-random.shuffle(reds)
-random.shuffle(blacks)
+stream("roulette").shuffle(reds)
+stream("roulette").shuffle(blacks)
 
 # Interleave reds and blacks
 alternating_wheel = []
@@ -84,9 +84,9 @@ def play(active_terminal: Terminal, bet: int) -> int:
     max_delay = 0.5  # Slowest speed before stopping
     slow_factor = 1.20  # Slowdown rate
 
-    index = random.randint(0, len(wheel_numbers) - 1)  # Start position
+    index = stream("roulette").randint(0, len(wheel_numbers) - 1)  # Start position
     clear_line = active_terminal.translate_coords(set_cursor_str(1, 10) + " " * 70)
-    for _ in range(random.randint(15, 25)):  # Control animation duration
+    for _ in range(stream("roulette").randint(15, 25)):  # Control animation duration
         index = (index + 1) % len(wheel_numbers)  # Move forward
 
         # Display 12 numbers including the current one with the ball symbol
@@ -185,7 +185,7 @@ async def spin_wheel(bet, choice, bet_value):
     max_delay = 0.5  # Slowest speed before stopping
     slow_factor = 1.20  # Slowdown rate
 
-    index = random.randint(0, len(wheel_numbers) - 1)  # Start position
+    index = stream("roulette").randint(0, len(wheel_numbers) - 1)  # Start position
     for _ in range(30):  # Control animation duration
         index = (index + 1) % len(wheel_numbers)  # Move forward
 
@@ -1,5 +1,5 @@
 # SLOTS MACHINE
-import random
+from utils.rng import stream
 from time import sleep
 from utils.screenspace import g, set_cursor, overwrite, set_cursor_str, Terminal
 
@@ -32,11 +32,11 @@ down = g.get("slots_frame_down")
 
 # 2. Generate three random sets of the symbols
 wheel0 = symbols.copy()
-random.shuffle(wheel0)
+stream("slots").shuffle(wheel0)
 wheel1 = symbols.copy()
-random.shuffle(wheel1)
+stream("slots").shuffle(wheel1)
 wheel2 = symbols.copy()
-random.shuffle(wheel2)
+stream("slots").shuffle(wheel2)
 
 machine = [
     [wheel0[0], wheel1[0], wheel2[0]],
@@ -56,7 +56,7 @@ def play(active_terminal: Terminal, bet: int) -> int:
     set_cursor(0, 0)
 
     # 3. Display the slots
-    rng = random.randint(0, 3) # Randomly select a column to rotate
+    rng = stream("slots").randint(0, 3) # Randomly select a column to rotate
     for t in range(31): # Must be odd
         set_cursor(0, 0)
         sleep_time = exponential_increase(t)
@@ -1,4 +1,4 @@
-import random
+from utils.rng import stream
 from utils.screenspace import Terminal, g, overwrite
 from time import sleep
 
@@ -57,10 +57,10 @@ def draw_cards(wins, losses, total_rounds, active_terminal: Terminal):
     input("Draw a card (press any key)")
     overwrite("\r" + " " * 40)
 
-    card = cards[random.randint(0, 51)]
+    card = cards[stream("war").randint(0, 51)]
     render(banker_card, card, wins, losses, total_rounds, active_terminal)
     sleep(1)
-    banker_card = cards[random.randint(0, 51)]
+    banker_card = cards[stream("war").randint(0, 51)]
     render(banker_card, card, wins, losses, total_rounds, active_terminal)
     sleep(1)
 
@@ -88,6 +88,7 @@ def oof() -> str:
 def handle(data, client_socket, mply, money, properties):
     """
     Handles the balance command for the banker.
+    properties are the locations the player owns.
     """
     ret_val = ""
     if "bal" in data:
@@ -105,15 +106,15 @@ def handle(data, client_socket, mply, money, properties):
         """
         assets = ""
         i = 0
-        for prop in properties:
-            deed = mply.get_deed(prop.location)
+        for location in properties: # Locations, from the game's view
+            deed = mply.get_deed(location)
             name = deed.name.split()[0][:3] + " " + deed.name.split()[1][:3] # Get first 3 letters of each word
             if i % 2 == 0:
                 assets += f"{name} - ${deed.getPrice() + deed.housePrice * deed.houses}".ljust(15)
             else:
                 assets += f" | {name} - ${deed.getPrice() + deed.housePrice * deed.houses}\n"
             i += 1
-        if properties == []:
+        if not properties:
             assets += "You have no properties.\n"
 
         # for stock in current_client.stocks:
@@ -128,8 +129,8 @@ def handle(data, client_socket, mply, money, properties):
         Calculate net worth of client based on money, properties, and stocks.
         """
         net_worth = money
-        for prop in properties:
-            deed = mply.get_deed(prop.location)
+        for location in properties:
+            deed = mply.get_deed(location)
             deed_value = deed.getPrice() if deed.mortgaged == False else deed.mortgage
             deed_value += deed.housePrice * deed.houses 
             net_worth += deed_value
@@ -1,5 +1,5 @@
 import time
-import random
+from utils.rng import stream
 import modules_directory.inventory as inventory
 from utils.screenspace import g, set_cursor_str, Terminal
 from socket import socket
@@ -27,7 +27,7 @@ class fishing_game():
     #this is not actually used
     def start(self) -> str:
         start = int(time.time())
-        delay = random.randint(3,10)
+        delay = stream("fishing").randint(3,10)
         self.__catchtime = start + delay
         return self.__pictures[0]
 
@@ -36,8 +36,8 @@ class fishing_game():
 
     def results(self, player_inventory: inventory) -> str:
         retval = set_cursor_str(0,0) + self.__pictures[1]
-        if random.choice([True, False]):
-            fish = random.choice(['Carp', 'Bass', 'Salmon'])
+        if stream("fishing").choice([True, False]):
+            fish = stream("fishing").choice(['Carp', 'Bass', 'Salmon'])
             player_inventory.add_item(fish, 1) # added fish to inventory
             
             retval += set_cursor_str(24 - (1 if fish == 'Salmon' else 0), 3) + 'Nice job, you caught a ' + fish + '!'
@@ -1,4 +1,4 @@
-import random as rand
+from utils.rng import stream
 import keyboard
 import time
 import sys
@@ -76,7 +76,7 @@ def maze_generator() -> list[list[MazeNode]]:
         def visit_node(visited_node : MazeNode) -> None:
             visited_node.visited = True
             #print("Visited node at (", visited_node.row,", ", visited_node.col, ")")
-            rand.shuffle(visited_node.neighbors)
+            stream("maze").shuffle(visited_node.neighbors)
             for i in range(0, len(visited_node.neighbors)):
                 mazeNode : MazeNode = visited_node.neighbors[i]
                 if(mazeNode.visited):
@@ -169,7 +169,7 @@ def char_array_to_str(maze_str: list[list[str]]) -> str:
 
 def randomize_theme():
     global corner, verticalBar, horizontalBar, color    
-    theme = rand.choices(
+    theme = stream("maze").choices(
         ["CLASSIC", "BLOCK", "FADED", "SINGLE", "DOUBLE"],
         weights=[0.4, 0.1, 0.1, 0.2, 0.2],
         k=1
@@ -1,4 +1,4 @@
-import random
+from utils.rng import stream
 import time
 from datetime import datetime, timedelta
 import os
@@ -6,9 +6,6 @@ import threading
 import keyboard
 import heapq
 
-# Seed the random number generator with the current time
-random.seed(time.time())
-
 # portfolio class will be owned by players
 class portfolio:
     def __init__(self, player_name, stock_market):
@@ -105,7 +102,7 @@ class stock:
             self.historical_prices.pop(0)
 
     def fluctuate_stock_price(self, current_stock_price):
-        rand_num = random.uniform(self.min_percent_change, self.max_percent_change)
+        rand_num = stream("stocks").uniform(self.min_percent_change, self.max_percent_change)
         self.percentage_change = rand_num
         new_price = current_stock_price + current_stock_price * (rand_num / 100)
         if new_price <= self.stock_initial_price:
@@ -239,7 +236,7 @@ def display_stock_prices(market, players_portfolio):
 
 def build_graph(players_portfolio, market):
     width, height = 35, 10  # adjusted for terminal size
-    data = [random.randint(0, 100) for _ in range(50)]
+    data = [stream("stocks").randint(0, 100) for _ in range(50)]
     # creates array data with random values
     while True:  # infinite loop that:
         # clear_console()  # clears
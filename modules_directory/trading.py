@@ -4,7 +4,9 @@ import utils.networking as net
 from socket import socket
 from utils.screenspace import g, set_cursor_str, MYCOLORS as COLORS, Terminal
 from utils.utils import Client
-from random import randint
+from utils.rng import stream
+from utils.auction_house import AuctionHouse
+from monopoly_directory.properties import NAMES
 
 name = "Trading Module"
 author = "https://github.com/adamgulde"
@@ -14,23 +16,26 @@ help_text = "Type TRADE to trade assets with other players."
 persistent = False
 oof_params = {"player_id": None, "server": None} # Global parameters for out of focus function
 
-# The auctions are a list of dictionaries, where each dictionary is an auction.
-# Each auction has a name, an object (the item being auctioned), a price, and a bidder, and a time remaining.
-class Temp:
-    def __init__(self, l, n):
-        self.location = l
-        self.name = n
+# Open auctions, run on the Banker. banker.py starts it with settle_lot and the notification channel.
+auction_house = AuctionHouse()
+notify = lambda player, message: None # Set by banker.py: sends a player a message over the notification channel
+next_trade = 1 # Number of the next trade offer
 
-o1 = Temp(3, "Player")
-o2 = Temp(4, "four")
-o3 = Temp(5, "five")
-o4 = Temp(39, "yeah")
-
-
-auctions = [{"name": o1.name, "obj": o1, "price": 0, "bidder": "", "remaining": 0}, 
-            {"name": o2.name, "obj": o2, "price": 0, "bidder": "", "remaining": 0},
-            {"name": o3.name, "obj": o3, "price": 0, "bidder": "", "remaining": 0},
-            {"name": o4.name, "obj": o4, "price": 0, "bidder": "", "remaining": 0},] 
+class Trade:
+    """
+    A pending trade offer, kept in the offerer's Client.trades and the counterparty's Client.requests.
+    give and get are locations, give_items and get_items {item name: quantity}, seen from the offerer.
+    cash is paid by the offerer to the counterparty (negative: the counterparty pays).
+    """
+    def __init__(self, number: int, offerer: int, counterparty: int, cash: int, give: list, get: list, give_items: dict, get_items: dict) -> None:
+        self.number = number
+        self.offerer = offerer
+        self.counterparty = counterparty
+        self.cash = cash
+        self.give = give
+        self.get = get
+        self.give_items = give_items
+        self.get_items = get_items
 
 def run(player_id:int, server: socket, active_terminal: Terminal):
     """
@@ -63,6 +68,7 @@ def run(player_id:int, server: socket, active_terminal: Terminal):
     active_terminal.update(ret_val, False) # Update the terminal with the information, without overwriting the entire image.
 
     # Navigate the trading menu.
+    img_name = None
     while True:
         choice = navigate([(2, 11), (2, 12), (2, 13), (2, 16), (2, 17), (2, 18), (48, 11), (48, 12), (58, 11), (58, 12)], active_terminal, ret_val) # Get the coordinates of the options in the menu.
 
@@ -78,8 +84,8 @@ def run(player_id:int, server: socket, active_terminal: Terminal):
             break
         else:
             ret_val += set_cursor_str(22, 10) + " " * 22 + set_cursor_str(22, 11) + " " * 22
-            if server_choice.startswith("trading_screen") and server_choice.startswith("trading_auctions"):
-                ret_val = img + client_parse_menu(server_choice)
+            if server_choice.startswith("__msg:"): # Just a message, stay on the menu
+                ret_val += client_parse_menu(server_choice)
             else: 
                 img_name = server_choice.split(",")[0] # Get the image name from the server choice.
                 trade_auction_data = server_choice.split(",", 1)[1:] # Get the trade or auction data from the server choice.
@@ -89,6 +95,11 @@ def run(player_id:int, server: socket, active_terminal: Terminal):
             # data = net.receive_message(server) 
             # active_terminal.update(data, False) # Update the terminal with the specific data from the server.
     
+    if img_name == "trading_auctions":
+        client_auction(player_id, server, active_terminal, trade_auction_data[0])
+    elif img_name == "trading_screen":
+        client_trade(player_id, server, active_terminal, trade_auction_data[0])
+
     # trade_auction_data
     # Navigate the new trade menu
     # while True:
@@ -221,13 +232,52 @@ def client_parse_menu(info: str) -> str:
 
     return ret_val
 
-def client_trade():
+def client_auction(player_id: int, server: socket, active_terminal: Terminal, info: str) -> None:
+    """
+    The auction screen. The player types bid <amount> on the lot shown, sell <property number or item name> <reserve>
+    to open their own auction, or q to leave. Bids from others arrive as notifications while the lot is open.
+    """
+    img = g.get("trading_auctions")
+    lot = info.split("__lot:")[1].split("__;")[0] if "__lot:" in info else ""
+    while True:
+        active_terminal.update(img + client_parse_menu(info), True)
+        command = input(COLORS.RESET + "\r").strip().split(" ")
+        if active_terminal.status != "ACTIVE" or command[0] in ("", "q"):
+            break
+        if command[0] == "bid" and len(command) == 2 and lot != "":
+            net.send_message(server, f"{player_id}trade,auction,bid,{lot},{command[1]}")
+        elif command[0] == "sell" and len(command) >= 3:
+            net.send_message(server, f"{player_id}trade,auction,sell,{' '.join(command[1:-1])},{command[-1]}")
+        else:
+            info = "__msg:Type bid <amount>, sell <property number or item> <reserve>, or q to leave.__;"
+            continue
+        info = net.receive_message(server)
+        if "__lot:" in info:
+            lot = info.split("__lot:")[1].split("__;")[0]
+
+def client_trade(player_id: int, server: socket, active_terminal: Terminal, info: str) -> None:
     """
     The player trade function. This will be called when the player wants to trade with another player.
-    The player will be able to choose the player they want to trade.
+    The player types offer <player> <what they give> for <what they want>, where each side is a list like
+    $100;39;Carp:2 (cash, property numbers, items), or accept, decline or cancel for the trade shown, or q to leave.
     They only can initiate one trade per player. They will need to close the trade before they can initiate another one with the same player.
     """
-    pass # TODO: Implement the client trade function.
+    img = g.get("trading_screen")
+    trade = info.split("__trade:")[1].split("__;")[0] if "__trade:" in info else ""
+    while True:
+        active_terminal.update(img + client_parse_menu(info), True)
+        command = input(COLORS.RESET + "\r").strip()
+        if active_terminal.status != "ACTIVE" or command in ("", "q"):
+            break
+        if command.startswith("offer "):
+            net.send_message(server, f"{player_id}trade,deal,offer,{command[6:]}")
+        elif command in ("accept", "decline", "cancel") and trade != "":
+            net.send_message(server, f"{player_id}trade,deal,{command},{trade}")
+        else:
+            info = "__msg:Type offer <player> <you give> for <you get>, e.g. offer Bob $100;39 for 37;Carp:2\nOr accept, decline or cancel the trade shown, or q to leave.__;"
+            continue
+        info = net.receive_message(server)
+        trade = info.split("__trade:")[1].split("__;")[0] if "__trade:" in info else ""
 
 def oof() -> str:
     """
@@ -242,7 +292,7 @@ def oof() -> str:
 
     return ret_val
 
-def handle(data, player_id: int, client_socket: socket, clients: list[Client], add_to_output_area: callable):
+def handle(data, player_id: int, client_socket: socket, clients: list[Client], add_to_output_area: callable, mply = None):
     """
     Handles the trade command for the banker.
     """
@@ -254,7 +304,19 @@ def handle(data, player_id: int, client_socket: socket, clients: list[Client], a
     # Anything that the player directly prints will be of form "__msg:message__;".
     # The player will need to parse the message, and display it in the correct location.
 
-    if "open" in data:
+    if data.startswith("trade,deal"):
+        """
+        Trade commands from the trade screen, of form "trade,deal,offer,text" or "trade,deal,accept|decline|cancel,number".
+        """
+        ret_val += handle_deal(data.split(",", 3), client_obj, clients, mply)
+
+    elif data.startswith("trade,auction"):
+        """
+        Auction commands from the auction screen, of form "trade,auction,bid,lot,amount" or "trade,auction,sell,asset,reserve".
+        """
+        ret_val += handle_auction(data.split(","), client_obj, clients)
+
+    elif "open" in data:
         """
         Opens the trading network, and displays the welcome message.
         This will also send to the client the list of players in the network, which needs to be parsed.
@@ -271,28 +333,23 @@ def handle(data, player_id: int, client_socket: socket, clients: list[Client], a
                 "Trade now, or be a loser!", "Trade now, or be a loser forever!", "Trading is what we do best!", 
                 "Trading on TMTN has never been easier. It changed my life!", "You should trade Boardwalk, it's the best property!",
                 "Don't sleep on Mediterranean Avenue, it's an interesting property!", "The Utilities are great for trading!"]
-        ret_val += f"__ads:{ads[randint(0, len(ads)-1)]}__;" # Random ad from the list.
+        ret_val += f"__ads:{ads[stream('trading').randint(0, len(ads)-1)]}__;" # Random ad from the list.
 
         ret_val += "__pending:" # List all your pending trades in the network.
         for trade in client_obj.trades:
-            if trade["name"] != "":
-                ret_val += f"{trade['name']},"
+            ret_val += f"{clients[trade.counterparty].name},"
         ret_val += "__;"
 
         ret_val += "__requests:" # List all requested trades of you in the network.
-        for each_player in clients:
-            if each_player.id != client_obj.id:
-                for trade in each_player.trades:
-                    if trade["name"] == client_obj.name:
-                        ret_val += f"{each_player.name},"
+        for trade in client_obj.requests:
+            ret_val += f"{clients[trade.offerer].name},"
         ret_val += "__;"
 
         ret_val += "__auctions:" # List all open auctions in the network.
-        for auction in auctions:
-            if auction["name"] != "":
-                ret_val += f"Lot {auction.get('obj').location}," # Get the location index of the property. 
+        for lot in auction_house.open_lots():
+            ret_val += f"Lot {lot.number},"
         ret_val += "__;"
-        if randint(0, 14400) == 3100: ret_val += "``__f"
+        if stream("trading").randint(0, 14400) == 3100: ret_val += "``__f"
     
     elif "eval" in data:
         """
@@ -301,51 +358,38 @@ def handle(data, player_id: int, client_socket: socket, clients: list[Client], a
         Index 0 - 2 means open a pending trade according to trades dictionary.
             This requires checking if the trade is already open. If not, ask the player to open a trade with another player.
         Index 3 - 5 means open a requested trade with player 0 - 3 excluding you.
-        Index 6 - 8 means check the open auctions, excluding your own. (Each player can only have one auction open at a time.)
+        Index 6 - 9 means open the auction in that slot, or the auction screen to start your own from an empty slot. (Each player can only have one auction open at a time.)
         """
         choice = int(data.split(",")[2])
         if choice == -1: # Player quit
             ret_val += "-1"
 
         elif 0 <= choice <= 2: # Open a pending trade with another player.
-            if client_obj.trades[choice]["name"] == "":
-                ret_val += "__msg:You have no pending trade.\n" # No pending trades.
-                ret_val += "Press enter again if you like to open a trade with another player." # Ask the player if they want to open a trade.
+            if choice < len(client_obj.trades):
+                ret_val += "trading_screen," + trade_str(client_obj.trades[choice], clients, "Type cancel to withdraw it, or q to leave.")
+            else:
+                ret_val += "trading_screen,__msg:You have no pending trade here.\n" # No pending trades.
+                ret_val += "Type offer <player> <you give> for <you get> to open one, e.g. offer Bob $100;39 for 37;Carp:2" # Ask the player if they want to open a trade.
                 ret_val += "__;"
-            elif client_obj.trades[choice]["name"] != "":
-                pass
-
-        elif 3 <= choice <= 5:
-                for each_player in clients:
-                    if each_player.id != client_obj.id:
-                        for trade in each_player.trades:
-                            if trade["name"] == client_obj.name:
-                                ret_val += f"__msg:Trade request found with {each_player.name}.__;"
-                            break
+
+        elif 3 <= choice <= 5: # Open a trade another player requested of you.
+            if choice - 3 < len(client_obj.requests):
+                ret_val += "trading_screen," + trade_str(client_obj.requests[choice - 3], clients, "Type accept or decline, or q to leave.")
+            else:
                 ret_val += "invalid" # Invalid choice.
-            
-        elif 6 <= choice <= 9: # Open an auction.
-                if choice - 6 == player_id:
-                    if auctions[player_id]["name"] == client_obj.name:
-                        ret_val += "__msg:You already have an open auction.\n"
-                        ret_val += "Time remaining: " + str(auctions[choice - 6]["remaining"]) + " seconds.\n"
-                        ret_val += "__;"
-                    elif auctions[player_id]["name"] != client_obj.name:
-                        ret_val += "__msg:You have no open auction.\n"
-                        ret_val += "Press enter again if you like to open an auction."
-                        ret_val += "__;"
+
+        elif 6 <= choice <= 9: # Open an auction, or the auction screen to start one from an empty slot.
+            lots = auction_house.open_lots()
+            if choice - 6 < len(lots):
+                lot = auction_house.watch(lots[choice - 6].number, player_id)
+                ret_val += "trading_auctions," + (lot_str(lot, clients) if lot is not None else "__msg:That auction has just closed.__;")
+            else:
+                lot = auction_house.lot_of(player_id)
+                ret_val += "trading_auctions,"
+                if lot is not None:
+                    ret_val += lot_str(lot, clients)
                 else:
-                    if auctions[choice - 6]["name"] == "":
-                        ret_val += "invalid" # Invalid choice because the auction (another player's auction) is not open.
-                    else:
-                        ret_val += "trading_auctions," # Valid choice, return the name of the auction screen. 
-
-                        # Add auction details to the ret_val for client to parse.
-                        ret_val += "__msg:Auction found with " + auctions[choice - 6]["name"] + ".\n"
-                        ret_val += "Time remaining: " + str(auctions[choice - 6]["remaining"]) + " seconds.\n"
-                        ret_val += "__;"
-                    
-            
+                    ret_val += "__msg:You have no open auction.\nType sell <property number or item> <reserve> to open one.__;"
 
     elif "next" in data:
         """
@@ -357,4 +401,271 @@ def handle(data, player_id: int, client_socket: socket, clients: list[Client], a
             pass
         
             
-    net.send_message(client_socket, ret_val)
\ No newline at end of file
+    net.send_message(client_socket, ret_val)
+
+def lot_str(lot, clients: list[Client]) -> str:
+    """
+    The auction screen's details of a lot, for the client to parse.
+    """
+    ret_val = f"__msg:Lot {lot.number}: {lot.name}\nSeller: {clients[lot.seller].name}\n"
+    if lot.bidder == -1:
+        ret_val += f"Reserve: ${lot.price}, no bids yet.\n"
+    else:
+        ret_val += f"Highest bid: ${lot.price} by {clients[lot.bidder].name}\n"
+    ret_val += f"Time remaining: {lot.remaining()} seconds.\n"
+    ret_val += "Type bid <amount>, or q to leave.__;"
+    return ret_val + f"__lot:{lot.number}__;"
+
+def find_asset(client_obj: Client, text: str) -> tuple:
+    """
+    Finds something a player can put up for auction: a property by board number, or an inventory item by name.
+
+    Returns:
+        tuple: (asset, name) for AuctionHouse.open, or (None, why not).
+    """
+    if text.isdigit():
+        prop = next((prop for prop in client_obj.PlayerObject.properties if prop.location == int(text)), None)
+        if prop is None:
+            return None, "You don't own that property."
+        if prop.board.ownership.group_improved(prop.location):
+            return None, "Sell the houses in that color group first."
+        return ("property", prop.location), prop.name
+    if client_obj.inventory is not None:
+        for category, items in client_obj.inventory.getinventory().items():
+            for item, quantity in items.items():
+                if item.lower() == text.lower():
+                    if quantity < 1:
+                        return None, f"You don't have any {item}."
+                    return ("item", category, item, 1), item
+    return None, "No such property or item."
+
+def handle_auction(command: list, client_obj: Client, clients: list[Client]) -> str:
+    """
+    Bids and new auctions. Runs on the game actor, so cash and ownership can't change while they are checked.
+
+    Returns:
+        str: The reply for the client to parse.
+    """
+    try:
+        action, target, amount = command[2], command[3], int(command[4])
+    except (IndexError, ValueError):
+        return "__msg:Amounts must be whole numbers.__;"
+    if action == "bid":
+        if not target.isdigit():
+            return "__msg:No such auction.__;"
+        error = auction_house.bid(int(target), client_obj.id, amount, client_obj.PlayerObject.cash)
+        lot = auction_house.watch(int(target), client_obj.id)
+        if error is not None or lot is None:
+            return f"__msg:{error or 'That auction has just closed.'}__;" + (f"__lot:{lot.number}__;" if lot is not None else "")
+        return lot_str(lot, clients)
+    elif action == "sell":
+        asset, name = find_asset(client_obj, target)
+        error = name if asset is None else auction_house.open(client_obj.id, asset, name, amount)
+        if error is not None:
+            return f"__msg:{error}__;"
+        return lot_str(auction_house.lot_of(client_obj.id), clients)
+    return "__msg:Unknown auction command.__;"
+
+def settle_lot(lot, clients: list[Client], mply) -> str:
+    """
+    Completes a closed auction: the winner pays the seller through the engine's cash ledger and the asset changes hands,
+    all or nothing. Call it on the game actor.
+
+    Returns:
+        str: Why the sale fell through, or None.
+    """
+    engine = mply.engine
+    seller, buyer = clients[lot.seller], clients[lot.bidder]
+    if buyer.PlayerObject.order == -1 or buyer.PlayerObject.cash < lot.price:
+        return f"{buyer.name} can no longer pay ${lot.price}."
+    if lot.asset[0] == "property":
+        location = lot.asset[1]
+        if engine.board.locations[location].owner != seller.PlayerObject.order:
+            return f"{seller.name} no longer owns {lot.name}."
+        if engine.board.ownership.group_improved(location):
+            return f"{lot.name}'s color group has houses on it."
+    else:
+        category, item, quantity = lot.asset[1:]
+        if seller.inventory is None or seller.inventory.getinventory()[category].get(item, 0) < quantity:
+            return f"{seller.name} no longer has {item}."
+    # Everything is checked, so none of the steps below can fail half way
+    events = engine.adjust_cash(buyer.id, -lot.price, f"auction: {lot.name}")
+    events += engine.adjust_cash(seller.id, lot.price, f"auction: {lot.name}")
+    if lot.asset[0] == "property":
+        engine.transfer(seller.PlayerObject, buyer.PlayerObject, lot.asset[1], events)
+    else:
+        seller.inventory.remove_item(item, quantity)
+        buyer.inventory.add_item(item, quantity)
+    mply.show_events(events)
+    return None
+
+def side_str(cash: int, locations: list, items: dict) -> str:
+    """
+    One side of a trade, e.g. "$100, Boardwalk, 2 Carp".
+    """
+    parts = ([f"${cash}"] if cash > 0 else []) + [NAMES[location] for location in locations] + [f"{quantity} {item}" for item, quantity in items.items()]
+    return ", ".join(parts) if parts else "nothing"
+
+def trade_str(trade: Trade, clients: list[Client], prompt: str) -> str:
+    """
+    The trade screen's details of a trade, for the client to parse.
+    """
+    offerer, counterparty = clients[trade.offerer].name, clients[trade.counterparty].name
+    ret_val = f"__msg:Trade {trade.number}: {offerer} and {counterparty}\n"
+    ret_val += f"{offerer} gives: {side_str(trade.cash, trade.give, trade.give_items)}\n"
+    ret_val += f"{counterparty} gives: {side_str(-trade.cash, trade.get, trade.get_items)}\n"
+    return ret_val + prompt + f"__;__trade:{trade.number}__;"
+
+def parse_side(text: str, client_obj: Client) -> tuple:
+    """
+    Parses one side of an offer, a ;-separated list of $cash, property numbers and item[:quantity].
+    Item names are looked up in the inventory of client_obj, the player handing them over.
+
+    Returns:
+        tuple: (cash, locations, {item: quantity}). Raises ValueError with a message for the player.
+    """
+    cash, locations, items = 0, [], {}
+    known = {item.lower(): item for quantities in client_obj.inventory.getinventory().values() for item in quantities} if client_obj.inventory is not None else {}
+    for part in text.split(";"):
+        part = part.strip()
+        if part in ("", "nothing"):
+            continue
+        if part.startswith("$") and part[1:].isdigit():
+            cash += int(part[1:])
+        elif part.isdigit() and 0 <= int(part) < 40:
+            locations.append(int(part))
+        else:
+            name, _, quantity = part.rpartition(":") if ":" in part else (part, "", "1")
+            if name.lower() not in known or not quantity.isdigit() or int(quantity) < 1:
+                raise ValueError(f"Don't know what {part} is.")
+            items[known[name.lower()]] = items.get(known[name.lower()], 0) + int(quantity)
+    return cash, locations, items
+
+def has_items(client_obj: Client, items: dict) -> str:
+    """
+    Returns:
+        str: Why the player can't hand the items over, or None.
+    """
+    owned = {item: quantity for quantities in client_obj.inventory.getinventory().values() for item, quantity in quantities.items()} if client_obj.inventory is not None else {}
+    for item, quantity in items.items():
+        if owned.get(item, 0) < quantity:
+            return f"{client_obj.name} doesn't have {quantity} {item}."
+    return None
+
+def handle_deal(command: list, client_obj: Client, clients: list[Client], mply) -> str:
+    """
+    Offers, and answers to them. Runs on the game actor, so nothing changes while a trade is checked and settled.
+
+    Returns:
+        str: The reply for the client to parse.
+    """
+    if len(command) < 4:
+        return "__msg:Unknown trade command.__;"
+    action, argument = command[2], command[3]
+    if action == "offer":
+        error = propose_trade(client_obj, argument, clients, mply)
+        if isinstance(error, str):
+            return f"__msg:{error}__;"
+        return trade_str(error, clients, "Offer sent. Type cancel to withdraw it, or q to leave.")
+    if not argument.isdigit():
+        return "__msg:No such trade.__;"
+    number = int(argument)
+    if action == "cancel":
+        trade = next((trade for trade in client_obj.trades if trade.number == number), None)
+        if trade is None:
+            return "__msg:That trade is no longer pending.__;"
+        close_trade(trade, clients)
+        notify(trade.counterparty, f"{client_obj.name} withdrew their trade offer.")
+        return "__msg:Trade withdrawn.__;"
+    trade = next((trade for trade in client_obj.requests if trade.number == number), None)
+    if trade is None:
+        return "__msg:That trade is no longer pending.__;"
+    if action == "decline":
+        close_trade(trade, clients)
+        notify(trade.offerer, f"{client_obj.name} declined your trade offer.")
+        return "__msg:Trade declined.__;"
+    if action == "accept":
+        error = settle_trade(trade, clients, mply)
+        if error is not None:
+            return f"__msg:The trade can't go through: {error}__;__trade:{trade.number}__;"
+        notify(trade.offerer, f"{client_obj.name} accepted your trade offer!")
+        return "__msg:Trade complete!__;"
+    return "__msg:Unknown trade command.__;"
+
+def propose_trade(client_obj: Client, text: str, clients: list[Client], mply):
+    """
+    Makes an offer from text of form "<player> <you give> for <you get>". Bots answer straight away.
+
+    Returns:
+        Trade: The pending offer, or str: why it was refused (or what the bot answered).
+    """
+    global next_trade
+    counterparty = next((c for c in sorted(clients, key=lambda c: -len(c.name)) if text.startswith(c.name + " ")), None)
+    if counterparty is None or counterparty is client_obj:
+        return "Start with the name of the player to trade with."
+    give_text, _, get_text = text[len(counterparty.name) + 1:].partition(" for ")
+    try:
+        give_cash, give, give_items = parse_side(give_text, client_obj)
+        get_cash, get, get_items = parse_side(get_text, counterparty)
+    except ValueError as e:
+        return str(e)
+    if any(trade.counterparty == counterparty.id for trade in client_obj.trades):
+        return f"You already have a trade open with {counterparty.name}."
+    if not (give_cash or give or give_items or get_cash or get or get_items):
+        return "The trade is empty."
+    if counterparty.bot is not None and (give_items or get_items): # Bots value cash and property only
+        return f"{counterparty.name} only trades cash and properties."
+    trade = Trade(next_trade, client_obj.id, counterparty.id, give_cash - get_cash, give, get, give_items, get_items)
+    error = check_trade(trade, clients, mply)
+    if error is not None:
+        return error
+    next_trade += 1
+    if counterparty.bot is not None: # Bots weigh the properties and cash, and answer now
+        if counterparty.bot.accepts_trade(mply.engine, counterparty.id, client_obj.id, trade.get, trade.give, trade.cash):
+            return settle_trade(trade, clients, mply) or f"{counterparty.name} accepted!"
+        return f"{counterparty.name} declined."
+    client_obj.trades.append(trade)
+    counterparty.requests.append(trade)
+    notify(counterparty.id, f"{client_obj.name} sent you a trade offer. Open TRADE to see it.")
+    return trade
+
+def check_trade(trade: Trade, clients: list[Client], mply) -> str:
+    """
+    Returns:
+        str: Why the trade can't happen as it stands, or None.
+    """
+    a, b = clients[trade.offerer], clients[trade.counterparty]
+    return (mply.engine.can_exchange(a.PlayerObject, b.PlayerObject, trade.give, trade.get, trade.cash)
+            or has_items(a, trade.give_items) or has_items(b, trade.get_items))
+
+def close_trade(trade: Trade, clients: list[Client]) -> None:
+    """
+    Removes a trade from both players' lists.
+    """
+    if trade in clients[trade.offerer].trades:
+        clients[trade.offerer].trades.remove(trade)
+    if trade in clients[trade.counterparty].requests:
+        clients[trade.counterparty].requests.remove(trade)
+
+def settle_trade(trade: Trade, clients: list[Client], mply) -> str:
+    """
+    Carries out a trade, all or nothing: cash and properties through MonopolyEngine.exchange, then the items,
+    which were checked beforehand so they can't fail half way. Call it on the game actor.
+
+    Returns:
+        str: Why the trade can't go through (it stays pending), or None.
+    """
+    a, b = clients[trade.offerer], clients[trade.counterparty]
+    error = has_items(a, trade.give_items) or has_items(b, trade.get_items)
+    events = []
+    if error is None:
+        error = mply.engine.exchange(a.PlayerObject, b.PlayerObject, trade.give, trade.get, trade.cash, events)
+    if error is not None:
+        return error
+    for giver, receiver, items in ((a, b, trade.give_items), (b, a, trade.get_items)):
+        for item, quantity in items.items():
+            giver.inventory.remove_item(item, quantity)
+            receiver.inventory.add_item(item, quantity)
+    close_trade(trade, clients)
+    mply.show_events(events)
+    return None
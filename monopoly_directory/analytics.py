@@ -0,0 +1,234 @@
+# Landing probabilities and expected rent, solved as a Markov chain over the board's movement rules.
+# Results are cached on disk, keyed on the board and card configuration, so bots and the deed viewer get them instantly.
+import hashlib
+import json
+import os
+import random
+import numpy as np
+from monopoly_directory.board import Board
+from monopoly_directory.cards import Cards
+from monopoly_directory.player_class import MonopolyPlayer
+from monopoly_directory.engine import RAILROADS, UTILITIES
+from utils.screenspace import g
+
+VERSION = 1 # Bump when the chain changes, so old cache files are ignored
+CACHE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), ".analytics_cache")
+JAIL = 10
+# Chain states: (square, doubles rolled so far this turn) for players out of jail, then in jail with 0-2 failed rolls
+FREE_STATES = 40 * 3
+STATES = FREE_STATES + 3
+# Rent rules a card can put a player under (see MonopolyEngine.rent_for)
+NORMAL, DOUBLE_RAILROAD, UTILITY_TEN = 0, 1, 2
+
+model = None # Last solved/loaded model, see get_model()
+
+def config_key(board: Board) -> str:
+    """
+    Hash of everything the chain depends on: the board's squares and rents and the card decks\n
+    """
+    squares = [[l.name, l.owner, l.purchasePrice, l.housePrice, l.rent, l.rent1H, l.rent2H, l.rent3H, l.rent4H, l.rentHotel]
+               for l in (board.locations[i] for i in range(40))]
+    config = {"version": VERSION, "board": squares,
+              "chance": sorted(g.get('chance cards text').split("\n")),
+              "community chest": sorted(g.get('community chest text').split("\n"))}
+    return hashlib.sha256(json.dumps(config).encode()).hexdigest()[:16]
+
+def card_outcome(deck: str, line: str, square: int) -> tuple:
+    """
+    Plays one card through Cards and Board.update_location for a player standing on square\n
+    Returns (new square, jailed)\n
+    """
+    board = Board(0)
+    p = MonopolyPlayer(0, 0, "")
+    p.location = square
+    board.locations[square].players.append(p.order)
+    cards = Cards(random.Random(0)) # Its own rng, so solving leaves the game's "cards" stream alone
+    if deck == "chance":
+        cards.chance = [line]
+        cards.draw_chance(p, board, [p])
+    else:
+        cards.community_chest = [line]
+        cards.draw_community_chest(p, board, [p])
+    return p.location, p.jail
+
+def resolve(board: Board, square: int, memo: dict) -> list:
+    """
+    Where a player that lands on square ends up, after cards and Go To Jail\n
+    Returns a list of (probability, square, jailed, rent rule)\n
+    """
+    if square in memo:
+        return memo[square]
+    owner = board.locations[square].owner
+    if owner == -7:
+        outcomes = [(1.0, JAIL, True, NORMAL)]
+    elif owner == -3 or owner == -4:
+        deck = "chance" if owner == -4 else "community chest"
+        lines = [line for line in g.get('chance cards text' if owner == -4 else 'community chest text').split("\n") if line.strip()]
+        outcomes = []
+        for line in lines:
+            number = int(line.split(".")[0])
+            new, jailed = card_outcome(deck, line, square)
+            chance = 1.0 / len(lines)
+            if jailed:
+                outcomes.append((chance, JAIL, True, NORMAL))
+            elif new == square:
+                outcomes.append((chance, square, False, NORMAL))
+            else:
+                rule = NORMAL
+                if owner == -4 and number in (5, 6):
+                    rule = DOUBLE_RAILROAD
+                elif owner == -4 and number == 7:
+                    rule = UTILITY_TEN
+                for p, final, final_jailed, final_rule in resolve(board, new, memo):
+                    outcomes.append((chance * p, final, final_jailed, final_rule if final != new else rule))
+    else:
+        outcomes = [(1.0, square, False, NORMAL)]
+    memo[square] = outcomes
+    return outcomes
+
+def build_chain(board: Board) -> dict:
+    """
+    Builds the per-roll transition matrix, plus what each roll from each state lands on\n
+    """
+    memo = {}
+    T = np.zeros((STATES, STATES))
+    land = np.zeros((STATES, 40)) # Probability of landing on each square (not counting going to jail)
+    dice_land = np.zeros((STATES, 40)) # Same, weighted by the dice total (for utility rent)
+    card_land = np.zeros((STATES, 40)) # Landings sent by the "nearest railroad/utility" chance cards (special rent)
+    utility_card = np.zeros((STATES, 40)) # Landings sent by the "nearest utility" chance card, weighted by dice
+    jailed = np.zeros(STATES) # Probability the roll ends in jail
+    ends_turn = np.zeros(STATES) # Probability the roll is the last one of the turn
+
+    def move(state, start, total, doubles, weight):
+        for p, square, in_jail, rule in resolve(board, (start + total) % 40, memo):
+            w = weight * p
+            if in_jail:
+                T[state, FREE_STATES] += w
+                jailed[state] += w
+                ends_turn[state] += w
+                continue
+            T[state, square * 3 + doubles] += w
+            if doubles == 0:
+                ends_turn[state] += w
+            if rule == DOUBLE_RAILROAD and square in RAILROADS:
+                card_land[state, square] += w
+            elif rule == UTILITY_TEN and square in UTILITIES:
+                card_land[state, square] += w
+                utility_card[state, square] += w * total
+            else:
+                land[state, square] += w
+                dice_land[state, square] += w * total
+
+    for a in range(1, 7):
+        for b in range(1, 7):
+            total, double = a + b, a == b
+            for square in range(40):
+                for doubles in range(3):
+                    state = square * 3 + doubles
+                    if double and doubles == 2: # Third doubles in a row
+                        T[state, FREE_STATES] += 1 / 36
+                        jailed[state] += 1 / 36
+                        ends_turn[state] += 1 / 36
+                    else:
+                        move(state, square, total, doubles + 1 if double else 0, 1 / 36)
+            for tries in range(3):
+                state = FREE_STATES + tries
+                if double or tries == 2: # Doubles, or paid the fine on the third turn. Leaving jail never earns another roll
+                    before = ends_turn[state]
+                    move(state, JAIL, total, 0, 1 / 36)
+                    ends_turn[state] = before + 1 / 36
+                else:
+                    T[state, state + 1] += 1 / 36
+                    ends_turn[state] += 1 / 36
+    return {"T": T, "land": land, "dice_land": dice_land, "card_land": card_land,
+            "utility_card": utility_card, "jailed": jailed, "ends_turn": ends_turn}
+
+def stationary(T: np.ndarray) -> np.ndarray:
+    """
+    Stationary distribution of a transition matrix: solves pi T = pi with sum(pi) = 1\n
+    """
+    n = T.shape[0]
+    A = T.T - np.eye(n)
+    A[-1] = 1.0 # Replace one (redundant) balance equation with the normalization
+    b = np.zeros(n)
+    b[-1] = 1.0
+    return np.linalg.solve(A, b)
+
+def solve(board: Board = None, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Landing probabilities and expected rent for the board, loaded from the cache if it was solved before\n
+    Returns a dict of:\n
+    landing: probability that a roll ends on each square (square 10 is just visiting)\n
+    in_jail: share of rolls made from jail\n
+    rolls_per_turn: average number of rolls per turn\n
+    expected_rent: [location, houses] expected rent paid per opponent roll, with modifier 1\n
+    """
+    board = board or Board(0)
+    key = config_key(board)
+    path = os.path.join(cache_dir, f"landing-{key}.npz")
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            return {name: cached[name] for name in cached.files}
+    chain = build_chain(board)
+    pi = stationary(chain["T"])
+    land = pi @ chain["land"]
+    dice_land = pi @ chain["dice_land"]
+    card_land = pi @ chain["card_land"]
+    utility_card = pi @ chain["utility_card"]
+    rents = np.array([[l.rent, l.rent1H, l.rent2H, l.rent3H, l.rent4H, l.rentHotel]
+                      for l in (board.locations[i] for i in range(40))], dtype=float)
+    # Same rules as MonopolyEngine.rent_for. Railroads and utilities keep their owned count in houses.
+    expected_rent = rents * land[:, None]
+    for i in RAILROADS:
+        expected_rent[i] = rents[i] * (land[i] + 2 * card_land[i])
+    for i in UTILITIES:
+        expected_rent[i] = rents[i] * dice_land[i] + np.where(rents[i] > 0, 10 * utility_card[i], 0)
+    result = {
+        "landing": land + card_land,
+        "in_jail": np.array(pi[FREE_STATES:].sum()),
+        "jail_rate": np.array(pi @ chain["jailed"]),
+        "rolls_per_turn": np.array(1 / (pi @ chain["ends_turn"])),
+        "expected_rent": expected_rent
+    }
+    os.makedirs(cache_dir, exist_ok=True)
+    temp = path + f".{os.getpid()}.tmp"
+    with open(temp, "wb") as file:
+        np.savez(file, **result)
+    os.replace(temp, path) # Atomic, so a concurrent reader never sees half a file
+    return result
+
+def get_model() -> dict:
+    """
+    The solved model for the standard board, solved or loaded once per process\n
+    """
+    global model
+    if model is None:
+        model = solve()
+    return model
+
+def expected_rent(location: int, houses: int = 0, modifier: int = 1) -> float:
+    """
+    Expected rent a property collects per opponent roll\n
+    @houses: houses on a street, or the number owned for railroads and utilities\n
+    """
+    return float(get_model()["expected_rent"][location, houses]) * modifier
+
+def expected_income(p: MonopolyPlayer, opponents: int = 1) -> float:
+    """
+    Expected rent a player collects per round, given the number of opponents still in the game\n
+    """
+    m = get_model()
+    per_roll = sum(m["expected_rent"][prop.location, prop.houses] * prop.modifier for prop in p.properties if not prop.mortgaged)
+    return float(per_roll * m["rolls_per_turn"] * opponents)
+
+if __name__ == "__main__":
+    board = Board(0)
+    m = solve(board)
+    print(f"Rolls per turn: {m['rolls_per_turn']:.4f}, rolls made from jail: {m['in_jail']:.2%}, rolls ending in jail: {m['jail_rate']:.2%}")
+    order = np.argsort(-m["landing"])
+    for i in order:
+        name = board.locations[i].name
+        line = f"{i:>2} {name:<24} {m['landing'][i]:.4%}"
+        if m["expected_rent"][i].any():
+            line += "  rent/roll: " + " ".join(f"{r:7.2f}" for r in m["expected_rent"][i])
+        print(line)
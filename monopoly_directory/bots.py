@@ -0,0 +1,324 @@
+# Computer players. A Bot picks actions for one seat of a MonopolyEngine by valuing positions with the
+# cached landing model (see analytics.py) and a projection of every player's cash flow.
+#
+#   python -m monopoly_directory.bots --games 100 --players 4 --difficulty normal   (soak test)
+import argparse
+import time
+from monopoly_directory import analytics
+from monopoly_directory.properties import PRICES, HOUSE_PRICES, MORTGAGES, OWNER, HOUSES, MORTGAGED, MODIFIER
+from monopoly_directory.engine import MonopolyEngine, ROLL, BUY, DECLINE, BUILD, SELL, MORTGAGE, UNMORTGAGE, PAY_FINE, USE_JAIL_CARD, END_TURN, BANKRUPT, ROLL_PHASE, BUY_PHASE, GAME_OVER, COLOR_GROUPS, GROUP_OF, RAILROADS, UTILITIES
+
+DIFFICULTIES = {"easy": 1, "normal": 2, "hard": 3} # Search depth, in actions looked ahead per decision
+DEFAULT_BUDGET = 0.02 # Seconds per decision. The search keeps the best plan of the deepest level it finished.
+HORIZON = 40 # Turns of projected cash flow a property (or a house) is worth
+RESERVE_TURNS = 6 # Turns of expected rent a bot tries to keep in cash
+RISK = 1.5 # Value lost per dollar below that reserve
+DENIAL = 0.5 # Weight of opponents' monopoly potential
+HOLD_VALUE = 0.9 # Share of its price an unmortgaged property is worth holding, as it can still be traded or mortgaged
+BUY_GAIN = 0.5 # Share of a property's price a chance to buy it is worth, when deciding to leave jail
+MAX_STEPS = 200 # Actions per turn after which play_turn gives up on a bot
+
+PRICE = PRICES
+HOUSE_PRICE = HOUSE_PRICES
+MORTGAGE_VALUE = MORTGAGES
+PROPERTIES = [i for i in range(40) if PRICE[i] > 0]
+
+class Position:
+    """
+    The parts of a game bots evaluate, cheap to copy and change during a search\n
+    """
+    def __init__(self, engine: MonopolyEngine = None) -> None:
+        if engine is None:
+            return
+        state = engine.board.state
+        self.owner = state[OWNER:OWNER + 40].tolist()
+        self.houses = state[HOUSES:HOUSES + 40].tolist()
+        self.modifier = state[MODIFIER:MODIFIER + 40].tolist()
+        self.mortgaged = [m == 1 for m in state[MORTGAGED:MORTGAGED + 40]]
+        self.cash = [p.cash for p in engine.players]
+        self.alive = [p.order != -1 for p in engine.players]
+
+    def copy(self) -> "Position":
+        new = Position()
+        new.owner = self.owner[:]
+        new.houses = self.houses[:]
+        new.modifier = self.modifier
+        new.mortgaged = self.mortgaged[:]
+        new.cash = self.cash[:]
+        new.alive = self.alive
+        return new
+
+class Bot:
+    """
+    Decides a seat's actions: buying, building, mortgaging, jail and trades\n
+    Bots hold no per-game state, so one Bot can play any number of seats and games.\n
+    """
+    def __init__(self, depth: int = DIFFICULTIES["normal"], budget: float = DEFAULT_BUDGET) -> None:
+        """
+        @depth: how many actions ahead to search, see DIFFICULTIES\n
+        @budget: seconds per decision\n
+        """
+        self.depth = depth
+        self.budget = budget
+        model = analytics.get_model()
+        # Expected rent per opponent turn, [location][houses, or number owned for railroads and utilities]
+        self.rent = (model["expected_rent"] * model["rolls_per_turn"]).tolist()
+        # Rent still to gain by building a street up to three houses, [location][houses]
+        self.gain = [[max(0.0, rents[3] - rent) for rent in rents] for rents in self.rent]
+        self.landing = model["landing"].tolist()
+        self.rolls_per_turn = float(model["rolls_per_turn"])
+        self.decisions = 0
+        self.decision_time = 0.0
+        self.slowest = 0.0
+
+    def rate(self, pos: Position, loc: int) -> float:
+        """
+        Expected rent an owned property collects per opponent turn\n
+        """
+        if loc in RAILROADS or loc in UTILITIES:
+            owner = pos.owner[loc]
+            owned = sum(1 for i in (RAILROADS if loc in RAILROADS else UTILITIES) if pos.owner[i] == owner)
+            return self.rent[loc][owned]
+        return self.rent[loc][pos.houses[loc]] * pos.modifier[loc]
+
+    def evaluate(self, pos: Position, me: int) -> float:
+        """
+        Value of a position for a player: cash, property held, projected rent in and out, monopoly
+        potential, and a penalty for holding less cash than the rent they are likely to owe\n
+        """
+        players = len(pos.cash)
+        income = [0.0] * players
+        assets = [0.0] * players
+        potential = [0.0] * players
+        for loc in PROPERTIES:
+            owner = pos.owner[loc]
+            if owner < 0 or not pos.alive[owner] or pos.mortgaged[loc]:
+                continue
+            income[owner] += self.rate(pos, loc)
+            assets[owner] += HOLD_VALUE * PRICE[loc] + pos.houses[loc] * HOUSE_PRICE[loc] # Houses at cost. Railroads and utilities have no house price
+        for group in COLOR_GROUPS:
+            owned = {}
+            gain = 0.0
+            for loc in group:
+                owner = pos.owner[loc]
+                if owner >= 0:
+                    owned[owner] = owned.get(owner, 0) + 1
+                gain += self.gain[loc][pos.houses[loc]]
+            # Rent still to gain by building the group up, discounted by how much of it is owned
+            for owner, count in owned.items():
+                if pos.alive[owner]:
+                    share = count / len(group)
+                    potential[owner] += share * share * gain
+        opponents = sum(pos.alive) - 1
+        liability = sum(income[i] for i in range(players) if i != me and pos.alive[i])
+        rivals = sum(potential[i] for i in range(players) if i != me and pos.alive[i])
+        reserve = RESERVE_TURNS * liability + 50
+        cash = pos.cash[me]
+        return (cash + assets[me] + HORIZON * (income[me] * opponents - liability)
+                + HORIZON / 2 * (potential[me] * opponents - DENIAL * rivals)
+                - RISK * max(0.0, reserve - cash))
+
+    def moves(self, pos: Position, me: int) -> list:
+        """
+        Property management actions the player could take in a position (same rules as MonopolyEngine)\n
+        """
+        moves = []
+        for loc in PROPERTIES:
+            if pos.owner[loc] != me:
+                continue
+            group = GROUP_OF.get(loc)
+            if pos.mortgaged[loc]:
+                if pos.cash[me] > int(MORTGAGE_VALUE[loc] * 1.1):
+                    moves.append((UNMORTGAGE, loc))
+                continue
+            if group is not None:
+                if (pos.houses[loc] < 5 and pos.cash[me] >= HOUSE_PRICE[loc] and all(pos.owner[i] == me and not pos.mortgaged[i] for i in group)):
+                    moves.append((BUILD, loc, 1))
+                if pos.houses[loc] > 0:
+                    moves.append((SELL, loc, 1))
+            if MORTGAGE_VALUE[loc] and (group is None or not any(pos.houses[i] for i in group)):
+                moves.append((MORTGAGE, loc))
+        return moves
+
+    def after(self, pos: Position, me: int, action: tuple) -> Position:
+        """
+        Position after a management action, buy or trade\n
+        """
+        new = pos.copy()
+        kind, loc = action[0], action[1]
+        if kind == BUILD:
+            new.houses[loc] += 1
+            new.cash[me] -= HOUSE_PRICE[loc]
+        elif kind == SELL:
+            new.houses[loc] -= 1
+            new.cash[me] += HOUSE_PRICE[loc] // 2
+        elif kind == MORTGAGE:
+            new.mortgaged[loc] = True
+            new.cash[me] += MORTGAGE_VALUE[loc]
+        elif kind == UNMORTGAGE:
+            new.mortgaged[loc] = False
+            new.cash[me] -= int(MORTGAGE_VALUE[loc] * 1.1)
+        elif kind == BUY:
+            new.owner[loc] = me
+            new.cash[me] -= PRICE[loc]
+        return new
+
+    def search(self, pos: Position, me: int, depth: int, deadline: float, spending: bool = False) -> tuple:
+        """
+        Best sequence of up to depth management actions, as (value, first action). Stopping is always an option.\n
+        @spending: only build and unmortgage, for sequences that started spending (raising cash comes first)\n
+        """
+        best = (self.evaluate(pos, me), None)
+        if depth == 0:
+            return best
+        for action in self.moves(pos, me):
+            if spending and action[0] not in (BUILD, UNMORTGAGE):
+                continue
+            value = self.search(self.after(pos, me, action), me, depth - 1, deadline, action[0] in (BUILD, UNMORTGAGE))[0]
+            if value > best[0]:
+                best = (value, action)
+            if time.perf_counter() > deadline:
+                break
+        return best
+
+    def plan(self, pos: Position, me: int, deadline: float, root: list = None) -> tuple:
+        """
+        Iterative deepening up to self.depth, keeping the result of the deepest search that finished in time\n
+        @root: first actions to consider, defaults to every management action\n
+        """
+        best = (self.evaluate(pos, me), None)
+        for depth in range(1, self.depth + 1):
+            result = (self.evaluate(pos, me), None)
+            for action in root if root is not None else self.moves(pos, me):
+                value = self.search(self.after(pos, me, action), me, depth - 1, deadline, action[0] in (BUILD, UNMORTGAGE))[0]
+                if value > result[0]:
+                    result = (value, action)
+            if time.perf_counter() > deadline and depth > 1:
+                break # Unfinished, the previous level's answer stands
+            best = result
+        return best
+
+    def decide(self, engine: MonopolyEngine, me: int) -> tuple:
+        """
+        Next action for a player, as a tuple to pass to MonopolyEngine.apply\n
+        """
+        start = time.perf_counter()
+        deadline = start + self.budget
+        legal = engine.legal_actions(me)
+        kinds = {action[0] for action in legal}
+        p = engine.players[me]
+        pos = Position(engine)
+        management = [action[:2] for action in legal if action[0] in (BUILD, SELL, MORTGAGE, UNMORTGAGE)]
+        if p.cash >= 0 and not any(engine.owns_group(p, group[0]) for group in COLOR_GROUPS):
+            # Raising cash only pays off when in debt or to build on a complete group
+            management = [action for action in management if action[0] == UNMORTGAGE]
+        if not legal:
+            action = (END_TURN,)
+        elif engine.phase == ROLL_PHASE and p.jail and self.leave_jail(engine, pos, me):
+            action = (USE_JAIL_CARD,) if USE_JAIL_CARD in kinds else (PAY_FINE,) if p.cash > 50 * p.repeat_offender else (ROLL,)
+        elif ROLL in kinds:
+            action = (ROLL,)
+        elif engine.phase == BUY_PHASE:
+            action = (DECLINE,)
+            if BUY in kinds:
+                keep = self.plan(pos, me, deadline)[0]
+                buy = self.plan(self.after(pos, me, (BUY, p.location)), me, deadline)[0]
+                if buy > keep:
+                    action = (BUY,)
+        else:
+            value, action = self.plan(pos, me, deadline, management)
+            if action is None and p.cash < 0:
+                # Must raise cash: the liquidation that costs the least value
+                raising = [a for a in management if a[0] in (SELL, MORTGAGE)]
+                action = max(raising, key=lambda a: self.evaluate(self.after(pos, me, a), me)) if raising else (BANKRUPT,)
+            elif action is None:
+                action = (END_TURN,)
+        elapsed = time.perf_counter() - start
+        self.decisions += 1
+        self.decision_time += elapsed
+        self.slowest = max(self.slowest, elapsed)
+        return action
+
+    def leave_jail(self, engine: MonopolyEngine, pos: Position, me: int) -> bool:
+        """
+        Whether to leave jail before rolling: worth it while there are properties left to buy, not once
+        the board is full of rent to pay\n
+        """
+        opportunity = sum(self.landing[loc] * self.rolls_per_turn * PRICE[loc] * BUY_GAIN for loc in PROPERTIES if pos.owner[loc] == -1)
+        liability = sum(self.rate(pos, loc) for loc in PROPERTIES if pos.owner[loc] >= 0 and pos.owner[loc] != me and not pos.mortgaged[loc])
+        return opportunity > liability
+
+    def trade_value(self, engine: MonopolyEngine, me: int, partner: int, give: list, get: list, cash: int = 0) -> float:
+        """
+        How much a trade improves a player's position: give and get are locations, cash is paid to the player
+        (negative if they pay)\n
+        """
+        pos = Position(engine)
+        new = pos.copy()
+        for loc in give:
+            new.owner[loc] = partner
+        for loc in get:
+            new.owner[loc] = me
+        new.cash[me] += cash
+        new.cash[partner] -= cash
+        return self.evaluate(new, me) - self.evaluate(pos, me)
+
+    def accepts_trade(self, engine: MonopolyEngine, me: int, partner: int, give: list, get: list, cash: int = 0) -> bool:
+        """
+        Whether the player would accept a trade, see trade_value\n
+        """
+        return self.trade_value(engine, me, partner, give, get, cash) > 0
+
+    def play_turn(self, engine: MonopolyEngine, me: int, apply=None) -> int:
+        """
+        Plays actions for a player until their turn is over\n
+        @apply: function taking (action, *args), defaults to engine.apply. The Banker passes monopoly.play so the board is drawn.\n
+        Returns the number of actions taken\n
+        """
+        apply = apply or engine.apply
+        steps = 0
+        while engine.phase != GAME_OVER and engine.turn == me and engine.players[me].order != -1 and steps < MAX_STEPS:
+            apply(*self.decide(engine, me))
+            steps += 1
+        return steps
+
+def soak(games: int = 100, players: int = 4, difficulty: str = "normal", seed: int = 0, max_turns: int = 1000) -> dict:
+    """
+    Description:
+        Plays many bot-only games at once, interleaved a turn at a time in one thread the way the Banker
+        runs them, and measures throughput.
+    Parameters:
+        games (int): Concurrent games.
+        players (int): Bots per game.
+        difficulty (str): Key of DIFFICULTIES.
+        seed (int): Seed of the first game, the others follow on.
+        max_turns (int): Games still running after this many turns are stopped.
+    Returns:
+        dict: games, finished, turns, actions, seconds, turns_per_second, mean and slowest decision time.
+    """
+    bot = Bot(DIFFICULTIES[difficulty])
+    engines = [MonopolyEngine([f"Bot {i + 1}" for i in range(players)], seed=seed + g) for g in range(games)]
+    start = time.perf_counter()
+    actions = 0
+    running = engines
+    while running:
+        for engine in running:
+            actions += bot.play_turn(engine, engine.turn)
+        running = [e for e in running if e.phase != GAME_OVER and e.turns < max_turns]
+    seconds = time.perf_counter() - start
+    turns = sum(e.turns for e in engines)
+    return {"games": games, "finished": sum(e.phase == GAME_OVER for e in engines), "turns": turns, "actions": actions,
+            "seconds": seconds, "turns_per_second": turns / seconds if seconds else 0.0,
+            "mean_decision": bot.decision_time / max(bot.decisions, 1), "slowest_decision": bot.slowest}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run bot-only Monopoly games as a soak test.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--difficulty", choices=DIFFICULTIES, default="normal")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=1000)
+    args = parser.parse_args()
+    result = soak(args.games, args.players, args.difficulty, args.seed, args.max_turns)
+    print(f"{result['games']} games ({result['finished']} finished), {result['turns']} turns, {result['actions']} actions in {result['seconds']:.1f}s")
+    print(f"{result['turns_per_second']:,.0f} turns/s, decisions: mean {result['mean_decision'] * 1000:.2f}ms, slowest {result['slowest_decision'] * 1000:.1f}ms")
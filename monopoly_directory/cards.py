@@ -1,4 +1,5 @@
 import random
+from utils.rng import stream
 from monopoly_directory.board import Board
 from monopoly_directory.player_class import MonopolyPlayer
 from utils.screenspace import g
@@ -8,11 +9,14 @@ class Cards:
     Cards class for Monopoly game\n
     Contains card data.\n
     """
-    def __init__(self) -> None:
+    def __init__(self, rng: random.Random = None) -> None:
+        """
+        @rng: random.Random to shuffle with, the "cards" stream (see utils/rng.py) if None\n
+        """
         self.chance = g.get('chance cards text').split("\n")
         self.community_chest = g.get('community chest text').split("\n")
-        random.shuffle(self.chance)
-        random.shuffle(self.community_chest)
+        (rng or stream("cards")).shuffle(self.chance)
+        (rng or stream("cards")).shuffle(self.community_chest)
     def draw_chance(self, p: MonopolyPlayer, board: Board, players) -> str:
         """
         Draw chance card\n
@@ -58,14 +62,16 @@ class Cards:
         elif(card_number == 10): 
             board.update_location(p, p.location, p.location - 3)
         elif(card_number == 11): 
-            p.jail = True
             board.update_location(p, p.location, 10)
+            p.go_to_jail()
         elif(card_number == 12): 
             for property in p.properties:
-                if(board.locations[property].houses == 5):
+                if property.housePrice == 0: # Railroads and utilities keep their owned count in houses
+                    continue
+                if(property.houses == 5):
                     p.pay(150) #price for 4 houses x1.5
-                elif(board.locations[property].houses > 0):
-                    p.pay(25*board.locations[property].houses)
+                elif(property.houses > 0):
+                    p.pay(25*property.houses)
         elif(card_number == 13):
             p.pay(15)
         elif(card_number == 14):
@@ -76,6 +82,7 @@ class Cards:
                 receiver.receive(50)
         elif(card_number == 16): 
             p.receive(150)
+        p.changed("cards") # The deck order changed even if nothing else did
         return self.chance[-1]
     def draw_community_chest(self, p: MonopolyPlayer, board: Board, players) -> str:
         """
@@ -95,6 +102,7 @@ class Cards:
         elif (card_number == 5):
             p.jail_cards += 1
         elif (card_number == 6):
+            board.update_location(p, p.location, 10)
             p.go_to_jail()
         elif (card_number == 7):
             p.receive(100)
@@ -114,12 +122,15 @@ class Cards:
             p.receive(25)
         elif (card_number == 14): 
             for property in p.properties:
-                if(board.locations[property].houses == 5):
+                if property.housePrice == 0:
+                    continue
+                if(property.houses == 5):
                     p.pay(240) #price for 4 houses x1.5
-                elif(board.locations[property].houses > 0):
-                    p.pay(40*board.locations[property].houses)
+                elif(property.houses > 0):
+                    p.pay(40*property.houses)
         elif (card_number == 15):
             p.receive(10)
         elif (card_number == 16):
             p.receive(100)
+        p.changed("cards")
         return self.community_chest[-1]
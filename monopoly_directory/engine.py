@@ -0,0 +1,629 @@
+import random
+from utils.rng import spawn
+from monopoly_directory.board import Board
+from monopoly_directory.properties import RENTS, HOUSES, MODIFIER
+from monopoly_directory.cards import Cards
+from monopoly_directory.player_class import MonopolyPlayer
+from monopoly_directory.ownership import COLOR_GROUPS, GROUP_OF, RAILROADS, UTILITIES
+
+# Actions a player can take. Arguments follow the action in MonopolyEngine.apply.
+ROLL = "roll"
+BUY = "buy"
+DECLINE = "decline"
+BUILD = "build" # location, number of houses (default 1)
+SELL = "sell" # location, number of houses (default 1)
+MORTGAGE = "mortgage" # location
+UNMORTGAGE = "unmortgage" # location
+PAY_FINE = "pay_fine"
+USE_JAIL_CARD = "use_jail_card"
+END_TURN = "end_turn"
+BANKRUPT = "bankrupt"
+
+# Turn phases
+ROLL_PHASE = "roll" # Current player has to roll (again, after doubles)
+BUY_PHASE = "buy" # Current player landed on an unowned property and has to buy or decline it
+MANAGE_PHASE = "manage" # Done moving, may build, mortgage etc. before ending the turn
+GAME_OVER = "over"
+
+INCOME_TAX = 200
+LUXURY_TAX = 100
+GO_SALARY = 200
+
+class MonopolyEngine:
+    """
+    Monopoly rules without any rendering or input\n
+    Holds the whole state of one game, so any number of games can run in one process.
+    apply() performs a player's action and returns what happened as a list of events,
+    tuples of (kind, player, *details). Renderers (see monopoly.show_events) and bots consume these.\n
+    Events:\n
+    ("turn", p), ("roll", p, die1, die2), ("doubles", p, count), ("jail", p, reason),
+    ("pass_go", p, amount), ("land", p, location), ("card", p, deck, text), ("tax", p, amount),
+    ("rent", p, owner, amount, location), ("buy", p, location, price), ("decline", p, location),
+    ("build", p, location, houses, cost), ("sell", p, location, houses, refund),
+    ("mortgage", p, location, value), ("unmortgage", p, location, cost), ("jail_fine", p, amount),
+    ("jail_card", p), ("stay_in_jail", p, turns), ("leave_jail", p, reason), ("debt", p, cash),
+    ("transfer", p, receiver, location), ("cash", p, delta, reason), ("bankrupt", p), ("end_turn", p), ("game_over", winner), ("rejected", p, reason)\n
+    """
+    def __init__(self, names: list, cash: int = 1500, seed: int = None, rng: random.Random = None) -> None:
+        """
+        @names: list of player names, one per player\n
+        @cash: starting cash\n
+        @seed: seed for a private random generator, ignored if rng is given. Without either, the game
+        gets the next "game" generator spawned from the master seed (see utils/rng.py)\n
+        @rng: random.Random used for dice and shuffling\n
+        """
+        if rng is None:
+            rng = random.Random(seed) if seed is not None else spawn("game")
+        self.rng = rng
+        self.board = Board(len(names))
+        self.decks = Cards(self.rng)
+        self.players = [MonopolyPlayer(cash, i, names[i]) for i in range(len(names))]
+        self.turn = 0
+        self.phase = ROLL_PHASE
+        self.doubles = 0 # Doubles rolled in a row this turn
+        self.dice = (0, 0)
+        self.card = None # (deck, card number) drawn this roll, some change the rent owed
+        self.turns = 0 # Turns completed
+        self.winner = None
+        self.log = None # GameLog recording this game's actions, see gamelog.py
+
+    def current(self) -> MonopolyPlayer:
+        """
+        Player whose turn it is\n
+        """
+        return self.players[self.turn]
+
+    def active_players(self) -> list:
+        """
+        Players that are not bankrupt\n
+        """
+        return [p for p in self.players if p.order != -1]
+
+    def net_worth(self, player: int) -> int:
+        """
+        Cash plus property at price (mortgage value if mortgaged) and houses at cost\n
+        """
+        p = self.players[player]
+        return p.cash + sum((prop.mortgage if prop.mortgaged else prop.purchasePrice) + prop.houses * prop.housePrice for prop in p.properties)
+
+    def roll_dice(self) -> tuple:
+        """
+        Roll two dice\n
+        """
+        return (self.rng.randint(1, 6), self.rng.randint(1, 6))
+
+    def legal_actions(self, player: int = None) -> list:
+        """
+        Actions (with arguments) the player could take right now. Building and selling list one house at a time.\n
+        @player: int, defaults to the current player\n
+        """
+        if self.phase == GAME_OVER:
+            return []
+        p = self.players[self.turn if player is None else player]
+        actions = []
+        if p.order == self.turn:
+            if self.phase == ROLL_PHASE:
+                actions.append((ROLL,))
+                if p.jail:
+                    actions.append((PAY_FINE,))
+                    if p.jail_cards > 0:
+                        actions.append((USE_JAIL_CARD,))
+            elif self.phase == BUY_PHASE:
+                if p.cash > self.board.locations[p.location].purchasePrice:
+                    actions.append((BUY,))
+                actions.append((DECLINE,))
+            elif p.cash >= 0:
+                actions.append((END_TURN,))
+            if p.cash < 0:
+                actions.append((BANKRUPT,))
+        for prop in p.properties:
+            loc = prop.location
+            if self.can_build(p, loc) is None:
+                actions.append((BUILD, loc, 1))
+            if self.can_sell(p, loc) is None:
+                actions.append((SELL, loc, 1))
+            if self.can_mortgage(p, loc) is None:
+                actions.append((MORTGAGE, loc))
+            if prop.mortgaged and p.cash > int(prop.mortgage * 1.1):
+                actions.append((UNMORTGAGE, loc))
+        return actions
+
+    def apply(self, action: str, *args, player: int = None) -> list:
+        """
+        Perform an action and return the resulting events\n
+        Invalid actions change nothing and return a single ("rejected", player, reason) event.\n
+        @action: one of the action constants\n
+        @args: action arguments (location, number of houses)\n
+        @player: int, the acting player. Defaults to the current player. Only property management may be done off-turn.\n
+        """
+        index = self.turn if player is None else player
+        p = self.players[index]
+        events = []
+        if self.phase == GAME_OVER:
+            return [("rejected", index, "The game is over.")]
+        if p.order == -1:
+            return [("rejected", index, "You are bankrupt.")]
+        if action in (BUILD, SELL, MORTGAGE, UNMORTGAGE):
+            try:
+                location = int(args[0])
+                houses = int(args[1]) if len(args) > 1 else 1
+            except (ValueError, IndexError):
+                return [("rejected", index, "Invalid input, please enter a property #.")]
+        if action == BUILD:
+            reason = self.build(p, location, houses, events)
+        elif action == SELL:
+            reason = self.sell(p, location, houses, events)
+        elif action == MORTGAGE:
+            reason = self.mortgage(p, location, events)
+        elif action == UNMORTGAGE:
+            reason = self.unmortgage(p, location, events)
+        elif p.order != self.turn:
+            reason = "It is not your turn."
+        elif action == ROLL:
+            reason = self.roll(p, args[0] if args else None, events)
+        elif action == BUY:
+            reason = self.buy(p, events)
+        elif action == DECLINE:
+            reason = self.decline(p, events)
+        elif action == PAY_FINE or action == USE_JAIL_CARD:
+            reason = self.leave_jail(p, action, events)
+        elif action == END_TURN:
+            reason = self.end_turn(p, events)
+        elif action == BANKRUPT:
+            reason = self.bankrupt(p, events)
+        else:
+            reason = f"Unknown action {action}."
+        if reason is not None:
+            return [("rejected", index, reason)]
+        if action in (SELL, MORTGAGE) and p.order == self.turn and self.phase == MANAGE_PHASE and p.cash >= 0:
+            self.phase = self.after_move_phase(p) # Debt settled after doubles, roll again
+        if self.log is not None:
+            if action in (BUILD, SELL):
+                self.log.record_action(index, action, location, houses)
+            elif action in (MORTGAGE, UNMORTGAGE):
+                self.log.record_action(index, action, location)
+            else:
+                self.log.record_action(index, action, dice=self.dice if action == ROLL else (0, 0))
+            self.logged()
+        return events
+
+    def roll(self, p: MonopolyPlayer, dice: tuple, events: list) -> str:
+        """
+        Roll (or use the given dice) and move, including jail rolls and doubles\n
+        """
+        if self.phase != ROLL_PHASE:
+            return "You can't roll right now."
+        dice = dice if dice is not None else self.roll_dice()
+        self.dice = dice
+        self.card = None
+        events.append(("roll", p.order, dice[0], dice[1]))
+        if p.jail:
+            left_jail, reason = p.attempt_jail_roll(dice)
+            if not left_jail:
+                events.append(("stay_in_jail", p.order, p.jail_turns))
+                self.phase = MANAGE_PHASE
+                return None
+            events.append(("leave_jail", p.order, reason))
+            if reason == "third_turn":
+                events.append(("jail_fine", p.order, 50 * p.repeat_offender))
+            self.doubles = 0 # Leaving jail never earns another roll
+        elif dice[0] == dice[1]:
+            self.doubles += 1
+            events.append(("doubles", p.order, self.doubles))
+            if self.doubles == 3:
+                self.send_to_jail(p, "doubles", events)
+                self.phase = MANAGE_PHASE
+                return None
+        else:
+            self.doubles = 0
+        old = p.location
+        if old + dice[0] + dice[1] > 39:
+            events.append(("pass_go", p.order, GO_SALARY))
+        self.board.update_location(p, dice[0] + dice[1])
+        events.append(("land", p.order, p.location))
+        self.evaluate_location(p, events)
+        return None
+
+    def evaluate_location(self, p: MonopolyPlayer, events: list) -> None:
+        """
+        Resolve the square the player landed on (cards, taxes, rent), then set the next phase\n
+        A player left in debt owes whoever they paid rent to, or the bank (see bankrupt)\n
+        """
+        creditor = -1
+        while True:
+            loc = self.board.locations[p.location]
+            if loc.owner == -1:
+                self.phase = BUY_PHASE
+                return
+            elif loc.owner == -3 or loc.owner == -4: # Community chest or chance
+                old = p.location
+                if loc.owner == -3:
+                    card = self.decks.draw_community_chest(p, self.board, self.players)
+                else:
+                    card = self.decks.draw_chance(p, self.board, self.players)
+                self.card = (loc.owner, int(card.split(".")[0]))
+                events.append(("card", p.order, "chance" if loc.owner == -4 else "community chest", card))
+                if p.location != old:
+                    if old > p.location and p.location != 10 and p.location != old - 3:
+                        events.append(("pass_go", p.order, GO_SALARY))
+                    if p.jail:
+                        events.append(("jail", p.order, "card"))
+                        break
+                    events.append(("land", p.order, p.location))
+                    continue # Moved by the card, resolve the new square
+            elif loc.owner == -5:
+                p.pay(INCOME_TAX)
+                events.append(("tax", p.order, INCOME_TAX))
+            elif loc.owner == -9:
+                p.pay(LUXURY_TAX)
+                events.append(("tax", p.order, LUXURY_TAX))
+            elif loc.owner == -7:
+                self.send_to_jail(p, "square", events)
+            elif loc.owner >= 0 and loc.owner != p.order and not loc.mortgaged:
+                rent = self.rent_for(loc)
+                owner = self.players[loc.owner]
+                p.pay(rent)
+                owner.receive(rent)
+                events.append(("rent", p.order, owner.order, rent, p.location))
+                creditor = owner.order
+            break
+        if p.cash < 0:
+            p.creditor = creditor
+            events.append(("debt", p.order, p.cash))
+        self.phase = self.after_move_phase(p)
+
+    def after_move_phase(self, p: MonopolyPlayer) -> str:
+        """
+        Phase once the player is done with the square they landed on: roll again after doubles,
+        but only once out of debt (see apply, raising the cash gives the roll back)\n
+        """
+        return ROLL_PHASE if self.doubles and not p.jail and p.cash >= 0 else MANAGE_PHASE
+
+    def rent_for(self, loc) -> int:
+        """
+        Rent owed for landing on an owned property, given the dice and any card that sent the player there\n
+        """
+        location, state = loc.location, self.board.state # Straight from the state array, the hot path of every move
+        rent = RENTS[location][state[HOUSES + location]] * state[MODIFIER + location]
+        total = self.dice[0] + self.dice[1]
+        if loc.location in UTILITIES:
+            rent *= total
+        if self.card is not None and self.card[0] == -4: # Chance cards that send you to the nearest railroad or utility
+            if self.card[1] in (5, 6) and loc.location in RAILROADS:
+                rent *= 2
+            elif self.card[1] == 7 and loc.location in UTILITIES:
+                rent = 10 * total
+        return rent
+
+    def send_to_jail(self, p: MonopolyPlayer, reason: str, events: list) -> None:
+        """
+        Move a player to jail, keeping the board's per-square player lists in sync\n
+        """
+        self.board.update_location(p, p.location, 10)
+        p.go_to_jail()
+        events.append(("jail", p.order, reason))
+
+    def buy(self, p: MonopolyPlayer, events: list) -> str:
+        """
+        Buy the unowned property the player is on\n
+        """
+        if self.phase != BUY_PHASE:
+            return "There is nothing to buy."
+        loc = self.board.locations[p.location]
+        if p.cash <= loc.purchasePrice:
+            return f"You can't afford {loc.name}."
+        p.buy(p.location, self.board)
+        events.append(("buy", p.order, p.location, loc.purchasePrice))
+        self.phase = self.after_move_phase(p)
+        return None
+
+    def decline(self, p: MonopolyPlayer, events: list) -> str:
+        """
+        Leave the property the player is on unowned\n
+        """
+        if self.phase != BUY_PHASE:
+            return "There is nothing to decline."
+        events.append(("decline", p.order, p.location))
+        self.phase = self.after_move_phase(p)
+        return None
+
+    def owns_group(self, p: MonopolyPlayer, location: int) -> bool:
+        """
+        Whether the player owns every property in the location's color group\n
+        """
+        return self.board.ownership.has_monopoly(p.order, location)
+
+    def can_build(self, p: MonopolyPlayer, location: int, houses: int = 1) -> str:
+        """
+        Reason the player can't build houses on a location, None if they can\n
+        """
+        if not 0 <= location < 40 or self.board.locations[location].owner != p.order:
+            return "You do not own this property!"
+        loc = self.board.locations[location]
+        if location in RAILROADS or location in UTILITIES:
+            return "This property cannot be improved."
+        if not self.owns_group(p, location):
+            return "You do not own a monopoly on these properties!"
+        if self.board.ownership.group_mortgaged(location):
+            return "This property is mortaged."
+        if houses < 1 or loc.houses + houses > 5:
+            return f"You can build at most {5 - loc.houses} more."
+        if p.cash < loc.housePrice * houses:
+            return "You can't afford that many houses."
+        return None
+
+    def build(self, p: MonopolyPlayer, location: int, houses: int, events: list) -> str:
+        """
+        Build houses (the fifth is a hotel)\n
+        """
+        reason = self.can_build(p, location, houses)
+        if reason is not None:
+            return reason
+        loc = self.board.locations[location]
+        p.pay(loc.housePrice * houses)
+        self.board.set_houses(location, loc.houses + houses)
+        p.changed("improvements")
+        events.append(("build", p.order, location, houses, loc.housePrice * houses))
+        return None
+
+    def can_sell(self, p: MonopolyPlayer, location: int, houses: int = 1) -> str:
+        """
+        Reason the player can't sell houses from a location, None if they can\n
+        """
+        if not 0 <= location < 40 or self.board.locations[location].owner != p.order:
+            return "You do not own this property!"
+        if location in RAILROADS or location in UTILITIES:
+            return "This property cannot have houses."
+        if houses < 1 or houses > self.board.locations[location].houses:
+            return "You do not own that many houses on this property!"
+        return None
+
+    def sell(self, p: MonopolyPlayer, location: int, houses: int, events: list) -> str:
+        """
+        Sell houses back to the bank for half their price\n
+        """
+        reason = self.can_sell(p, location, houses)
+        if reason is not None:
+            return reason
+        loc = self.board.locations[location]
+        refund = houses * loc.housePrice // 2
+        self.board.set_houses(location, loc.houses - houses)
+        p.receive(refund)
+        p.changed("improvements")
+        events.append(("sell", p.order, location, houses, refund))
+        return None
+
+    def can_mortgage(self, p: MonopolyPlayer, location: int) -> str:
+        """
+        Reason the player can't mortgage a location, None if they can\n
+        """
+        if not 0 <= location < 40 or self.board.locations[location].owner != p.order:
+            return "You do not own this property!"
+        loc = self.board.locations[location]
+        if loc.mortgaged:
+            return "This property is already mortgaged!"
+        if loc.mortgage == 0:
+            return "You cannot mortgage this property!"
+        if self.board.ownership.group_improved(location):
+            return "You must sell your houses on this property first!"
+        return None
+
+    def mortgage(self, p: MonopolyPlayer, location: int, events: list) -> str:
+        """
+        Mortgage a property for its mortgage value\n
+        """
+        reason = self.can_mortgage(p, location)
+        if reason is not None:
+            return reason
+        loc = self.board.locations[location]
+        self.board.set_mortgaged(location, True)
+        p.receive(loc.mortgage)
+        p.changed("improvements")
+        events.append(("mortgage", p.order, location, loc.mortgage))
+        return None
+
+    def unmortgage(self, p: MonopolyPlayer, location: int, events: list) -> str:
+        """
+        Repay a mortgage plus 10%\n
+        """
+        if not 0 <= location < 40 or self.board.locations[location].owner != p.order:
+            return "You do not own this property!"
+        loc = self.board.locations[location]
+        if not loc.mortgaged:
+            return "This property is not mortgaged."
+        cost = int(loc.mortgage * 1.1)
+        if p.cash <= cost:
+            return "You can't afford to repay this mortgage."
+        self.board.set_mortgaged(location, False)
+        p.pay(cost)
+        p.changed("improvements")
+        events.append(("unmortgage", p.order, location, cost))
+        return None
+
+    def leave_jail(self, p: MonopolyPlayer, action: str, events: list) -> str:
+        """
+        Pay the fine or use a Get Out of Jail Free card before rolling\n
+        """
+        if not p.jail or self.phase != ROLL_PHASE:
+            return "You are not waiting to roll in jail."
+        if action == USE_JAIL_CARD:
+            if p.jail_cards <= 0:
+                return "You do not have a Get Out of Jail Free card."
+            p.use_jail_card()
+            events.append(("jail_card", p.order))
+        else:
+            fine = 50 * p.repeat_offender
+            p.pay_jail_fine()
+            events.append(("jail_fine", p.order, fine))
+        return None
+
+    def end_turn(self, p: MonopolyPlayer, events: list) -> str:
+        """
+        End the turn. An undecided purchase is declined.\n
+        """
+        if self.phase == ROLL_PHASE:
+            return "You still have to roll."
+        if p.cash < 0:
+            return "You are in debt. Resolve debts before ending turn."
+        if self.phase == BUY_PHASE:
+            self.decline(p, events)
+        events.append(("end_turn", p.order))
+        self.next_turn(events)
+        return None
+
+    def skip_turn(self) -> list:
+        """
+        Force the current player's turn to end whatever the phase, e.g. when they disconnect or time out.
+        An undecided purchase is declined. Returns the events.\n
+        """
+        events = []
+        if self.phase == GAME_OVER:
+            return events
+        p = self.current()
+        if self.phase == BUY_PHASE:
+            self.decline(p, events)
+        events.append(("end_turn", self.turn))
+        self.next_turn(events)
+        if self.log is not None:
+            self.log.record_skip()
+            self.logged()
+        return events
+
+    def adjust_cash(self, player: int, delta: int, reason: str = "") -> list:
+        """
+        Change a player's cash from outside the rules (casino, shop, loans...). Returns the events.\n
+        @reason: short description, kept in the game log\n
+        """
+        p = self.players[player]
+        p.receive(delta)
+        if delta < 0 and p.cash < 0:
+            p.creditor = -1
+        if self.log is not None:
+            self.log.record_cash(player, delta, reason)
+            self.logged()
+        return [("cash", player, delta, reason)]
+
+    def logged(self) -> None:
+        """
+        Called after each record is written: snapshots the game when one is due\n
+        """
+        if self.log.snapshot_due():
+            self.log.snapshot(self)
+
+    def bankrupt(self, p: MonopolyPlayer, events: list) -> str:
+        """
+        Declare bankruptcy. The player's properties go to the player they owe (houses sold to the bank
+        for half price, the money going with them, mortgages kept), or back to the bank if they owe the bank.
+        The rent was credited in full when it was charged, so the part left unpaid is taken back from the creditor.\n
+        """
+        if p.cash >= 0:
+            return "You are not in debt."
+        index = self.players.index(p)
+        creditor = self.players[p.creditor] if p.creditor >= 0 and self.players[p.creditor].order != -1 else None
+        for prop in p.properties:
+            if creditor is None:
+                self.board.set_owner(prop.location, -1)
+                self.board.set_houses(prop.location, 0)
+                self.board.set_mortgaged(prop.location, False)
+                continue
+            if prop.houses and prop.location in GROUP_OF: # Railroads and utilities keep their owned count in houses
+                refund = prop.houses * prop.housePrice // 2
+                self.board.set_houses(prop.location, 0)
+                creditor.receive(refund)
+                events.append(("cash", creditor.order, refund, f"{p.name}'s houses"))
+            creditor.properties.append(prop)
+            self.board.set_owner(prop.location, creditor.order, creditor.name)
+            events.append(("transfer", index, creditor.order, prop.location))
+        if creditor is not None:
+            creditor.pay(-p.cash)
+            events.append(("cash", creditor.order, p.cash, f"{p.name}'s unpaid rent"))
+            creditor.changed("owner")
+            creditor.changed("improvements")
+        p.properties = []
+        p.order = -1
+        p.changed("owner")
+        p.changed("improvements")
+        events.append(("bankrupt", index))
+        if p is self.current():
+            self.next_turn(events)
+        return None
+
+    def transfer(self, giver: MonopolyPlayer, receiver: MonopolyPlayer, location: int, events: list) -> str:
+        """
+        Hand a property to another player, e.g. in a trade. A mortgage goes with it, houses have to be sold first.\n
+        """
+        if not 0 <= location < 40 or self.board.locations[location].owner != giver.order:
+            return f"{giver.name} does not own this property!"
+        if receiver.order == -1 or receiver is giver:
+            return "Invalid receiver."
+        if self.board.ownership.group_improved(location):
+            return "Houses in this color group must be sold first."
+        prop = self.board.locations[location]
+        giver.properties.remove(prop)
+        receiver.properties.append(prop)
+        self.board.set_owner(location, receiver.order, receiver.name)
+        giver.changed("owner")
+        receiver.changed("owner")
+        receiver.changed("improvements")
+        events.append(("transfer", giver.order, receiver.order, location))
+        if self.log is not None:
+            self.log.record_transfer(giver.order, receiver.order, location)
+            self.logged()
+        return None
+
+    def can_exchange(self, a: MonopolyPlayer, b: MonopolyPlayer, give: list, get: list, cash: int = 0) -> str:
+        """
+        Why a trade between two players can't happen, or None\n
+        @give: locations a hands to b, @get: locations b hands to a, @cash: paid by a to b (negative: b pays a)\n
+        """
+        if a is b or a.order == -1 or b.order == -1:
+            return "Trades need two players still in the game."
+        if len(set(give)) != len(give) or len(set(get)) != len(get):
+            return "A property can only be traded once."
+        for player, locations in ((a, give), (b, get)):
+            for location in locations:
+                if not 0 <= location < 40 or self.board.locations[location].owner != player.order:
+                    return f"{player.name} does not own {self.board.locations[location].name if 0 <= location < 40 else 'this property'}!"
+                if self.board.ownership.group_improved(location):
+                    return f"Houses in {self.board.locations[location].name}'s color group must be sold first."
+        payer = a if cash > 0 else b
+        if cash and payer.cash < abs(cash):
+            return f"{payer.name} doesn't have ${abs(cash)}."
+        return None
+
+    def exchange(self, a: MonopolyPlayer, b: MonopolyPlayer, give: list, get: list, cash: int, events: list) -> str:
+        """
+        Trade properties and cash between two players, all or nothing: everything is checked first (see can_exchange)\n
+        The cash goes through adjust_cash and each property through transfer, so the trade is logged like any other change.\n
+        """
+        error = self.can_exchange(a, b, give, get, cash)
+        if error is not None:
+            return error
+        if cash:
+            events += self.adjust_cash(a.order, -cash, f"trade with {b.name}")
+            events += self.adjust_cash(b.order, cash, f"trade with {a.name}")
+        for location in give:
+            self.transfer(a, b, location, events)
+        for location in get:
+            self.transfer(b, a, location, events)
+        return None
+
+    def next_turn(self, events: list) -> None:
+        """
+        Hand the turn to the next player who is not bankrupt, or end the game\n
+        """
+        self.turns += 1
+        remaining = self.active_players()
+        if len(remaining) <= 1:
+            self.phase = GAME_OVER
+            self.winner = remaining[0].order if remaining else None
+            events.append(("game_over", self.winner))
+            return
+        self.turn = (self.turn + 1) % len(self.players)
+        while self.players[self.turn].order == -1:
+            self.turn = (self.turn + 1) % len(self.players)
+        self.phase = ROLL_PHASE
+        self.doubles = 0
+        self.card = None
+        self.players[self.turn].changed("turn")
+        events.append(("turn", self.turn))
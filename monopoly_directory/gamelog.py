@@ -0,0 +1,321 @@
+# Append-only game log. Every state-changing engine call is written as a small length-prefixed binary record,
+# with a compact snapshot of the whole game every so often. A crashed game is recovered by loading the last
+# snapshot and replaying the records after it. The same file drives the replay viewer and regression checks.
+#
+#   python -m monopoly_directory.gamelog <file.tmlog>            replay the game, one history line per event
+#   python -m monopoly_directory.gamelog <file.tmlog> --verify   check that replaying reproduces every snapshot
+import os
+import random
+import struct
+import sys
+import time
+from monopoly_directory.engine import MonopolyEngine, ROLL, BUY, DECLINE, BUILD, SELL, MORTGAGE, UNMORTGAGE, PAY_FINE, USE_JAIL_CARD, END_TURN, BANKRUPT, ROLL_PHASE, BUY_PHASE, MANAGE_PHASE, GAME_OVER, GROUP_OF
+from utils.screenspace import g
+from utils.rng import MT_STATE, pack_random, unpack_random
+
+# Record kinds
+SNAPSHOT = 1
+ACTION = 2
+SKIP = 3
+TRANSFER = 4
+CASH = 5
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_EVERY = 100 # Records between snapshots
+LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "logs")
+
+ACTIONS = (ROLL, BUY, DECLINE, BUILD, SELL, MORTGAGE, UNMORTGAGE, PAY_FINE, USE_JAIL_CARD, END_TURN, BANKRUPT)
+PHASES = (ROLL_PHASE, BUY_PHASE, MANAGE_PHASE, GAME_OVER)
+LENGTH = struct.Struct("<I")
+ACTION_RECORD = struct.Struct("<bBbbBB") # player, action, location, houses, die 1, die 2
+TRANSFER_RECORD = struct.Struct("<bbB") # giver, receiver, location
+CASH_RECORD = struct.Struct("<bi") # player, delta, then the reason as UTF-8
+GAME_RECORD = struct.Struct("<4sBBbBBBBbBIb") # magic, version, players, turn, phase, doubles, dice, card, turns completed, winner
+PLAYER_RECORD = struct.Struct("<ibBBBBBb") # cash, order, location, jail, jail cards, jail turns, repeat offender, creditor
+SQUARE_RECORD = struct.Struct("<bBBB") # owner, houses, mortgaged, modifier
+RNG_RECORD = MT_STATE # The game's dice and shuffle generator
+
+def encode_snapshot(engine: MonopolyEngine) -> bytes:
+    """
+    Description:
+        Packs the whole state of a game into a compact binary snapshot: players, board, deck order and RNG.
+    Parameters:
+        engine (MonopolyEngine): Game to snapshot.
+    Returns:
+        bytes: Snapshot, about 3KB (mostly RNG state) for a 4 player game.
+    """
+    card = engine.card or (0, 0)
+    out = bytearray(GAME_RECORD.pack(b"TMSN", SNAPSHOT_VERSION, len(engine.players), engine.turn, PHASES.index(engine.phase),
+                                     engine.doubles, engine.dice[0], engine.dice[1], card[0], card[1], engine.turns,
+                                     -1 if engine.winner is None else engine.winner))
+    for p in engine.players:
+        name = p.name.encode()[:255]
+        out += bytes((len(name),)) + name
+        out += PLAYER_RECORD.pack(p.cash, p.order, p.location, p.jail, p.jail_cards, p.jail_turns, p.repeat_offender, p.creditor)
+        out += bytes((len(p.properties),)) + bytes(prop.location for prop in p.properties)
+    for i in range(40):
+        loc = engine.board.locations[i]
+        out += SQUARE_RECORD.pack(loc.owner, loc.houses, loc.mortgaged, loc.modifier)
+    for deck in (engine.decks.chance, engine.decks.community_chest):
+        out += bytes((len(deck),)) + bytes(int(card.split(".")[0]) for card in deck)
+    out += pack_random(engine.rng)
+    return bytes(out)
+
+def decode_snapshot(data: bytes) -> MonopolyEngine:
+    """
+    Description:
+        Rebuilds a game from encode_snapshot's output.
+    Parameters:
+        data (bytes): Snapshot.
+    Returns:
+        MonopolyEngine: The game, exactly as it was when the snapshot was taken.
+    """
+    magic, version, count, turn, phase, doubles, die1, die2, deck, number, turns, winner = GAME_RECORD.unpack_from(data)
+    if magic != b"TMSN" or version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot (version {version}).")
+    offset = GAME_RECORD.size
+    names, players, owned = [], [], []
+    for _ in range(count):
+        length = data[offset]
+        names.append(data[offset + 1:offset + 1 + length].decode())
+        offset += 1 + length
+        players.append(PLAYER_RECORD.unpack_from(data, offset))
+        offset += PLAYER_RECORD.size
+        length = data[offset]
+        owned.append(list(data[offset + 1:offset + 1 + length]))
+        offset += 1 + length
+    engine = MonopolyEngine(names, rng=random.Random()) # Its state is restored below
+    engine.turn, engine.phase, engine.doubles, engine.dice = turn, PHASES[phase], doubles, (die1, die2)
+    engine.card = (deck, number) if deck else None
+    engine.turns, engine.winner = turns, None if winner == -1 else winner
+    board = engine.board
+    board.occupants = [[] for _ in range(40)]
+    for p, (cash, order, location, jail, jail_cards, jail_turns, repeat_offender, creditor) in zip(engine.players, players):
+        p.cash, p.order, p.location, p.jail = cash, order, location, bool(jail)
+        p.jail_cards, p.jail_turns, p.repeat_offender, p.creditor = jail_cards, jail_turns, repeat_offender, creditor
+        if order != -1:
+            board.locations[location].players.append(order)
+    for i in range(40):
+        owner, houses, mortgaged, modifier = SQUARE_RECORD.unpack_from(data, offset)
+        offset += SQUARE_RECORD.size
+        if owner >= 0:
+            board.set_owner(i, owner, engine.players[owner].name)
+        else:
+            board.locations[i].owner = owner
+        if i in GROUP_OF:
+            board.set_houses(i, houses)
+        board.set_mortgaged(i, bool(mortgaged))
+        board.locations[i].modifier = modifier
+    for p, locations in zip(engine.players, owned):
+        p.properties = [board.locations[i] for i in locations]
+    for key, attribute in (('chance cards text', "chance"), ('community chest text', "community_chest")):
+        lines = {int(line.split(".")[0]): line for line in g.get(key).split("\n") if line.strip()}
+        length = data[offset]
+        setattr(engine.decks, attribute, [lines[n] for n in data[offset + 1:offset + 1 + length]])
+        offset += 1 + length
+    unpack_random(engine.rng, data, offset)
+    return engine
+
+class GameLog:
+    """
+    Append-only log file of one game. Attach it to an engine (engine.log) and the engine records every
+    state-changing call through the record_* methods.\n
+    Each record is a 4 byte little-endian length, a kind byte and the kind's fields. The offset of the
+    latest snapshot is also kept in <path>.idx so recovery doesn't have to scan the log.\n
+    """
+    def __init__(self, path: str, fsync: bool = False) -> None:
+        """
+        Opens a log for appending, dropping a partly written last record (e.g. after a crash)\n
+        @fsync: also fsync every record, to survive power loss rather than just a crash\n
+        """
+        self.path = path
+        self.fsync = fsync
+        self.since_snapshot = 0
+        end = 0
+        if os.path.exists(path):
+            for offset, kind, body in read_records(path):
+                end = offset + LENGTH.size + 1 + len(body)
+                self.since_snapshot = 0 if kind == SNAPSHOT else self.since_snapshot + 1
+        self.file = open(path, "ab")
+        self.file.truncate(end)
+        self.file.seek(end)
+
+    @classmethod
+    def create(cls, engine: MonopolyEngine, path: str = None, fsync: bool = False) -> "GameLog":
+        """
+        Starts a new log for a game, beginning with a snapshot, and attaches it to the engine\n
+        @path: defaults to logs/<time>.tmlog\n
+        """
+        if path is None:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            path = os.path.join(LOG_DIR, time.strftime("%Y%m%d-%H%M%S") + ".tmlog")
+        if os.path.exists(path):
+            os.remove(path)
+        log = cls(path, fsync)
+        log.snapshot(engine)
+        engine.log = log
+        return log
+
+    def write(self, kind: int, body: bytes) -> int:
+        """
+        Appends one record and returns its offset\n
+        """
+        offset = self.file.tell()
+        self.file.write(LENGTH.pack(len(body)) + bytes((kind,)) + body)
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+        self.since_snapshot += 1
+        return offset
+
+    def snapshot(self, engine: MonopolyEngine) -> None:
+        """
+        Appends a snapshot of the game and points the .idx file at it\n
+        """
+        offset = self.write(SNAPSHOT, encode_snapshot(engine))
+        self.since_snapshot = 0
+        temp = self.path + ".idx.tmp"
+        with open(temp, "wb") as index:
+            index.write(struct.pack("<Q", offset))
+        os.replace(temp, self.path + ".idx")
+
+    def snapshot_due(self) -> bool:
+        return self.since_snapshot >= SNAPSHOT_EVERY
+
+    def record_action(self, player: int, action: str, location: int = -1, houses: int = 0, dice: tuple = (0, 0)) -> None:
+        self.write(ACTION, ACTION_RECORD.pack(player, ACTIONS.index(action), location, houses, dice[0], dice[1]))
+
+    def record_skip(self) -> None:
+        self.write(SKIP, b"")
+
+    def record_transfer(self, giver: int, receiver: int, location: int) -> None:
+        self.write(TRANSFER, TRANSFER_RECORD.pack(giver, receiver, location))
+
+    def record_cash(self, player: int, delta: int, reason: str) -> None:
+        self.write(CASH, CASH_RECORD.pack(player, delta) + reason.encode())
+
+    def close(self) -> None:
+        self.file.close()
+
+def read_records(path: str, start: int = 0):
+    """
+    Yields (offset, kind, body) for each complete record from the given offset. Stops at a partly written record.\n
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    offset = start
+    while offset + LENGTH.size + 1 <= len(data):
+        length = LENGTH.unpack_from(data, offset)[0]
+        end = offset + LENGTH.size + 1 + length
+        if end > len(data):
+            return
+        yield offset, data[offset + LENGTH.size], data[offset + LENGTH.size + 1:end]
+        offset = end
+
+def apply_record(engine: MonopolyEngine, kind: int, body: bytes) -> list:
+    """
+    Replays one record on a game and returns the engine's events\n
+    """
+    if kind == ACTION:
+        player, action, location, houses, die1, die2 = ACTION_RECORD.unpack(body)
+        action = ACTIONS[action]
+        if action == ROLL:
+            return engine.apply(ROLL, (die1, die2), player=player)
+        if action in (BUILD, SELL):
+            return engine.apply(action, location, houses, player=player)
+        if action in (MORTGAGE, UNMORTGAGE):
+            return engine.apply(action, location, player=player)
+        return engine.apply(action, player=player)
+    if kind == SKIP:
+        return engine.skip_turn()
+    if kind == TRANSFER:
+        giver, receiver, location = TRANSFER_RECORD.unpack(body)
+        events = []
+        engine.transfer(engine.players[giver], engine.players[receiver], location, events)
+        return events
+    if kind == CASH:
+        player, delta = CASH_RECORD.unpack_from(body)
+        return engine.adjust_cash(player, delta, body[CASH_RECORD.size:].decode())
+    return []
+
+def last_snapshot(path: str) -> int:
+    """
+    Offset of the latest snapshot in a log, from the .idx file if it is there, otherwise by scanning\n
+    """
+    try:
+        with open(path + ".idx", "rb") as index:
+            return struct.unpack("<Q", index.read(8))[0]
+    except (OSError, struct.error):
+        offset = None
+        for position, kind, _ in read_records(path):
+            if kind == SNAPSHOT:
+                offset = position
+        if offset is None:
+            raise ValueError(f"{path} has no snapshot.")
+        return offset
+
+def recover(path: str, fsync: bool = False) -> MonopolyEngine:
+    """
+    Description:
+        Rebuilds a game from its log: loads the latest snapshot and replays the records after it.
+        The log is reattached, so the game carries on appending to it.
+    Parameters:
+        path (str): Log file.
+        fsync (bool): See GameLog.
+    Returns:
+        MonopolyEngine: The recovered game.
+    """
+    engine = None
+    for _, kind, body in read_records(path, last_snapshot(path)):
+        if kind == SNAPSHOT:
+            engine = decode_snapshot(body)
+        else:
+            apply_record(engine, kind, body)
+    engine.log = GameLog(path, fsync)
+    return engine
+
+def replay(path: str):
+    """
+    Replays a whole log from its first snapshot. Yields (engine, kind, events) after each record.\n
+    Snapshots after the first are yielded with their bytes as events, so callers can compare states.\n
+    """
+    engine = None
+    for _, kind, body in read_records(path):
+        if kind == SNAPSHOT:
+            if engine is None:
+                engine = decode_snapshot(body)
+                yield engine, kind, []
+            else:
+                yield engine, kind, body
+            continue
+        yield engine, kind, apply_record(engine, kind, body)
+
+def verify(path: str) -> int:
+    """
+    Replays a log from the start and checks the game matches every later snapshot. For regression tests:
+    a rules change that alters the outcome of a recorded game makes this fail.\n
+    Returns the number of snapshots matched, raises AssertionError on the first mismatch\n
+    """
+    matched = 0
+    for engine, kind, events in replay(path):
+        if kind == SNAPSHOT and events:
+            assert encode_snapshot(engine)[:-RNG_RECORD.size] == events[:-RNG_RECORD.size], f"State differs from snapshot {matched + 1}"
+            matched += 1
+    return matched
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m monopoly_directory.gamelog <file.tmlog> [--verify]")
+        sys.exit(1)
+    if "--verify" in sys.argv:
+        print(f"Replay matches all {verify(sys.argv[1])} snapshots.")
+        sys.exit()
+    import monopoly_directory.monopoly as mply
+    for engine, kind, events in replay(sys.argv[1]):
+        if kind == SNAPSHOT and not events:
+            mply.players, mply.board = engine.players, engine.board # All describe() needs, without drawing anything
+            continue
+        for event in events if kind != SNAPSHOT else []:
+            line = mply.describe(event) if event[0] != "rejected" else f"(rejected: {event[2]})"
+            if line is not None:
+                print(line + "\033[0m")
@@ -0,0 +1,96 @@
+# Leaderboard order, kept up to date as players' state changes instead of sorted again for every frame.
+# A change re-scores only the player it concerns and moves them past their neighbours until they are in
+# place. An update costs the places moved: usually one or none, though a large rent or casino payment can
+# move a player several. The renderer only rebuilds the leaderboard while dirty is set.
+#
+# Players are ranked by cash (what the leaderboard has always shown) or by net worth: cash plus property at
+# price (mortgage value if mortgaged) and houses at cost, see MonopolyEngine.net_worth. Net worth also changes
+# when property changes hands, is mortgaged or is built on, and is recomputed for that one player when it does.
+# Bankrupt players sink to the bottom.
+from monopoly_directory.engine import MonopolyEngine
+
+CASH = "cash"
+NET_WORTH = "net worth"
+RANKINGS = (CASH, NET_WORTH)
+# Kinds of state change (see MonopolyPlayer.changed) that change a player's score, per ranking.
+# "owner" covers going bankrupt.
+SCORED_CHANGES = {CASH: ("cash", "owner"), NET_WORTH: ("cash", "owner", "improvements")}
+
+class Leaderboard:
+    """
+    Players of one game, best first\n
+    """
+    def __init__(self, engine: MonopolyEngine, ranking: str = CASH) -> None:
+        """
+        @ranking: CASH or NET_WORTH\n
+        """
+        self.engine = engine
+        self.ranking = ranking
+        self.rank()
+
+    def rank(self) -> None:
+        """
+        Scores every player and sorts them, from scratch\n
+        """
+        self.scores = [self.score(i) for i in range(len(self.engine.players))]
+        self.order = sorted(range(len(self.scores)), key=self.key, reverse=True)
+        self.position = [0] * len(self.order) # Player -> index in order
+        for i, player in enumerate(self.order):
+            self.position[player] = i
+        self.dirty = True
+
+    def set_ranking(self, ranking: str) -> None:
+        """
+        Rank by CASH or NET_WORTH from now on\n
+        """
+        if ranking not in RANKINGS:
+            raise ValueError(f"Unknown ranking {ranking}, expected one of {', '.join(RANKINGS)}.")
+        if ranking != self.ranking:
+            self.ranking = ranking
+            self.rank()
+
+    def score(self, player: int) -> int:
+        """
+        What the player is ranked on\n
+        """
+        if self.ranking == NET_WORTH:
+            return self.engine.net_worth(player)
+        return self.engine.players[player].cash
+
+    def key(self, player: int) -> tuple:
+        """
+        Sort key, higher is better: players still in first, then by score, ties in seat order\n
+        """
+        return (self.engine.players[player].order != -1, self.scores[player], -player)
+
+    def changed(self, player: int, kind: str) -> None:
+        """
+        Re-scores a player after part of their state changed, and moves them to their new place\n
+        @kind: kind of change, see MonopolyPlayer.changed. Ignored unless it affects the ranking.\n
+        """
+        if kind not in SCORED_CHANGES[self.ranking]:
+            return
+        score = self.score(player)
+        if score == self.scores[player] and kind != "owner":
+            return
+        self.scores[player] = score
+        self.dirty = True
+        order, position, key = self.order, self.position, self.key(player)
+        i = position[player]
+        while i > 0 and self.key(order[i - 1]) < key:
+            order[i] = order[i - 1]
+            position[order[i]] = i
+            i -= 1
+        while i < len(order) - 1 and self.key(order[i + 1]) > key:
+            order[i] = order[i + 1]
+            position[order[i]] = i
+            i += 1
+        order[i] = player
+        position[player] = i
+
+    def rows(self) -> list:
+        """
+        (player, score) best first, bankrupt players included last. Clears dirty.\n
+        """
+        self.dirty = False
+        return [(player, self.scores[player]) for player in self.order]
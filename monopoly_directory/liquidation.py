@@ -0,0 +1,98 @@
+# Settles a player's debt without asking them anything: works out which houses to sell and which properties
+# to mortgage to get back to $0, and carries the plan out through the engine (so every step is logged like a
+# player's own). The Banker runs it when an indebted player's turn times out; a player who can't cover the
+# debt goes bankrupt, their assets going to whoever they owe (see MonopolyEngine.bankrupt).
+#
+# Mortgaging costs nothing now (10% later, to lift it), selling a house loses half its price, so a plan:
+#   1. mortgages properties in unimproved groups, those giving up the least rent per dollar first,
+#   2. then sells houses, one at a time from the most built-up lot, in the groups earning the least per house,
+#      mortgaging a group's lots once its last house is sold,
+#   3. then leaves out any mortgage that turned out not to be needed, least worthwhile first.
+# One pass over the player's properties and groups, plus a sort of at most 28 candidates. No recursion.
+from monopoly_directory.engine import MonopolyEngine, SELL, MORTGAGE, BANKRUPT
+from monopoly_directory.properties import RENTS, HOUSES, MODIFIER
+from monopoly_directory.ownership import GROUP_OF, UTILITIES
+from monopoly_directory.player_class import MonopolyPlayer
+
+AVERAGE_ROLL = 7 # Utility rent is a multiple of the dice
+
+def income(engine: MonopolyEngine, location: int, houses: int = None) -> int:
+    """
+    Rent a property earns on an average roll\n
+    @houses: as if it had this many houses (for railroads and utilities, the number owned), defaults to what it has\n
+    """
+    state = engine.board.state
+    houses = state[HOUSES + location] if houses is None else houses
+    return RENTS[location][houses] * state[MODIFIER + location] * (AVERAGE_ROLL if location in UTILITIES else 1)
+
+def plan(engine: MonopolyEngine, p: MonopolyPlayer, needed: int = None) -> list:
+    """
+    Cheapest way to raise cash from a player's property\n
+    @needed: cash to raise, defaults to the player's debt\n
+    Returns a list of actions for MonopolyEngine.apply ((SELL, location, houses) and (MORTGAGE, location)),
+    empty if nothing is needed, or None if everything the player owns would not be enough.\n
+    """
+    needed = -p.cash if needed is None else needed
+    if needed <= 0:
+        return []
+    board = engine.board
+    mortgages, improved = [], []
+    for prop in p.properties:
+        loc = prop.location
+        if loc in GROUP_OF and board.ownership.group_improved(loc):
+            if loc == GROUP_OF[loc][0]: # Each group once
+                improved.append(GROUP_OF[loc])
+        elif engine.can_mortgage(p, loc) is None:
+            mortgages.append(prop)
+    mortgages.sort(key=lambda prop: income(engine, prop.location) / prop.mortgage)
+    steps, raised = [], 0
+    for prop in mortgages:
+        if raised >= needed:
+            break
+        steps.append((MORTGAGE, prop.location))
+        raised += prop.mortgage
+    # Groups earning the least per house first. A player with houses owns the whole group.
+    improved.sort(key=lambda group: sum(income(engine, loc) for loc in group) / sum(board.locations[loc].houses for loc in group))
+    for group in improved:
+        if raised >= needed:
+            break
+        houses = {loc: board.locations[loc].houses for loc in group}
+        refund = board.locations[group[0]].housePrice // 2
+        sold = dict.fromkeys(group, 0)
+        while raised < needed and any(houses.values()):
+            loc = max(group, key=houses.get) # Keep the group evenly built
+            houses[loc] -= 1
+            sold[loc] += 1
+            raised += refund
+        steps += [(SELL, loc, count) for loc, count in sold.items() if count]
+        if raised < needed: # Group cleared, its lots can be mortgaged now
+            for loc in sorted(group, key=lambda loc: income(engine, loc, 0) / board.locations[loc].mortgage):
+                if raised >= needed:
+                    break
+                if not board.locations[loc].mortgaged:
+                    steps.append((MORTGAGE, loc))
+                    raised += board.locations[loc].mortgage
+    if raised < needed:
+        return None
+    for step in reversed(steps[:]): # Mortgages not needed after all, once the later steps are counted
+        if step[0] == MORTGAGE and raised - board.locations[step[1]].mortgage >= needed:
+            steps.remove(step)
+            raised -= board.locations[step[1]].mortgage
+    return steps
+
+def resolve(engine: MonopolyEngine, player: int) -> list:
+    """
+    Settle a player's debt: carry out plan(), or declare them bankrupt if it can't be covered\n
+    Bankruptcy waits for the player's own turn, off-turn (e.g. after the casino) only the plan is carried out.\n
+    Returns the events.\n
+    """
+    p = engine.players[player]
+    if p.order == -1 or p.cash >= 0:
+        return []
+    steps = plan(engine, p)
+    if steps is None:
+        return engine.apply(BANKRUPT, player=player) if player == engine.turn else []
+    events = []
+    for step in steps:
+        events += engine.apply(*step, player=player)
+    return events
@@ -1,40 +1,95 @@
 # Monopoly game is played on Banker's terminal. 
-import random
+import functools
 import os
 import textwrap
+from collections import deque, namedtuple
 from monopoly_directory.properties import Property
-from monopoly_directory.cards import Cards
-from monopoly_directory.board import Board
 from monopoly_directory.player_class import MonopolyPlayer
-from utils.screenspace import calibrate_screen, make_fullscreen, clear_screen, MYCOLORS as COLORS, set_cursor_str, g
+from monopoly_directory import analytics, liquidation
+from monopoly_directory.gamelog import GameLog
+from monopoly_directory.leaderboard import Leaderboard, RANKINGS, CASH as RANK_BY_CASH
+from monopoly_directory.engine import MonopolyEngine, ROLL, BUY, DECLINE, BUILD, SELL, MORTGAGE, UNMORTGAGE, PAY_FINE, USE_JAIL_CARD, END_TURN, ROLL_PHASE, BUY_PHASE, MANAGE_PHASE, GAME_OVER, INCOME_TAX
+from utils.screenspace import calibrate_screen, make_fullscreen, clear_screen, MYCOLORS as COLORS, set_cursor_str, g, optimize_ansi
 
 mode = "normal"
-output = ""
 gameboard = ""
 board = None
-history = []
+HISTORY_LINES = 30 # Rows of the history panel
+HISTORY_WIDTH = 40
+STATUS_LINES = 27 # Rows of the status panel, above the leaderboard
+history = deque(maxlen=HISTORY_LINES) # Panel lines, already wrapped and padded to HISTORY_WIDTH. The oldest scroll off.
 status = []
 CASH = 0 # Defined by unittest or set by player
 num_players = 2
 bankrupts = 0
 players = []
+engine = None # MonopolyEngine holding the rules and state. board, players and turn above mirror it for rendering.
+decks = None
 border = g.get('history and status')
 border = border.split("\n")
 turn = 0
-
-def get_gameboard() -> str:
+turn_listeners = [] # Called with the new turn whenever it changes (e.g. banker's TurnController.turn_changed)
+ranking = RANK_BY_CASH # What the leaderboard ranks players by, see leaderboard.py
+leaderboard = None # Leaderboard of the current game, kept in order as players change
+
+# The board is drawn as a stack of layers, bottom to top. Each layer caches the string it last
+# rendered and is only rebuilt once a state change that affects it marks it dirty.
+LAYERS = ("background", "tiles", "improvements", "tokens", "history", "status", "leaderboard")
+BOARD_LAYERS = ("background", "tiles", "improvements", "tokens") # These overlap each other on the board
+layer_cache = dict.fromkeys(LAYERS, "")
+layer_builds = dict.fromkeys(LAYERS, 0) # Times each layer has been rebuilt, so a stream of changes (see get_changes) knows what it missed
+dirty_layers = set(LAYERS)
+# Which layers each kind of state change (see MonopolyPlayer.changed) invalidates
+# The leaderboard is invalidated by the Leaderboard itself, only when its rows change (see player_changed).
+CHANGE_LAYERS = {"cash": (), "location": ("tokens",), "owner": ("tiles",), 
+                 "improvements": ("improvements",), "history": ("history",), "status": ("status",),
+                 "jail": (), "cards": (), "turn": ()}
+token_cells = {} # Cells the tokens layer drew last frame, mapped to the board character underneath
+improved_tiles = set() # Tiles the improvements layer drew on last frame
+status_rows = 0 # Rows the status layer drew last frame
+
+# Game state version, bumped by every mutation. Banker frames are memoized on (version, viewer),
+# so repeated requests between mutations are served without rendering anything.
+state_version = 0
+frame_cache = {}
+
+# Immutable view of the game for threads that only read it (see view() and utils/game_actor.py)
+GameView = namedtuple("GameView", ["version", "turn", "phase", "players"])
+PlayerView = namedtuple("PlayerView", ["name", "order", "cash", "location", "jail", "properties"]) # properties: owned locations
+last_view = None
+
+def get_gameboard(viewer: int = None) -> str:
     """
     Get the gameboard\n
+    In banker mode this is a pure function of the game state: the frame is memoized on
+    (state_version, viewer) and nothing is written anywhere.\n
+    @viewer: id of the player the frame is for, None for a neutral view\n
     """
-    global output
-    output = ""
-    print_commands()
-    refresh_h_and_s()
-    refresh_board()
-    if mode == "banker":
-        return output
-    else:
-        print(output)
+    if mode != "banker":
+        draw_layers(*LAYERS)
+        return
+    key = (state_version, viewer)
+    frame = frame_cache.get(key)
+    if frame is None:
+        if any(cached[0] != state_version for cached in frame_cache):
+            frame_cache.clear() # Only frames of the current version can be requested again
+        frame = optimize_ansi(render_layers(LAYERS, True))
+        frame_cache[key] = frame
+    return frame
+
+def view() -> GameView:
+    """
+    Immutable snapshot of the game: turn, phase and each player's cash, location and properties.
+    Rebuilt only after the state changed.\n
+    """
+    global last_view
+    if engine is None:
+        return None
+    if last_view is None or last_view.version != (state_version, engine.turn, engine.phase):
+        last_view = GameView((state_version, engine.turn, engine.phase), engine.turn, engine.phase,
+                             tuple(PlayerView(p.name, p.order, p.cash, p.location, p.jail, tuple(prop.location for prop in p.properties))
+                                   for p in engine.players))
+    return last_view
 
 def get_deed(location: int) -> Property:
     """
@@ -43,108 +98,281 @@ def get_deed(location: int) -> Property:
     return board.locations[location]
 
 def add_to_output(s):
-    global output
-    if mode == "banker":
-        output += s
-    else:
+    """
+    Print to the local terminal. Banker frames are only ever built by get_gameboard, so this
+    does nothing in banker mode.\n
+    """
+    if mode != "banker":
         print(s, end="")
 
-def refresh_board():
+def invalidate(*layers: str) -> None:
     """
-    Refresh the gameboard\n
+    Mark render layers dirty so the next frame rebuilds them, and bump the state version. 
+    No arguments marks every layer.\n
     """
-    
-    add_to_output(COLORS.RESET + set_cursor_str(0,0))
-    add_to_output(gameboard)
-    for i in range(40): 
-        # This loop paints the properties on the board with respective color schemes
-        color = board.locations[i].color
-        backcolor = board.locations[i].color.replace("38", "48")
-        add_to_output(COLORS.backBLACK + color + f"\033[{board.locations[i].x};{board.locations[i].y}H{i}" + backcolor + " " * (4 + (1 if i < 10 else 0)))
-        
-        if(board.locations[i].owner != -1): # If owned
-            add_to_output(COLORS.RESET)
-            color = f"\033[38;5;{board.locations[i].owner+1}m"
-            add_to_output(f"\033[{board.locations[i].x+2};{board.locations[i].y}H" + color + "▀")
-
-        if(board.locations[i].owner == -3): # If community chest
-            add_to_output(COLORS.RESET)
-            add_to_output(f"\033[{board.locations[i].x + 1};{board.locations[i].y}H" + COLORS.COMMUNITY + "█" * 6)
-            add_to_output(f"\033[{board.locations[i].x + 2};{board.locations[i].y}H" + COLORS.COMMUNITY + "▀" * 6)
-
-        if(board.locations[i].owner == -4): # If chance
-            add_to_output(COLORS.RESET)
-            add_to_output(f"\033[{board.locations[i].x + 1};{board.locations[i].y}H" + COLORS.CHANCE + "█" * 6)
-            add_to_output(f"\033[{board.locations[i].x + 2};{board.locations[i].y}H" + COLORS.CHANCE + "▀" * 6)
-        
-        if(board.locations[i].houses > 0): # If there are houses
-            add_to_output(COLORS.RESET)
-            add_to_output(f"\033[{board.locations[i].x+2};{board.locations[i].y+1}H" + COLORS.GREEN + "▀" * (board.locations[i].houses))
-        
-        if(board.locations[i].houses == 5): # If there is a hotel
-            add_to_output(COLORS.RESET)
-            add_to_output(f"\033[{board.locations[i].x+2};{board.locations[i].y+5}H" + COLORS.RED + "▀")
-
-        if(board.locations[i].mortgaged): # If mortgaged
-            add_to_output(COLORS.RESET)
-            add_to_output(f"\033[{board.locations[i].x+1};{board.locations[i].y}H" + COLORS.backLIGHTGRAY + "M")
-            add_to_output(f"\033[{board.locations[i].x+1};{board.locations[i].y}H" + COLORS.backLIGHTGRAY + "M")
-
-    add_to_output(COLORS.RESET)
+    global state_version
+    state_version += 1
+    dirty_layers.update(layers if layers else LAYERS)
+
+def player_changed(player: int, kind: str) -> None:
+    """
+    Listener for MonopolyPlayer.changed: moves the player on the leaderboard, then invalidates what else shows that kind of state\n
+    """
+    leaderboard.changed(player, kind)
+    if leaderboard.dirty:
+        dirty_layers.add("leaderboard") # state_changed bumps the version
+    state_changed(kind)
+
+def state_changed(kind: str) -> None:
+    """
+    Listener for MonopolyPlayer.changed, invalidates the layers showing that kind of state\n
+    """
+    if CHANGE_LAYERS[kind]:
+        invalidate(*CHANGE_LAYERS[kind])
+    else:
+        bump_version()
+
+def bump_version() -> None:
+    """
+    Record a mutation that is not visible on the board (turn, jail state, deck order)\n
+    """
+    global state_version
+    state_version += 1
+
+def render_layers(names: tuple, whole_frame: bool) -> str:
+    """
+    Render the given layers in stacking order, rebuilding only the dirty ones\n
+    @whole_frame: emit every layer (from cache if clean). Otherwise only rebuilt layers, 
+    and any layer stacked on top of a repainted one, are emitted.\n
+    """
+    s = ""
+    background_drawn = False
+    board_drawn = False
+    for name in LAYERS:
+        if name not in names:
+            continue
+        rebuilt = name in dirty_layers
+        if rebuilt:
+            rebuild(name)
+        if rebuilt or whole_frame or background_drawn or (board_drawn and name in BOARD_LAYERS):
+            s += layer_cache[name]
+            background_drawn = background_drawn or name == "background"
+            board_drawn = board_drawn or name in BOARD_LAYERS
+    return s
+
+def rebuild(name: str) -> None:
+    """
+    Render one layer into the cache\n
+    """
+    layer_cache[name] = LAYER_RENDERERS[name]()
+    layer_builds[name] += 1
+    dirty_layers.discard(name)
+
+def get_changes(seen: dict) -> str:
+    """
+    Banker mode: what changed on the board since the frame described by seen, for a terminal that
+    already shows that frame (spectators, see utils/spectators.py). Layers are emitted as in render_layers.\n
+    Some layers only erase what their previous build drew, so if one was rebuilt more than once in
+    between, the whole frame is sent instead.\n
+    @seen: layer -> build count of the frame the terminal shows, {} for none. Updated to the new frame.\n
+    """
+    for name in LAYERS:
+        if name in dirty_layers:
+            rebuild(name)
+    whole_frame = any(layer_builds[name] - seen.get(name, 0) > 1 for name in LAYERS)
+    s = ""
+    background_drawn = False
+    board_drawn = False
+    for name in LAYERS:
+        if whole_frame or layer_builds[name] != seen.get(name) or background_drawn or (board_drawn and name in BOARD_LAYERS):
+            s += layer_cache[name]
+            background_drawn = background_drawn or name == "background"
+            board_drawn = board_drawn or name in BOARD_LAYERS
+    seen.update(layer_builds)
+    return optimize_ansi(s) if s else ""
+
+def draw_layers(*names: str) -> None:
+    """
+    Draw layers to the local terminal, which keeps what it last drew, so only changes are printed\n
+    Does nothing in banker mode, where frames are only built on request (get_gameboard, get_changes).\n
+    """
+    if mode == "banker":
+        return
+    add_to_output(optimize_ansi(render_layers(names, False)))
+
+def render_background() -> str:
+    """
+    Static layer: gameboard art, commands box and the history/status border\n
+    """
+    s = COLORS.RESET + set_cursor_str(0, 0) + gameboard
+    commandsinfo = g.get('commands').split("\n")
+    for i in range(len(commandsinfo)):
+        s += f"\033[{34+i};79H" + commandsinfo[i]
+    for i in range(len(border)):
+        s += f"\033[{i};79H" + border[i]
+    return s
 
+def render_tiles() -> str:
+    """
+    Tile colors, card spaces and ownership markers\n
+    """
+    s = ""
+    for i in range(40):
+        # This loop paints the properties on the board with respective color schemes
+        loc = board.locations[i]
+        backcolor = loc.color.replace("38", "48")
+        s += COLORS.backBLACK + loc.color + f"\033[{loc.x};{loc.y}H{i}" + backcolor + " " * (4 + (1 if i < 10 else 0)) + COLORS.RESET
+
+        if loc.owner == -3 or loc.owner == -4: # If community chest or chance
+            deck_color = COLORS.COMMUNITY if loc.owner == -3 else COLORS.CHANCE
+            s += f"\033[{loc.x + 1};{loc.y}H" + deck_color + "█" * 6
+            s += f"\033[{loc.x + 2};{loc.y}H" + "▀" * 6 + COLORS.RESET
+        elif loc.purchasePrice != 0: # Ownership marker, plain when unowned so a lost property is cleared
+            color = f"\033[38;5;{loc.owner+1}m" if loc.owner >= 0 else ""
+            s += f"\033[{loc.x+2};{loc.y}H" + color + "▀" + COLORS.RESET
+    return s
+
+def render_improvements() -> str:
+    """
+    Houses, hotels and mortgages. Tiles that lost an improvement are repainted plain.\n
+    """
+    global improved_tiles
+    s = ""
+    improved = set()
+    for i in range(40):
+        loc = board.locations[i]
+        if loc.houses > 0 or loc.mortgaged:
+            improved.add(i)
+        elif i not in improved_tiles:
+            continue
+        houses = min(loc.houses, 4)
+        s += f"\033[{loc.x+2};{loc.y+1}H" + COLORS.GREEN + "▀" * houses + COLORS.RESET + "▀" * (4 - houses)
+        s += (COLORS.RED if loc.houses == 5 else "") + "▀" + COLORS.RESET # Hotel
+        s += f"\033[{loc.x+1};{loc.y}H" + (COLORS.backLIGHTGRAY + "M" if loc.mortgaged else "█") + COLORS.RESET
+    improved_tiles = improved
+    return s
+
+def render_tokens() -> str:
+    """
+    Player tokens. Cells a token left are repainted with the board underneath.\n
+    """
+    global token_cells
+    cells = {}
+    tokens = ""
+    art = gameboard.split("\n")
     for i in range(num_players):
-        color = COLORS.playerColors[i]
-        token = "◙"
-        add_to_output(color + f"\033[{board.locations[players[i].location].x+1};{board.locations[players[i].location].y+1+i}H{token}")
-    
-    add_to_output(COLORS.RESET)
+        loc = board.locations[players[i].location]
+        row = art[loc.x] if loc.x < len(art) else "" # The token's cell is row loc.x+1, column loc.y+1+i, counting from 1
+        under = (COLORS.COMMUNITY if loc.owner == -3 else COLORS.CHANCE if loc.owner == -4 else "") + (row[loc.y + i] if loc.y + i < len(row) else " ")
+        cells[(loc.x+1, loc.y+1+i)] = under
+        tokens += COLORS.playerColors[i] + f"\033[{loc.x+1};{loc.y+1+i}H◙"
+    s = COLORS.RESET
+    for (x, y), under in token_cells.items():
+        if (x, y) not in cells:
+            s += f"\033[{x};{y}H" + under + COLORS.RESET
+    token_cells = cells
+    return s + tokens + COLORS.RESET
+
+def render_history() -> str:
+    """
+    History panel\n
+    """
+    return "".join(f"\033[{i+4};81H" + line + COLORS.RESET for i, line in enumerate(history))
+
+def render_status() -> str:
+    """
+    Status panel. Rows left over from a longer previous status are blanked.\n
+    """
+    global status_rows
+    s = ""
+    for i in range(max(len(status), status_rows)):
+        if i < status_rows:
+            s += f"\033[{i+4};122H" + " " * 34
+        if i < len(status):
+            s += f"\033[{i+4};122H" + status[i] + COLORS.RESET
+    status_rows = len(status)
+    return s
+
+def render_leaderboard() -> str:
+    """
+    Leaderboard, richest player first (by cash or net worth, see set_ranking). Bankrupt players' rows are blank.\n
+    """
+    s = ""
+    for i, (player, score) in enumerate(leaderboard.rows()):
+        p = players[player]
+        if p.order != -1:
+            s += COLORS.playerColors[p.order] + f"\033[{31+i};122H" + f"{p.name} - ${score}".ljust(34) + COLORS.RESET
+        else:
+            s += f"\033[{31+i};122H" + " " * 34
+    return s
+
+def set_ranking(name: str) -> None:
+    """
+    Rank the leaderboard by leaderboard.CASH or leaderboard.NET_WORTH, for this game and the next\n
+    """
+    global ranking
+    if name not in RANKINGS:
+        raise ValueError(f"Unknown ranking {name}, expected one of {', '.join(RANKINGS)}.")
+    ranking = name
+    if leaderboard is not None:
+        leaderboard.set_ranking(name)
+        invalidate("leaderboard")
+
+LAYER_RENDERERS = {"background": render_background, "tiles": render_tiles, "improvements": render_improvements, 
+                   "tokens": render_tokens, "history": render_history, "status": render_status, 
+                   "leaderboard": render_leaderboard}
+
+def refresh_board():
+    """
+    Refresh the gameboard\n
+    """
+    draw_layers(*BOARD_LAYERS)
 
 def print_commands():
     """
     Print commands\n
     """
-    commandsinfo = g.get('commands').split("\n")
-    for i in range(len(commandsinfo)):
-        add_to_output(f"\033[{34+i};79H" + commandsinfo[i])
+    draw_layers("background")
 
 def update_history(message: str):
     """
     Update the history\n
-    Text added here needs to be a maximum of 40 characters, or wrap around\n
-    Split the text into multiple lines (multiple entries to history variable)\n
+    Only marks the history dirty, so whoever adds a batch of messages draws once after the last (see show_events)\n
     """
-    if "[38;5" in message: # If color is included in message
-        if(((40 - (len(message) - 9)) * 2) == 0):
-            history.append(message[:9] + "─" * ((40 - (len(message) - 9)) // 2) + message[9:] + "─" * ((40 - (len(message) - 9)) // 2))
-        else:
-            history.append(message[:9] + "─" * ((40 - (len(message) - 9)) // 2) + message[9:] + "─" * ((39 - (len(message) - 9)) // 2))
-    else:
-        wrapped_message = textwrap.wrap(message, 40)
-        for line in wrapped_message:
-            history.append(line + " " * (40 - len(line)))
-    while(len(history) > 30):
-        history.pop(0)
-    refresh_h_and_s()
+    history.extend(history_lines(message))
+    invalidate("history")
 
-def update_status(p: MonopolyPlayer, update: str, status: list = status, mode: str = "normal", property_id: str = ""):
+@functools.lru_cache(maxsize=1024)
+def history_lines(message: str) -> tuple:
+    """
+    A message as history lines, each HISTORY_WIDTH wide so it fully covers the line it replaces\n
+    Colored messages are headers, centered between rules. Others are wrapped over as many lines as they need.\n
+    Cached, as the same messages come up turn after turn.\n
     """
-    Updates the status textbox with the player's properties, or the deed of a property
+    if "[38;5" in message: # If color is included in message
+        padding = HISTORY_WIDTH - (len(message) - 9)
+        return (message[:9] + "─" * (padding // 2) + message[9:] + "─" * (padding - padding // 2),)
+    return tuple(line.ljust(HISTORY_WIDTH) for line in textwrap.wrap(message, HISTORY_WIDTH))
 
+def update_status(p: MonopolyPlayer, update: str, property_id: str = ""):
+    """
+    Updates the status textbox with the player's properties, or the deed of a property\n
+    Returns an error message for an invalid property #, otherwise None\n
     """
     # Property status update (list all properties of player)
     status.clear()
+    invalidate("status")
+    message = None
     if(update == "properties"):
         color = COLORS.playerColors[p.order]
         status.append(color + f"{p.name} has properties: " + COLORS.RESET)
         for i in range(len(p.properties)):
             status.append(f"{p.properties[i].location}: {p.properties[i].name}")
     if(update == "deed"):
-        if mode == "normal":
-            propertyid = input("What property to view? Enter property #")
-        else:
-            propertyid = property_id
         try:
-            location = board.locations[int(propertyid)]
+            if not 0 <= int(property_id) < len(board.locations):
+                raise ValueError
+            location = board.locations[int(property_id)]
             if location.owner > -1: # if the location is owned
                 color = COLORS.playerColors[location.owner]
                 status.append(f"Current owner: " + color + f"{players[location.owner]}" + COLORS.RESET)
@@ -160,6 +388,7 @@ def update_status(p: MonopolyPlayer, update: str, status: list = status, mode: s
                 status.append(f"Rent w 4 houses: {location.rent4H}")
                 status.append(f"Rent w hotel: {location.rentHotel}")
                 status.append(f"Mortgage Value: {location.mortgage}")
+                status.append(f"Expected rent per roll: {analytics.expected_rent(location.location, location.houses, location.modifier):.2f}")
             elif (location.owner >= -2 and location.rent == 0): # if is a railroad or utility
                 status.append(f"{location.color}=== {location.name} ===")
                 status.append(f"Purchase Price: {location.purchasePrice}")
@@ -168,238 +397,23 @@ def update_status(p: MonopolyPlayer, update: str, status: list = status, mode: s
                 status.append(f"Rent with 3 locations owned: {location.rent3H}")
                 status.append(f"Rent with 4 locations owned: {location.rent4H}")
                 status.append(f"Mortgage Value: {location.mortgage}")
+                status.append(f"Expected rent per roll: {analytics.expected_rent(location.location, max(location.houses, 1)):.2f}")
             else:
                 raise ValueError
         except ValueError:
-            add_to_output(f"Invalid input. Please enter a # for a property.")
-            if mode == "banker":
-                return get_gameboard() + set_cursor_str(0, 39) + f"[Deed Viewer]\nInvalid input. Please enter a # for a property."
+            message = "Invalid input. Please enter a # for a property."
+    if len(status) > STATUS_LINES: # Keep clear of the leaderboard
+        hidden = len(status) - STATUS_LINES + 1
+        del status[STATUS_LINES - 1:]
+        status.append(f"...and {hidden} more")
     refresh_h_and_s()
-    if mode == "banker":
-        return get_gameboard()
+    return message
 
 def refresh_h_and_s():
     """
     Refresh the history, status, and leaderboard\n
     """
-    # Refresh history
-    for i in range(len(border)):
-        add_to_output(f"\033[{i};79H")
-        if(len(history) - i<= 0):
-            for j in range(len(border[i])):
-                add_to_output(border[i][j])
-    for i in range(len(history)):
-        add_to_output(f"\033[{i+4};81H" + (history[i] if i < len(history) else "") + COLORS.RESET)
-    
-    # Refresh status
-    for i in range(len(status)):
-        add_to_output(f"\033[{i+4};122H" + status[i] if i < len(status) else "")
-    add_to_output(COLORS.RESET)
-
-    # Refresh leaderboard
-    sorted_players = sorted(players, key=lambda x: x.cash, reverse=True)
-    for i in range(len(sorted_players)):
-        if(sorted_players[i].order != -1):
-            color = COLORS.playerColors[sorted_players[i].order]
-            add_to_output(color + f"\033[{31+i};122H{sorted_players[i].name} - ${sorted_players[i].cash}" + COLORS.RESET)
-
-def buy_logic(mode: str = "normal", pinput: str = ""):
-    CL = players[turn].location
-    if mode == "normal":
-        choice = input(set_cursor_str(0, 36) + f"Buy {board.locations[CL].name} for ${board.locations[CL].purchasePrice}? (y/n) ")
-    else:
-        choice = pinput
-    if(board.locations[CL].purchasePrice != 0 and choice == 'y'):
-        price = board.locations[CL].purchasePrice
-        if(players[turn].cash > price):
-            players[turn].buy(CL, board)
-            board.locations[CL].owner = turn
-            update_history(f"{players[turn].name} bought {board.locations[CL].name} for ${price}")
-        else:
-            update_history(f"{players[turn].name} did not buy {board.locations[CL].name}")
-
-def housing_logic(p: MonopolyPlayer, mode: str = "normal", propertyid: str = "", num_houses: int = -1):
-    update_status(p, "properties")
-    if mode == "normal":
-        print(set_cursor_str(0, 38) + ' ' * 75)
-        propertyid = input(set_cursor_str(0, 38) + "What property do you want to build on? Enter property # or 'e' to exit.")
-    else:
-        if propertyid == "e":
-            return get_gameboard()
-        elif propertyid == "":
-            return get_gameboard() + set_cursor_str(0, 39) + f"[Property management]\nEnter an ID of one of your properties: {[propObject.location for propObject in p.properties]}" + COLORS.RESET
-    flag = True
-    exit_flag = False
-    try:   
-        if propertyid == 'e':
-            print("\033[37;0H " + ' ' * 70 + "\033[38;0H " + ' ' * 70 + "\033[39;0H " + ' ' * 70)
-            exit_flag = True
-        else:
-            propertyid =  int(propertyid)
-    except ValueError:
-        add_to_output(f"\033[42;0" + COLORS.RED + f"Invalid input, please enter a number in {[propObject.location for propObject in p.properties]}" + COLORS.RESET)
-        flag = False
-    if flag and not exit_flag:
-        if not propertyid in [propObject.location for propObject in p.properties]:
-            print("\033[40;0HYou do not own this property!")
-        else: 
-            family = board.locations[propertyid].color
-            if family == COLORS.CYAN or family == COLORS.LIGHTBLACK or board.locations[propertyid].name.startswith("Electric"):
-                print("\033[40;0HThis property cannot be improved.")
-                flag = False
-                if mode == "banker":
-                    return get_gameboard() + set_cursor_str(0, 40) + "This property cannot be improved."
-            if flag: 
-                for i in range(propertyid-3 if propertyid > 3 else 0, propertyid+5 if propertyid < 35 else 39): # check only a few properties around for efficiency
-                    if board.locations[i].color == family:
-                        if not i in [propObject.location for propObject in p.properties]:
-                            print("\033[40;0HYou do not own a monopoly on these properties!")
-                            flag = False
-                            if mode == "banker":
-                                return get_gameboard() + set_cursor_str(0, 40) + "You do not own a monopoly on these properties!"  
-            if flag and board.locations[propertyid].mortgaged:
-                add_to_output("This property is mortaged.")
-                flag = False
-                if mode == "banker":
-                    return get_gameboard() + set_cursor_str(0, 40) + "This property is mortaged."
-            if flag:
-                cost = 0
-                if flag:
-                    if 0 < propertyid < 10:
-                        cost = 50
-                    elif 10 < propertyid < 20:
-                        cost = 100
-                    elif 20 < propertyid < 30:
-                        cost = 150
-                    elif 30 < propertyid < 40:
-                        cost = 200
-                    max_houses = 5 - board.locations[propertyid].houses
-                    if mode == "normal":
-                        houses = input(f"Cost of housing is ${cost}. How many houses would you like to buy? (Max {max_houses}/min 0)")
-                    if mode == "normal":
-                        try:
-                            houses = int(houses)
-                            if(0 < houses and houses <= max_houses):
-                                p.cash -= board.locations[propertyid].housePrice * houses
-                                update_history(f"{p.name} bought {houses} house{'s' if houses != 1 else ''} on {board.locations[propertyid].name}!")
-                                board.locations[propertyid].houses += houses
-                                refresh_board()
-                            else:
-                                raise ValueError
-                        except ValueError:
-                            add_to_output(f"Invalid input. Please enter a number 0-{max_houses}")
-        
-    if not exit_flag:
-        if mode == "normal":
-            housing_logic(p)
-        elif choice == "s":
-            sell_logic(p)
-        elif choice == "m":
-            mortgage_logic(p)
-        else:
-            print("\033[38;0H" + ' ' * 70)
-            print("\033[38;0HInvalid option!")
-            return get_gameboard() + set_cursor_str(0, 39) + f"[Property management]\nEnter an ID of one of your properties: {[propObject.location for propObject in p.properties]}" + COLORS.RESET
-    return get_gameboard()
-
-def mortgage_logic(p:MonopolyPlayer):
-    update_status(p, "properties")
-    print("\033[38;0H" + " " * 78 +"\033[39;0H" + " " * 78 + "\033[40;0H" + " " * 78+"\033[41;0H" + " " * 78+"\033[39;0H")
-    propertyid = input("\033[38;0HWhat property to mortgage? Enter property # or 'e' to exit.")
-    flag = True
-    exit = False
-    try:   
-        if propertyid == 'e':
-            print("\033[37;0H " + ' ' * 70+ "\033[38;0H " + ' ' * 70 + "\033[39;0H " + ' ' * 70+ "\033[40;0H " + ' ' * 70+ "\033[41;0H " + ' ' * 70+ "\033[42;0H " + ' ' * 70)
-            exit = True
-        else:
-            propertyid =  int(propertyid)
-    except ValueError: ###AHHHHHHHH clean me please
-        print(f"\033[42;0" + COLORS.RED + f"Invalid input, please enter a number in {[propObject.location for propObject in p.properties]}", end=COLORS.RESET)
-        flag = False
-    if flag and not exit:
-        if not propertyid in [propObject.location for propObject in p.properties]:
-            print("\033[42;0HYou do not own this property!")
-        elif board.locations[propertyid].mortgage == 0:
-            print("\033[42;0HYou cannot mortgage this property!")
-        elif board.locations[propertyid].houses != 0 and board.locations[propertyid].rentHotel != 0:
-            print("\033[42;0HYou must sell your houses on this property first!")
-        elif board.locations[propertyid].mortgaged:
-            print("\033[39;0HThis property is already mortgaged!")
-            answer = input(f"\033[40;0HWould you like to repay your mortgage for ${board.locations[propertyid].mortgage * 1.1}? (y/n)")
-            if answer == 'y' or answer == 'Y':
-                price = board.locations[propertyid].mortgage * 1.1
-                if (players[turn].cash > price):
-                    board.locations[propertyid].mortgaged = False
-                    players[turn].cash -= int (price)
-                    board.locations[propertyid].mortgaged = False
-                    update_history(f"{players[turn].name} repaid their mortgage on {board.locations[propertyid].name}")
-        else:
-            p.cash += board.locations[propertyid].mortgage
-            board.locations[propertyid].mortgaged = True 
-            update_history(f"{p.name} mortgaged {board.locations[propertyid].name}!")
-    if not exit:
-        refresh_board()
-        mortgage_logic(p)
-    
-def sell_logic(p:MonopolyPlayer):
-    update_status(p, "properties")
-    propertyid = input("\033[38;0HWhat property to sell houses on? Enter property # or 'e' to exit."+"\033[39;0H" + " " * 70 + "\033[40;0H" + " " * 70+"\033[41;0H" + " " * 70+"\033[39;0H")
-    flag = True
-    exit = False
-    try:   
-        if propertyid == 'e':
-            print("\033[37;0H " + ' ' * 70+ "\033[38;0H " + ' ' * 70 + "\033[39;0H " + ' ' * 70)
-            exit = True
-        else:
-            propertyid =  int(propertyid)
-    except ValueError: ###AHHHHHHHH clean me please
-        print(f"\033[42;0" + COLORS.RED + f"Invalid input, please enter a number in {[propObject.location for propObject in p.properties]}", end=COLORS.RESET)
-        flag = False
-    if flag and not exit:
-        if not propertyid in [propObject.location for propObject in p.properties]:
-            print("\033[40;0HYou do not own this property!")
-        else: 
-            family = board.locations[propertyid].color
-            if family == COLORS.CYAN or family == COLORS.LIGHTBLACK or board.locations[propertyid].name.startswith("Electric"):
-                print("\033[40;0HThis property cannot have houses.")
-                flag = False
-            if flag and board.locations[propertyid].houses == 0: 
-                print("\033[40;0HYou do not own any house on this property!")
-                flag = False
-            if flag:
-                houses = input(f"Sell price is ${board.locations[propertyid].housePrice // 2}. How many houses would you like to sell? (Max {board.locations[propertyid].houses}/min 0)")
-                try:
-                    houses = int(houses)
-                    if (0 <= houses <= board.locations[propertyid].houses):
-                        p.cash += houses * board.locations[propertyid].housePrice // 2
-                        board.locations[propertyid].houses -= houses
-                        update_history(f"{p} sold {houses} house{'s' if houses > 1 else ''} on {board.locations[propertyid].name}!")
-                        refresh_board()
-                    else:
-                        raise ValueError
-                except ValueError:
-                    print(f"Invalid input. Please enter a number 0-{board.locations[propertyid].houses}")
-    if not exit:
-        sell_logic(p)
-
-def manage_properties(p:MonopolyPlayer):
-    print("\033[38;0H" + ' ' * 70)
-    update_status(p, "properties")
-    while True:
-        print("\033[37;0H" + ' ' * 70)
-        choice = input("\033[37;0He to exit, b to buy houses, s to sell houses, m to mortgage:")
-        if choice == "e":
-            break   
-        elif choice == "b":
-            housing_logic(p)
-        elif choice == "s":
-            sell_logic(p)
-        elif choice == "m":
-            mortgage_logic(p)
-        else:
-            print("\033[38;0H" + ' ' * 70)
-            print("\033[38;0HInvalid option!")
+    draw_layers("background", "history", "status", "leaderboard")
 
 def unittest(num:int = 5):
     global CASH, players # TODO cash should be set by Banker.py and passed to here
@@ -464,332 +478,269 @@ def bottom_screen_wipe():
     add_to_output(set_cursor_str(0, 42) + " " * 76)
     add_to_output(set_cursor_str(0, 36))
 
-#Rolls the dice and returns them for the player as a tuple
-def roll():
-    die1 = random.randint(1, 6)
-    die2 = random.randint(1, 6)
-    return(die1,die2)
-#The function that handles the players
-#second and third correspond to if its the players second or third consecutive turn, they are bools
-
-def player_roll(num_rolls, act: int = 0, mode: str = "normal") -> str:
-    print_commands()
-    bottom_screen_wipe()
-    if(players[turn].order != -1): # If player is not bankrupt
-        player_color = COLORS.playerColors[turn]
-        update_history(player_color + f"{players[turn].name}'s turn")
+def describe(event: tuple) -> str:
+    """
+    History line for an engine event, None for events that are not shown\n
+    @event: tuple, see MonopolyEngine\n
+    """
+    kind = event[0]
+    if kind == "game_over":
+        return COLORS.playerColors[event[1]] + f"{players[event[1]]} wins!" if event[1] is not None else "Game over."
+    p = players[event[1]]
+    if kind == "turn":
+        return COLORS.playerColors[event[1]] + f"{p.name}'s turn"
+    elif kind == "roll":
+        return f"{p} rolled {event[2]} and {event[3]}"
+    elif kind == "doubles":
+        return {1: f"{p} rolled doubles! Roll again.", 2: f"{p} rolled doubles!(X2) Roll again."}.get(event[2], f"{p} rolled doubles three times in a row!")
+    elif kind == "jail":
+        return f"{p} is going to jail!"
+    elif kind == "pass_go":
+        return f"{p} passed Go and received ${event[2]}"
+    elif kind == "land":
+        return "Just visiting!" if event[2] == 10 and not p.jail else f"{p.name} landed on {board.locations[event[2]].name}"
+    elif kind == "card":
+        return f"{p.name} drew a {'Chance' if event[2] == 'chance' else 'Community Chest'} card! {event[3]}"
+    elif kind == "tax":
+        return f"{p.name} paid {'income' if event[2] == INCOME_TAX else 'luxury'} tax (${event[2]})"
+    elif kind == "rent":
+        return f"{p.name} paid ${event[3]} to {players[event[2]].name}"
+    elif kind == "buy":
+        return f"{p.name} bought {board.locations[event[2]].name} for ${event[3]}"
+    elif kind == "decline":
+        return f"{p.name} did not buy {board.locations[event[2]].name}"
+    elif kind == "build":
+        return f"{p.name} bought {event[3]} house{'s' if event[3] != 1 else ''} on {board.locations[event[2]].name}!"
+    elif kind == "sell":
+        return f"{p} sold {event[3]} house{'s' if event[3] != 1 else ''} on {board.locations[event[2]].name}!"
+    elif kind == "mortgage":
+        return f"{p.name} mortgaged {board.locations[event[2]].name}!"
+    elif kind == "unmortgage":
+        return f"{p.name} repaid their mortgage on {board.locations[event[2]].name}"
+    elif kind == "jail_fine":
+        return f"{p.name} paid ${event[2]} to post bail."
+    elif kind == "jail_card":
+        return f"{p.name} used a Get Out of Jail Free card."
+    elif kind == "stay_in_jail":
+        return f"{p.name} didn't roll doubles and is still in jail. Turns in jail: {event[2]}"
+    elif kind == "leave_jail":
+        return f"{p.name} rolled doubles and got out of jail!" if event[2] == "doubles" else f"{p.name} didn't roll doubles on their third turn."
+    elif kind == "debt":
+        return f"{p} is in debt. Resolve debts before ending turn."
+    elif kind == "transfer":
+        return f"{p.name} gave {board.locations[event[3]].name} to {players[event[2]].name}"
+    elif kind == "cash":
+        return f"{p.name} {'received' if event[2] >= 0 else 'paid'} ${abs(event[2])}" + (f" ({event[3]})" if event[3] else "")
+    elif kind == "bankrupt":
+        return f"{p} declared bankruptcy."
+    elif kind == "end_turn":
+        return f"{p.name} ended their turn."
+    return None
+
+def show_events(events: list) -> list:
+    """
+    Render engine events: each becomes a history line. Returns the messages meant only
+    for the acting player (why an action was rejected).\n
+    @events: list of event tuples from MonopolyEngine.apply\n
+    """
+    messages = []
+    logged = False
+    for event in events:
+        if event[0] == "rejected":
+            messages.append(event[2])
+        else:
+            line = describe(event)
+            if line is not None:
+                update_history(line)
+                logged = True
+    if logged:
         refresh_h_and_s()
-        print_commands()
-
-        was_in_jail = players[turn].jail  # Flag to check if player was in jail before rolling
-        
-        if players[turn].jail:
-            if players[turn].jail_turns < 3:
-                while True:
-                    choice = input(f"\033[36;0HYou're in jail. Pay ${50*players[turn].repeat_offender} fine (f) or attempt to roll doubles (r)" + 
-                                  ( "\nYou have a Get Out of Jail Free card. (c) to use." if players[turn].jail_cards > 0 else ".")).lower().strip()
-                    if choice == 'f':
-                        players[turn].pay_jail_fine()
-                        update_history(f"{players[turn].name} paid ${50*players[turn].repeat_offender} to post bail.")
-                        break
-                    elif choice == 'c' and players[turn].jail_cards > 0:
-                        players[turn].use_jail_card()
-                        update_history(f"{players[turn].name} used a Get Out of Jail Free card.")
-                        break
-                    elif choice == 'r':
-                        update_history(f"{players[turn].name} will attempt to roll doubles.")
-                        break
-                    else:
-                        update_history(f"Invalid choice. Please enter (f) to pay fine or (r) to roll" + 
-                                   (". You have a Get Out of Jail Free card. (c) to use." if players[turn].jail_cards > 0 else "."))
-            else:
-                update_history(f"This is {players[turn].name}'s third turn in jail. They must attempt to roll doubles or they will pay the fine.")
-                
-        input("\033[36;0HRoll dice?")
-        dice = roll()
-        bottom_screen_wipe()
-        update_history(f"{players[turn]} rolled {dice[0]} and {dice[1]}")
-
-        if players[turn].jail:
-            left_jail, reason = players[turn].attempt_jail_roll(dice)
-            if left_jail:
-                if reason == "doubles":
-                    update_history(f"{players[turn].name} rolled doubles and got out of jail!")
-                elif reason == "third_turn":
-                    update_history(f"{players[turn].name} didn't roll doubles on their third turn. They paid ${50*players[turn].repeat_offender} to post bail.")
-                    players[turn].pay_jail_fine()
-            else:
-                update_history(f"{players[turn].name} didn't roll doubles and is still in jail. Turns in jail: {players[turn].jail_turns}")
-                return
-
-        refresh_board()
-        
-        # Only check for doubles if the player wasn't in jail at the start of their turn
-        if dice[0] == dice[1] and not was_in_jail:
-            if num_rolls == 1:
-                update_history(f"{players[turn]} rolled doubles! Roll again.")
-
-            elif num_rolls == 2:
-                update_history(f"{players[turn].name} rolled doubles!(X2) Roll again.")
-
-            elif num_rolls == 3:
-                update_history(f"{players[turn].name} rolled doubles three times in a row!")
-                update_history(f"{players[turn].name} is going to jail!")
-                players[turn].go_to_jail()
-                # board.locations[players[turn].location].players.remove(turn)
-                board.locations[10].players.append(turn)
-                refresh_board()
-                return
-
-        refresh_board()
-        #if player rolled their third double they will be in jail and their location doesn't update
-        if players[turn].jail == False:
-            if (players[turn].location + dice[0] + dice[1]) > 39:  # checks if player passed go
-                update_history(f"{players[turn]} passed Go and received $200")
-            board.update_location(players[turn], dice[0] + dice[1])
-            update_history(f"{players[turn].name} landed on {board.locations[players[turn].location].name}")
-            refresh_board()
-        done_moving_around = False
-        card = ""
-        while not done_moving_around and not players[turn].jail:
-            done_moving_around = True
-            if board.locations[players[turn].location].owner < 0:
-                if (board.locations[players[turn].location].owner == -1): #unowned
-                    buy_logic()
-                elif (board.locations[players[turn].location].owner == -2): #mortgaged
-                    pass
-                elif (board.locations[players[turn].location].owner == -3): #community chest
-                    old_loc = players[turn].location
-                    card = decks.draw_community_chest(players[turn], board, players)
-                    new_loc = players[turn].location
-                    update_history(f"{players[turn].name} drew a Community Chest card! {card}")
-                    if old_loc > new_loc and new_loc != 10 and new_loc != players[turn].location - 3:  #check if chance card made player pass go
-                        update_history(f"{players[turn]} passed Go and received $200")
-                elif (board.locations[players[turn].location].owner == -4): #chance
-                    old_loc = players[turn].location
-                    card = decks.draw_chance(players[turn], board, players)
-                    new_loc = players[turn].location
-                    update_history(f"{players[turn].name} drew a Chance card! {card}")
-                    if old_loc > new_loc and new_loc != 10 and new_loc != players[turn].location - 3:  #check if chance card made player pass go
-                        update_history(f"{players[turn]} passed Go and received $200")
-                    if (board.locations[players[turn].location].owner != -4):
-                        done_moving_around = False  # only case where loop is needed
-                elif (board.locations[players[turn].location].owner == -5): #income tax
-                    players[turn].pay(200)
-                    update_history(f"{players[turn].name} paid income tax ($200)")
-                elif (board.locations[players[turn].location].owner == -6):  # jail
-                    pass
-                elif (board.locations[players[turn].location].owner == -7):  # go to jail
-                    players[turn].go_to_jail()
-                    board.locations[10].players.append(turn)
-                elif (board.locations[players[turn].location].owner == -8):  # free parking
-                    pass
-                elif (board.locations[players[turn].location].owner == -9):  # luxury tax
-                    players[turn].pay(100)
-                    update_history(f"{players[turn].name} paid luxury tax ($100)")
-                elif (board.locations[players[turn].location].owner == -10):  # go
-                    pass
-            elif board.locations[players[turn].location].owner != players[turn].order:
-                # Pay another player rent
-                cl = players[turn].location
-                rent = board.locations[cl].getRent()
-                if board.locations[cl].name == "Electric Company" or board.locations[cl].name == "Water Works":
-                    rent *= dice[0] + dice[1]
-
-                if card != "":  # if player collected a specific chance card and moved afterwards on same turn
-                    if int(card.split(".")[0]) in [5, 6]:
-                        rent *= 2
-                    elif int(card.split(".")[0]) in [7]:
-                        rent = 10 * (dice[0] + dice[1])
-                players[turn].pay(rent)
-                players[board.locations[cl].owner].receive(rent)
-                update_history(f"{players[turn].name} paid ${rent} to {players[board.locations[cl].owner].name}")
-        refresh_board()
-        #checks if player rolled a double, and has them roll again if they did.
-        if dice[0] == dice[1] and players[turn].jail == False:
-            num_rolls +=1
-            player_roll(num_rolls)
+    return messages
+
+def play(action: str, *args) -> list:
+    """
+    Apply an action for the current player, render its events and sync the module state\n
+    Returns the messages for the player (see show_events)\n
+    @action: one of the action constants in engine.py\n
+    """
+    global bankrupts
+    messages = show_events(engine.apply(action, *args))
+    bankrupts = len(players) - len(engine.active_players())
+    sync_turn()
+    return messages
+
+def sync_turn() -> None:
+    """
+    Copy the engine's turn and tell the turn listeners if it changed\n
+    A player starting their turn in debt they ran up off-turn (e.g. at the casino) has it settled first
+    (see liquidation.py), which may bankrupt them and pass the turn on.\n
+    """
+    global turn, bankrupts
+    while turn != engine.turn and engine.phase != GAME_OVER and engine.current().cash < 0:
+        show_events(liquidation.resolve(engine, engine.turn))
+        bankrupts = len(players) - len(engine.active_players())
+    if turn != engine.turn:
+        turn = engine.turn
+        for listener in turn_listeners:
+            listener(turn)
+
+def prompt(messages: list = None) -> str:
+    """
+    Input area text for the current player: any messages, then what they can do next\n
+    """
+    p = engine.current()
+    s = ""
+    for i, message in enumerate(messages or []):
+        s += set_cursor_str(0, 38 + i) + message
+    if engine.phase == ROLL_PHASE:
+        if p.jail:
+            s += set_cursor_str(0, 36) + f"You're in jail. Pay ${50*p.repeat_offender} fine (f) or roll for doubles" + (", (c) to use your card." if p.jail_cards > 0 else ".")
+        else:
+            s += set_cursor_str(0, 36) + ("Doubles! Roll again." if engine.doubles else "Press enter to roll dice.")
+    elif engine.phase == BUY_PHASE:
+        loc = board.locations[p.location]
+        s += set_cursor_str(0, 37) + f"this property is unowned, b to buy {loc.name} for ${loc.purchasePrice}"
+    s += set_cursor_str(0, 36 if engine.phase == MANAGE_PHASE else 39) + "e to end turn, p to manage properties, d to view a deed?"
+    return s
 
 def request_roll() -> str:
     """
     Custom function to request a roll of the dice, meant to be called from banker.py\n
-    TODO add more detail here
     """
-    print_commands()
-    bottom_screen_wipe()
     if(players[turn].order != -1): # If player is not bankrupt
-        player_color = COLORS.playerColors[turn]
-        output = get_gameboard()
-        update_history(player_color + f"{players[turn].name}'s turn")
-        print_commands()
-        output += set_cursor_str(0, 36) + "Press enter to roll dice."
-        return output
+        return get_gameboard() + prompt()
     else:
         return "Player is bankrupt." # Really once a player is bankrupt, they should be shut off.
 
-def process_roll(num_rolls: int, dice: tuple) -> str:
-    """
-    Custom function to process the roll of the dice, meant to be called from banker.py\n
-    TODO add more detail here
-    """
-    bottom_screen_wipe()
-    update_history(f"{players[turn]} rolled {dice[0]} and {dice[1]}")
-
-    if dice[0] == dice[1]:
-        if  num_rolls == 1:
-            update_history(f"{players[turn]} rolled doubles! Roll again.")
-
-        elif num_rolls == 2:
-            update_history(f"{players[turn]} rolled doubles!(X2) Roll again.")
-
-        elif num_rolls == 3:
-            update_history(f"{players[turn]} rolled doubles three times\n in a row!")
-            update_history(f"{players[turn]} is going to jail!")
-            players[turn].go_to_jail()
-    refresh_board()
-    #if player rolled their third double they will be in jail and their location doesn't update
-    if players[turn].jail == False:
-        if (players[turn].location + dice[0] + dice[1]) > 39:  # checks if player passed go
-            update_history(f"{players[turn]} passed Go and received $200")
-        board.update_location(players[turn], dice[0] + dice[1])
-        update_history(f"{players[turn].name} landed on {board.locations[players[turn].location].name}")
-        refresh_board()
-
-    # print("Board updated: " + get_gameboard())
-
-    return evaluate_board_location(num_rolls, dice)
-
-def evaluate_board_location(num_rolls: int, dice: tuple) -> str:
-    """
-    Custom function to evaluate the board location, meant to be called from banker.py\n
-    TODO add more detail here
-    """
-    done_moving_around = False
-    card = ""
-    output = "" #info/msgs to be shown to the user after the board position has been evaluated 
-    while not done_moving_around:
-        done_moving_around = True
-        if board.locations[players[turn].location].owner < 0:
-            if (board.locations[players[turn].location].owner == -1): #unowned
-                output += set_cursor_str(0, 37) + "this property is unowned, b to buy"
-            elif (board.locations[players[turn].location].owner == -2): #mortgaged
-                pass
-            elif (board.locations[players[turn].location].owner == -3): #community chest
-                old_loc = players[turn].location
-                card = decks.draw_community_chest(players[turn], board, players)
-                new_loc = players[turn].location
-                update_history(f"{players[turn].name} drew a Community Chest card! {card}")
-                if old_loc > new_loc and new_loc != 10 and new_loc != players[turn].location - 3:  #check if chance card made player pass go
-                    update_history(f"{players[turn]} passed Go and received $200")
-            elif (board.locations[players[turn].location].owner == -4): #chance
-                old_loc = players[turn].location
-                card = decks.draw_chance(players[turn], board, players)
-                new_loc = players[turn].location
-                update_history(f"{players[turn].name} drew a Chance card! {card}")
-                if old_loc > new_loc and new_loc != 10 and new_loc != players[turn].location - 3:  #check if chance card made player pass go
-                    update_history(f"{players[turn]} passed Go and received $200")
-                if (board.locations[players[turn].location].owner != -4):
-                    done_moving_around = False  # only case where loop is needed
-            elif (board.locations[players[turn].location].owner == -5): #income tax
-                players[turn].pay(200)
-                update_history(f"{players[turn].name} paid income tax ($200)")
-            elif (board.locations[players[turn].location].owner == -6): #jail
-                update_history("Just visiting!")
-            elif (board.locations[players[turn].location].owner == -7):  # go to jail
-                players[turn].go_to_jail()
-            elif (board.locations[players[turn].location].owner == -8):  # free parking
-                pass
-            elif (board.locations[players[turn].location].owner == -9):  # luxury tax
-                players[turn].pay(100)
-                update_history(f"{players[turn].name} paid luxury tax ($100)")
-            elif (board.locations[players[turn].location].owner == -10):  # go
-                pass
-        elif board.locations[players[turn].location].owner != players[turn].order:
-            # Pay another player rent
-            cl = players[turn].location
-            rent = board.locations[cl].getRent()
-            if board.locations[cl].name == "Electric Company" or board.locations[cl].name == "Water Works":
-                rent *= dice[0] + dice[1]
-
-            if card != "":  # if player collected a specific chance card and moved afterwards on same turn
-                if int(card.split(".")[0]) in [5, 6]:
-                    rent *= 2
-                elif int(card.split(".")[0]) in [7]:
-                    rent = 10 * (dice[0] + dice[1])
-            players[turn].pay(rent)
-            players[board.locations[cl].owner].receive(rent)
-            update_history(f"{players[turn].name} paid ${rent} to {players[board.locations[cl].owner].name}")
-    refresh_board()
-        
-    # Check for doubles and roll again only if player wasn't in jail at the start of their turn
-    if dice[0] == dice[1]: # and not was_in_jail:
-        num_rolls += 1
-        request_roll()
-    return "player_choice" + output + set_cursor_str(0, 36) + "e to end turn, p to manage properties, d to view a deed?" + get_gameboard()
-
-def end_turn():
-    global turn
-    turn = (turn + 1)%num_players
-
-def player_choice():
+def process_roll(dice: tuple = None) -> str:
+    """
+    Roll for the current player (with the given dice, or random ones), meant to be called from banker.py\n
+    Returns the gameboard with what the player can do next\n
+    """
+    messages = play(ROLL, dice) if dice is not None else play(ROLL)
+    return get_gameboard() + prompt(messages)
+
+def act(action: str, *args) -> str:
+    """
+    Any other action by the current player, meant to be called from banker.py\n
+    Returns the gameboard with what the player can do next\n
+    """
+    messages = play(action, *args)
+    return get_gameboard() + prompt(messages)
+
+def end_turn() -> list:
+    """
+    End the current player's turn. A player still in debt has it settled first (see liquidation.py),
+    and declares bankruptcy only if selling and mortgaging can't cover it.\n
+    Returns the messages for the player, empty if the turn ended\n
+    """
     global bankrupts
-    if(players[turn].cash > 0):
-        print("\033[36;0H" + ' ' * 70)
-        choice = input("\033[36;0He to end turn, p to manage properties, d to view a deed?")
-        while(choice != 'e'): 
-            if choice == "e":
-                pass
-            elif choice == "p":
-                manage_properties(players[turn])
-            elif choice == "d":
-                update_status(players[turn], "deed")
-            else:
-                add_to_output("Invalid option!")
-            print("\033[36;0H" + ' ' * 70)
-            choice = input("\033[36;0He to end turn, p to manage properties, d to view a deed?")
-        update_history(f"{players[turn].name} ended their turn.")
-    else:
-        update_history(f"{players[turn]} is in debt. Resolve debts before ending turn.")
-        option = input("\033[38;0Hb to declare bankruptcy, m to mortgage properties, s to sell houses/hotels").lower().strip()
-        while option != 'b': # Loop until bankruptcy is declared
-                if option == "m": # Mortgage properties
-                    mortgage_logic(players[turn])
-                elif option == "s": # Sell houses/hotels
-                    housing_logic(players[turn])
-                if players[turn].cash >= 0:
-                    break
-                option = input("\033[38;0Hb to declare bankruptcy, m to mortgage properties, s to sell houses/hotels").lower().strip()
-        if players[turn].cash < 0:
-            update_history(f"{players[turn]} declared bankruptcy.")
-            players[turn].order = -1
-            bankrupts += 1
-
-    # Wipe the bottom of the screen (input area)
-    bottom_screen_wipe()
-
-def start_game(cash: int, num_p: int, names: list[str], clients: list) -> str:
-    global CASH, num_players, players, gameboard, board, decks, mode
+    if players[turn].cash < 0:
+        messages = show_events(liquidation.resolve(engine, turn))
+        bankrupts = len(players) - len(engine.active_players())
+        if engine.turn != turn or engine.phase == GAME_OVER: # Went bankrupt, which ends the turn
+            sync_turn()
+            return messages
+    return play(END_TURN)
+
+def skip_turn() -> None:
+    """
+    End the current player's turn whatever state it is in (disconnected or timed out player)\n
+    A player in debt has it settled first (see liquidation.py), which may bankrupt them and end the turn by itself.\n
+    """
+    turn = engine.turn
+    events = liquidation.resolve(engine, turn)
+    if engine.turn == turn and engine.phase != GAME_OVER:
+        events += engine.skip_turn()
+    show_events(events)
+    sync_turn()
+
+def start_game(cash: int, num_p: int, names: list[str], clients: list, game: MonopolyEngine = None, saved_history: list = None) -> str:
+    """
+    Start the Banker's game, recorded to a game log (see gamelog.py)\n
+    @game: a recovered or loaded game to carry on, instead of starting a new one\n
+    @saved_history: history panel lines to restore with it\n
+    """
+    global CASH, num_players, gameboard, mode
     clear_screen()
     mode = "banker"
     gameboard = g.get('gameboard')
     num_players = num_p
     CASH = cash
-    board = Board(num_players)
-    decks = Cards()
-    players = []
+    if game is not None:
+        attach(game)
+        if saved_history:
+            history.clear()
+            history.extend(saved_history)
+    else:
+        new_game(names[:num_players], cash)
+    if engine.log is None:
+        GameLog.create(engine)
     for i in range(num_players):
-        players.append(MonopolyPlayer(CASH, i, names[i]))
         clients[i].PlayerObject = players[i]
-    add_to_output(COLORS.WHITE + "\033[0;0H")
-    add_to_output(gameboard)
-    return output
+    return get_gameboard()
+
+def new_game(names: list, cash: int, seed: int = None) -> None:
+    """
+    Start a new engine and point the renderer at its state\n
+    """
+    attach(MonopolyEngine(names, cash, seed))
+
+def attach(game: MonopolyEngine) -> None:
+    """
+    Point the renderer at an engine's state (a new, recovered or replayed game)\n
+    """
+    global num_players, players, board, decks, engine, turn, bankrupts, leaderboard
+    engine = game
+    num_players = len(engine.players)
+    players = engine.players
+    board = engine.board
+    decks = engine.decks
+    turn = engine.turn
+    bankrupts = len(players) - len(engine.active_players())
+    leaderboard = Leaderboard(engine, ranking)
+    for i, p in enumerate(players):
+        p.on_change = functools.partial(player_changed, i)
+    history.clear()
+    status.clear()
+    invalidate()
+    show_events([("turn", turn)])
 
 def game_loop():
-        # First time the player who's turn it is rolls their dice
-        #if they roll a double the function calls itself and updates its their number of consecutive rolls
-        player_roll(num_rolls=1)
-        #player_choice is where the player can choose to end their turn, manage properties, or view a deed
-        player_choice()
+    """
+    Standalone game on the local terminal: prompts the current player until the game is over\n
+    """
+    while engine.phase != GAME_OVER:
+        p = engine.current()
+        choice = input(prompt() + set_cursor_str(0, 40)).lower().strip().split(" ")
+        bottom_screen_wipe()
+        command, arg = choice[0], choice[1] if len(choice) > 1 else ""
+        if engine.phase == ROLL_PHASE and command in ("", "r", "roll"):
+            messages = play(ROLL)
+        elif command == "f":
+            messages = play(PAY_FINE)
+        elif command == "c":
+            messages = play(USE_JAIL_CARD)
+        elif command in ("b", "y") and engine.phase == BUY_PHASE:
+            messages = play(BUY)
+        elif command == "n":
+            messages = play(DECLINE)
+        elif command == "p": # p to list properties, p b|s|m|u # to build, sell, mortgage or unmortgage
+            update_status(p, "properties")
+            actions = {"b": BUILD, "s": SELL, "m": MORTGAGE, "u": UNMORTGAGE}
+            if arg in actions:
+                messages = play(actions[arg], choice[2] if len(choice) > 2 else "")
+            else:
+                messages = ["p b #: buy a house, p s #: sell a house, p m #: mortgage, p u #: repay a mortgage"]
+        elif command == "d":
+            message = update_status(p, "deed", arg or input("What property to view? Enter property #"))
+            messages = [message] if message else []
+        elif command == "e":
+            messages = end_turn()
+        else:
+            messages = ["Invalid option!"]
+        if messages:
+            add_to_output(set_cursor_str(0, 41) + COLORS.RED + messages[0] + COLORS.RESET)
 
 if __name__ == "__main__": # For debugging purposes. Can play standalone
     make_fullscreen()
@@ -798,32 +749,12 @@ if __name__ == "__main__": # For debugging purposes. Can play standalone
 
     # CASH = input("Starting cash?")
     # num_players = int(input("Number players?"))
-    for i in range(num_players):
-        players.append(MonopolyPlayer(CASH, i, f"Player {i+1}"))
-
-    turn = 0
-
-    board = Board(num_players)
-    decks = Cards()
-
     gameboard = g.get('gameboard')
     os.system('cls' if os.name == 'nt' else 'clear')
-    
+
+    new_game([f"Player {i+1}" for i in range(num_players)], CASH)
     unittest()
-    
-    add_to_output(COLORS.WHITE + "\033[0;0H")
-    add_to_output(gameboard)
-
-    while(True):
-        game_loop()
-
-        if(bankrupts == num_players - 1):
-            break
-        turn = (turn + 1)%num_players
-
-    for index, player in enumerate(players):
-        if player.order != -1:
-            color = COLORS.playerColors[index]
-            update_history(color + f"{players[index]} wins!")
-            break
-    add_to_output("\033[40;0H")
\ No newline at end of file
+
+    get_gameboard()
+    game_loop()
+    add_to_output("\033[40;0H")
@@ -0,0 +1,140 @@
+# Board layout constants and an index of who owns what, so ownership and monopoly checks don't scan the board.
+
+# Color groups by location. Static, so rules never depend on the color set the screen uses.
+COLOR_GROUPS = ((1, 3), (6, 8, 9), (11, 13, 14), (16, 18, 19), (21, 23, 24), (26, 27, 29), (31, 32, 34), (37, 39))
+GROUP_OF = {location: group for group in COLOR_GROUPS for location in group}
+RAILROADS = (5, 15, 25, 35)
+UTILITIES = (12, 28)
+
+def mask_of(locations) -> int:
+    """
+    Bitmask with bit i set for each location i\n
+    """
+    mask = 0
+    for location in locations:
+        mask |= 1 << location
+    return mask
+
+GROUP_INDEX = {location: i for i, group in enumerate(COLOR_GROUPS) for location in group}
+GROUP_MASKS = tuple(mask_of(group) for group in COLOR_GROUPS)
+RAILROAD_MASK = mask_of(RAILROADS)
+UTILITY_MASK = mask_of(UTILITIES)
+
+def count(mask: int) -> int:
+    """
+    Number of set bits\n
+    """
+    return bin(mask).count("1")
+
+def locations_in(mask: int) -> list:
+    """
+    Locations whose bits are set, in board order\n
+    """
+    locations = []
+    while mask:
+        low = mask & -mask
+        locations.append(low.bit_length() - 1)
+        mask ^= low
+    return locations
+
+class OwnershipIndex:
+    """
+    Who owns, has mortgaged and has built on each location, as bitmasks (bit i is location i),
+    plus which color groups each player owns completely.\n
+    Board keeps it in step: change ownership, mortgages and houses through Board.set_owner,
+    Board.set_mortgaged and Board.set_houses.\n
+    """
+    def __init__(self) -> None:
+        self.owned = {} # Player order -> bitmask of owned locations
+        self.complete = {} # Player order -> bitmask of color group indexes owned completely
+        self.mortgaged = 0 # Bitmask of mortgaged locations
+        self.improved = 0 # Bitmask of locations with houses
+
+    def copy(self) -> "OwnershipIndex":
+        new = OwnershipIndex()
+        new.owned = dict(self.owned)
+        new.complete = dict(self.complete)
+        new.mortgaged = self.mortgaged
+        new.improved = self.improved
+        return new
+
+    def add(self, player: int, location: int) -> None:
+        """
+        Record that a player now owns a location\n
+        """
+        self.owned[player] = self.owned.get(player, 0) | 1 << location
+        self.update_group(player, location)
+
+    def remove(self, player: int, location: int) -> None:
+        """
+        Record that a player no longer owns a location\n
+        """
+        self.owned[player] = self.owned.get(player, 0) & ~(1 << location)
+        self.update_group(player, location)
+
+    def update_group(self, player: int, location: int) -> None:
+        """
+        Recompute a player's completion flag for the location's color group\n
+        """
+        group = GROUP_INDEX.get(location)
+        if group is None:
+            return
+        if self.owned[player] & GROUP_MASKS[group] == GROUP_MASKS[group]:
+            self.complete[player] = self.complete.get(player, 0) | 1 << group
+        else:
+            self.complete[player] = self.complete.get(player, 0) & ~(1 << group)
+
+    def set_flag(self, location: int, mortgaged: bool = None, improved: bool = None) -> None:
+        """
+        Update the mortgaged and/or improved bit of a location\n
+        """
+        bit = 1 << location
+        if mortgaged is not None:
+            self.mortgaged = self.mortgaged | bit if mortgaged else self.mortgaged & ~bit
+        if improved is not None:
+            self.improved = self.improved | bit if improved else self.improved & ~bit
+
+    def owns(self, player: int, location: int) -> bool:
+        return bool(self.owned.get(player, 0) >> location & 1)
+
+    def mask(self, player: int) -> int:
+        return self.owned.get(player, 0)
+
+    def locations(self, player: int) -> list:
+        """
+        Locations a player owns, in board order\n
+        """
+        return locations_in(self.owned.get(player, 0))
+
+    def has_monopoly(self, player: int, location: int) -> bool:
+        """
+        Whether the player owns the location's whole color group\n
+        """
+        group = GROUP_INDEX.get(location)
+        return group is not None and bool(self.complete.get(player, 0) >> group & 1)
+
+    def monopolies(self, player: int) -> list:
+        """
+        Color groups the player owns completely\n
+        """
+        return [COLOR_GROUPS[i] for i in locations_in(self.complete.get(player, 0))]
+
+    def railroads(self, player: int) -> int:
+        return count(self.owned.get(player, 0) & RAILROAD_MASK)
+
+    def utilities(self, player: int) -> int:
+        return count(self.owned.get(player, 0) & UTILITY_MASK)
+
+    def group_mortgaged(self, location: int) -> bool:
+        """
+        Whether any property in the location's color group is mortgaged\n
+        """
+        group = GROUP_INDEX.get(location)
+        return group is not None and bool(self.mortgaged & GROUP_MASKS[group])
+
+    def group_improved(self, location: int) -> bool:
+        """
+        Whether any property in the location's color group has houses\n
+        """
+        group = GROUP_INDEX.get(location)
+        return group is not None and bool(self.improved & GROUP_MASKS[group])
@@ -13,6 +13,8 @@ class MonopolyPlayer:
         self.name = name if name != "" else "Player " + str(order)
         self.jail_turns = 0
         self.repeat_offender = 0
+        self.creditor = -1 # Player owed money while in debt, -1 for the bank
+        self.on_change = None # Optional callback(kind), lets the board renderer invalidate only what changed
     """
     Player cash\n
     @cash: int\n
@@ -31,34 +33,31 @@ class MonopolyPlayer:
         self.properties.append(board.locations[location])
         self.cash -= board.locations[location].getPrice()
         if (board.locations[location].owner == -1):
-            board.locations[location].owner = self.order
-            board.locations[location].owner_name = self.name
-            if location == 5 or location == 15 or location == 25 or location == 35: # railroad
-                owned_rails = [k for k in [5, 15, 25, 35] if board.locations[k].owner == self.order]
-                for k in owned_rails:
-                    board.locations[k].houses = len(owned_rails)   
-            elif location == 12: # electric company, check if water works is owned
-                if board.locations[28].owner == self.order:
-                    board.locations[12].houses = 2
-                    board.locations[28].houses = 2
-                else: board.locations[12].houses = 1
-            elif location == 28: # water works, check if electric company is owned
-                if board.locations[12].owner == self.order:
-                    board.locations[28].houses = 2
-                    board.locations[12].houses = 2
-                else: board.locations[28].houses = 1
+            board.set_owner(location, self.order, self.name) # Also updates the owned railroad/utility counts
+            self.changed("owner")
+            self.changed("improvements")
+        self.changed("cash")
     def pay(self, amount:int) -> None:
         """
         Pay amount\n
         @amount: int\n
         """
         self.cash -= amount
+        self.changed("cash")
     def receive(self, amount:int) -> None:
         """
         Receive amount\n
         @amount: int\n
         """
         self.cash += amount
+        self.changed("cash")
+    def changed(self, kind: str) -> None:
+        """
+        Notify the on_change listener (if any) that part of this player's state changed\n
+        @kind: "cash", "location", "owner", "improvements", "jail" or "cards"\n
+        """
+        if self.on_change is not None:
+            self.on_change(kind)
     def go_to_jail(self) -> None:
         """
         Go to jail\n
@@ -67,18 +66,21 @@ class MonopolyPlayer:
         self.jail = True
         self.jail_turns = 0
         self.repeat_offender += 1
+        self.changed("location")
     def leave_jail(self) -> None:
         """
         Leave jail\n
         """
         self.jail = False
         self.jail_turns = 0
+        self.changed("jail")
     def attempt_jail_roll(self, dice: tuple) -> tuple:
         """
         Attempt to leave jail by rolling doubles
         Returns (left_jail: bool, reason: str)
         """
         self.jail_turns += 1
+        self.changed("jail")
         if dice[0] == dice[1]:
             self.leave_jail()
             return True, "doubles"
@@ -1,51 +1,166 @@
+from array import array
 from utils.screenspace import MYCOLORS as COLORS
 
+# Static square table, shared by every board: name, special code, screen position, color (MYCOLORS attribute),
+# purchase price, house price, rent, rent with 1-4 houses, rent with a hotel, mortgage value.
+# Railroads and utilities keep their rent by number owned in the 1-4 house columns.
+# Special codes: -1 is not owned, -2 is mortaged, -3 is community chest, -4 is chance, -5 is tax
+# -6 is jail, -7 is go to jail, -8 is free parking, -9 is luxury, -10 is go
+SQUARES = (
+    ("Go", -10, (32,72), "LIGHTGRAY", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 0
+    ("Mediterranean Avenue", -1, (32,65), "BROWN", 60, 50, 2, 10, 30, 90, 160, 250, 30), # 1
+    ("Community Chest", -3, (32,58), "COMMUNITY", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 2
+    ("Baltic Avenue", -1, (32,51), "BROWN", 60, 50, 4, 20, 60, 180, 320, 450, 30), # 3
+    ("Income Tax", -5, (32,44), "LIGHTGRAY", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 4
+    ("Reading Railroad", -1, (32,37), "LIGHTBLACK", 200, 0, 0, 25, 50, 100, 200, 0, 100), # 5
+    ("Oriental Avenue", -1, (32,30), "LIGHTBLUE", 100, 50, 6, 30, 90, 270, 400, 550, 50), # 6
+    ("Chance", -4, (32,23), "CHANCE", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 7
+    ("Vermont Avenue", -1, (32,16), "LIGHTBLUE", 100, 50, 6, 30, 90, 270, 400, 550, 50), # 8
+    ("Connecticut Avenue", -1, (32,9), "LIGHTBLUE", 120, 50, 8, 40, 100, 300, 450, 600, 60), # 9
+    ("Jail", -6, (32,2), "LIGHTGRAY", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 10
+    ("St. Charles Place", -1, (29,2), "ROUGE", 140, 100, 10, 50, 150, 450, 625, 750, 70), # 11
+    ("Electric Company", -1, (26,2), "YELLOW", 150, 0, 0, 4, 10, 0, 0, 0, 75), # 12
+    ("States Avenue", -1, (23,2), "ROUGE", 140, 100, 10, 50, 150, 450, 625, 750, 70), # 13
+    ("Virginia Avenue", -1, (20,2), "ROUGE", 160, 100, 12, 60, 180, 500, 700, 900, 80), # 14
+    ("Pennsylvania Railroad", -1, (17,2), "LIGHTBLACK", 200, 0, 0, 25, 50, 100, 200, 0, 100), # 15
+    ("St. James Place", -1, (14,2), "ORANGE", 180, 100, 14, 70, 200, 550, 750, 950, 90), # 16
+    ("Community Chest", -3, (11,2), "COMMUNITY", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 17
+    ("Tennessee Avenue", -1, (8,2), "ORANGE", 180, 100, 14, 70, 200, 550, 750, 950, 90), # 18
+    ("New York Avenue", -1, (5,2), "ORANGE", 200, 100, 16, 80, 220, 600, 800, 1000, 100), # 19
+    ("Free Parking", -8, (2,2), "LIGHTGRAY", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 20
+    ("Kentucky Avenue", -1, (2,9), "RED", 220, 150, 18, 90, 250, 700, 875, 1050, 110), # 21
+    ("Chance", -4, (2,16), "CHANCE", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 22
+    ("Indiana Avenue", -1, (2,23), "RED", 220, 150, 18, 90, 250, 700, 875, 1050, 110), # 23
+    ("Illinois Avenue", -1, (2,30), "RED", 240, 150, 20, 100, 300, 750, 925, 1100, 120), # 24
+    ("B&O Railroad", -1, (2,37), "LIGHTBLACK", 200, 0, 0, 25, 50, 100, 200, 0, 100), # 25
+    ("Atlantic Avenue", -1, (2,44), "YELLOW", 260, 150, 22, 110, 330, 800, 975, 1150, 130), # 26
+    ("Ventnor Avenue", -1, (2,51), "YELLOW", 260, 150, 22, 110, 330, 800, 975, 1150, 130), # 27
+    ("Water Works", -1, (2,58), "CYAN", 150, 0, 0, 4, 10, 0, 0, 0, 75), # 28
+    ("Marvin Gardens", -1, (2,65), "YELLOW", 280, 150, 24, 120, 360, 850, 1025, 1200, 140), # 29
+    ("Go To Jail", -7, (2,72), "LIGHTGRAY", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 30
+    ("Pacific Avenue", -1, (5,72), "GREEN", 300, 200, 26, 130, 390, 900, 1100, 1275, 150), # 31
+    ("North Carolina Avenue", -1, (8,72), "GREEN", 300, 200, 26, 130, 390, 900, 1100, 1275, 150), # 32
+    ("Community Chest", -3, (11,72), "COMMUNITY", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 33
+    ("Pennsylvania Avenue", -1, (14,72), "GREEN", 320, 200, 28, 150, 450, 1000, 1200, 1400, 160), # 34
+    ("Short Line", -1, (17,72), "LIGHTBLACK", 200, 0, 0, 25, 50, 100, 200, 0, 100), # 35
+    ("Chance", -4, (20,72), "CHANCE", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 36
+    ("Park Place", -1, (23,72), "BLUE", 350, 200, 35, 175, 500, 1100, 1300, 1500, 175), # 37
+    ("Luxury Tax", -9, (26,72), "LIGHTGRAY", 0, 0, 0, 0, 0, 0, 0, 0, 0), # 38
+    ("Boardwalk", -1, (29,72), "BLUE", 400, 200, 50, 200, 600, 1400, 1700, 2000, 200), # 39
+)
+NAMES = tuple(square[0] for square in SQUARES)
+CODES = tuple(square[1] for square in SQUARES)
+POSITIONS = tuple(square[2] for square in SQUARES)
+COLOR_NAMES = tuple(square[3] for square in SQUARES) # Looked up in MYCOLORS on use, as the color set can change
+PRICES = tuple(square[4] for square in SQUARES)
+HOUSE_PRICES = tuple(square[5] for square in SQUARES)
+RENTS = tuple(tuple(square[6:12]) for square in SQUARES) # Rent by number of houses (railroads and utilities: by number owned)
+MORTGAGES = tuple(square[12] for square in SQUARES)
+
+# A board's changing state is one array('b') of 4 x 40 entries, owner | houses | mortgaged | modifier,
+# so a whole board is copied or saved in one go. These are the offsets of each block.
+OWNER, HOUSES, MORTGAGED, MODIFIER = 0, 40, 80, 120
+STATE_SIZE = 160
+INITIAL_STATE = array('b', CODES + (0,) * 40 + (0,) * 40 + (1,) * 40)
+
+table = None # Static table as a NumPy structured array, see static_table()
+
+def static_table():
+    """
+    Description:
+        The static square table as a read-only NumPy structured array, for batch users like the simulator.
+        Built on first use, so the game itself doesn't need NumPy.
+    Returns:
+        numpy.ndarray: 40 records with fields code, x, y, price, house_price, rents (6) and mortgage.
+    """
+    global table
+    if table is None:
+        import numpy as np
+        dtype = np.dtype([("code", np.int8), ("x", np.int8), ("y", np.int8), ("price", np.int32),
+                          ("house_price", np.int32), ("rents", np.int32, 6), ("mortgage", np.int32)])
+        static = np.array([(CODES[i], POSITIONS[i][0], POSITIONS[i][1], PRICES[i], HOUSE_PRICES[i], RENTS[i], MORTGAGES[i])
+                           for i in range(40)], dtype=dtype)
+        static.flags.writeable = False
+        table = static
+    return table
+
+def static(column: tuple, index: int = None):
+    """
+    Read-only attribute looking up the square's entry in a static column\n
+    """
+    if index is None:
+        return property(lambda self: column[self.location])
+    return property(lambda self: column[self.location][index])
+
+def dynamic(offset: int):
+    """
+    Attribute stored in the board's state array, at offset + location\n
+    """
+    def getter(self) -> int:
+        return self.board.state[offset + self.location]
+    def setter(self, value: int) -> None:
+        self.board.state[offset + self.location] = value
+    return property(getter, setter)
+
 class Property:
     """
     Property class for Monopoly game\n
-    Contains location data.\n
+    A view of one square of a Board: static data comes from the shared square table, owner, houses,
+    mortgaged and modifier from the board's state array. Views are cheap, a Board makes one per square.\n
     """
-    name = "Go"
-    players = list(range(0))
-    houses = 0
-    owner = -10
-    owner_name = "Unowned"
-    position = (32, 72)
-    location = -1
-    x = position[0]
-    y = position[1]
-    color = COLORS.LIGHTGRAY
-    purchasePrice = 0
-    housePrice = 0
-    rent = 0
-    rent1H = 0
-    rent2H = 0
-    rent3H = 0
-    rent4H = 0
-    rentHotel = 0
-    mortgage = 0
-    mortgaged = False
-    modifier = 1 # Multiplier for rent based on shop upgrades
-
-    def __init__(self, num_players:int, name:str, owner:int, position:tuple, color:str, purchasePrice:int, housePrice:int, rent:int, rent1H:int, rent2H:int, rent3H:int, rent4H:int, rentHotel:int,mortgage:int) -> None:
-        self.players = list(range(num_players))
-        self.name = name
-        self.owner = owner
-        self.owner_name = "Unowned"
-        self.position = position
-        self.x = position[0]
-        self.y = position[1]
-        self.color = color
-        self.purchasePrice = purchasePrice
-        self.housePrice = housePrice
-        self.rent = rent
-        self.rent1H = rent1H
-        self.rent2H = rent2H
-        self.rent3H = rent3H
-        self.rent4H = rent4H
-        self.rentHotel = rentHotel
-        self.mortgage = mortgage
-    
+    __slots__ = ("board", "location")
+
+    def __init__(self, board, location: int) -> None:
+        self.board = board
+        self.location = location
+
+    name = static(NAMES)
+    position = static(POSITIONS)
+    x = static(POSITIONS, 0)
+    y = static(POSITIONS, 1)
+    purchasePrice = static(PRICES)
+    housePrice = static(HOUSE_PRICES)
+    rents = static(RENTS)
+    rent = static(RENTS, 0)
+    rent1H = static(RENTS, 1)
+    rent2H = static(RENTS, 2)
+    rent3H = static(RENTS, 3)
+    rent4H = static(RENTS, 4)
+    rentHotel = static(RENTS, 5)
+    mortgage = static(MORTGAGES)
+    owner = dynamic(OWNER)
+    houses = dynamic(HOUSES)
+    modifier = dynamic(MODIFIER) # Multiplier for rent based on shop upgrades
+
+    @property
+    def mortgaged(self) -> bool:
+        return self.board.state[MORTGAGED + self.location] == 1
+
+    @mortgaged.setter
+    def mortgaged(self, mortgaged: bool) -> None:
+        self.board.state[MORTGAGED + self.location] = mortgaged
+
+    @property
+    def color(self) -> str:
+        return getattr(COLORS, COLOR_NAMES[self.location])
+
+    @property
+    def owner_name(self) -> str:
+        return self.board.owner_names[self.location]
+
+    @owner_name.setter
+    def owner_name(self, name: str) -> None:
+        self.board.owner_names[self.location] = name
+
+    @property
+    def players(self) -> list:
+        """Orders of the players standing on the square"""
+        return self.board.occupants[self.location]
+
+    @players.setter
+    def players(self, players: list) -> None:
+        self.board.occupants[self.location] = players
+
     def getPrice(self) -> int:
         if self.purchasePrice == 0:
             return -1
@@ -53,8 +168,7 @@ class Property:
 
     def getRent(self) -> int:
         if self.purchasePrice != 0:
-            rent_values = [self.rent, self.rent1H, self.rent2H, self.rent3H, self.rent4H, self.rentHotel]
-            return rent_values[self.houses] * self.modifier
+            return self.rents[self.houses] * self.modifier
 
     def get_deed_str(self, display_type: int) -> str:
         """
@@ -0,0 +1,186 @@
+# Rules and performance regression checks for the engine, run locally before pushing:
+#
+#   python -m monopoly_directory.regression              replay the golden games and time the hot paths
+#   python -m monopoly_directory.regression --record     re-record the golden games, after an intended rules change
+#   python -m monopoly_directory.regression --baseline   re-record this machine's timings
+#
+# Golden games are seeded random-policy games. Their event streams are hashed every CHECKPOINT turns and
+# compared against golden_replays.json, so a rules change shows up as the first turn that plays differently.
+# Timings are compared against a baseline kept per machine (.bench_baseline.json, not committed).
+# Exits with 1 if anything regressed.
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+import utils.screenspace as ss
+import monopoly_directory.monopoly as mply
+from monopoly_directory.engine import MonopolyEngine, ROLL, BUY_PHASE, DECLINE, END_TURN, BANKRUPT, ROLL_PHASE, GAME_OVER
+from monopoly_directory.gamelog import encode_snapshot, RNG_RECORD
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "golden_replays.json")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), ".bench_baseline.json")
+GAMES = 100
+PLAYERS = 4
+TURNS = 500 # Turn limit per game. Most random-policy games end in bankruptcy sooner, about 20,000 turns in all
+CHECKPOINT = 50 # Turns between event stream hashes
+TOLERANCE = 0.30 # A timing more than 30% over the baseline is a regression
+REPEATS = 5 # Timings take the best of this many runs
+
+def play_golden(seed: int, turns: int = TURNS) -> dict:
+    """
+    Plays one golden game: the engine and the policy choosing among legal actions are both seeded\n
+    Returns {"seed", "checkpoints": event stream hash every CHECKPOINT turns, "final": hash of the final state}\n
+    """
+    engine = MonopolyEngine([f"Player {i + 1}" for i in range(PLAYERS)], seed=seed)
+    policy = random.Random(seed)
+    digest = hashlib.sha256()
+    checkpoints = []
+    steps = 0
+    while engine.phase != GAME_OVER and engine.turns < turns and steps < turns * 50:
+        steps += 1
+        before = engine.turns
+        for event in engine.apply(*policy.choice(engine.legal_actions())):
+            digest.update(repr(event).encode())
+        if engine.turns != before and engine.turns % CHECKPOINT == 0:
+            checkpoints.append(digest.hexdigest()[:16])
+    final = hashlib.sha256(encode_snapshot(engine)[:-RNG_RECORD.size]).hexdigest()[:16]
+    return {"seed": seed, "checkpoints": checkpoints, "final": final}
+
+def record() -> None:
+    """
+    Re-records golden_replays.json\n
+    """
+    games = [play_golden(seed) for seed in range(GAMES)]
+    with open(GOLDEN_PATH, "w") as file:
+        json.dump({"players": PLAYERS, "turns": TURNS, "checkpoint": CHECKPOINT, "games": games}, file, indent=1)
+        file.write("\n")
+    print(f"Recorded {len(games)} golden games to {GOLDEN_PATH}.")
+
+def check_rules() -> list:
+    """
+    Replays every golden game. Returns a failure message per game that played differently\n
+    """
+    with open(GOLDEN_PATH) as file:
+        golden = json.load(file)
+    failures = []
+    for expected in golden["games"]:
+        actual = play_golden(expected["seed"], golden["turns"])
+        if actual == expected:
+            continue
+        for i, (a, b) in enumerate(zip(actual["checkpoints"], expected["checkpoints"])):
+            if a != b:
+                failures.append(f"Game {expected['seed']}: first differs between turns {i * CHECKPOINT} and {(i + 1) * CHECKPOINT}.")
+                break
+        else:
+            failures.append(f"Game {expected['seed']}: final state or game length differs.")
+    return failures
+
+def best_time(function, number: int) -> float:
+    """
+    Best time per call over REPEATS runs of number calls, in seconds\n
+    """
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+def midgame(seed: int = 7, turns: int = 150) -> MonopolyEngine:
+    """
+    A seeded game some turns in, so there is property to pay rent on\n
+    """
+    engine = MonopolyEngine([f"Player {i + 1}" for i in range(PLAYERS)], seed=seed)
+    policy = random.Random(seed)
+    while engine.phase != GAME_OVER and engine.turns < turns:
+        engine.apply(*policy.choice(engine.legal_actions()))
+    return engine
+
+def benchmarks() -> dict:
+    """
+    Times the hot paths. Returns {name: seconds per call}\n
+    """
+    results = {}
+    engine = MonopolyEngine([f"Player {i + 1}" for i in range(PLAYERS)], seed=1)
+    def turn() -> None: # Roll, decline anything for sale, end the turn
+        nonlocal engine
+        if engine.phase == GAME_OVER:
+            engine = MonopolyEngine([f"Player {i + 1}" for i in range(PLAYERS)], seed=1)
+        if engine.phase == ROLL_PHASE:
+            engine.apply(ROLL)
+        if engine.phase == BUY_PHASE:
+            engine.apply(DECLINE)
+        if engine.phase != ROLL_PHASE:
+            engine.apply(END_TURN if engine.current().cash >= 0 else BANKRUPT)
+    results["turn"] = best_time(turn, 5000)
+
+    rent_engine = midgame()
+    owned = [loc for loc in (rent_engine.board.locations[i] for i in range(40)) if loc.owner >= 0]
+    def rent() -> None:
+        for loc in owned:
+            rent_engine.rent_for(loc)
+    results["rent (per property)"] = best_time(rent, 2000) / max(1, len(owned))
+
+    card_engine = MonopolyEngine(["Player 1", "Player 2"], seed=1)
+    p, board = card_engine.players[0], card_engine.board
+    board.update_location(p, p.location, 7)
+    def card() -> None: # Draw a card from the Chance square, then put the player back
+        card_engine.decks.draw_chance(p, board, card_engine.players)
+        board.update_location(p, p.location, 7)
+        p.jail = False
+        p.cash = 1500
+    results["card draw"] = best_time(card, 5000)
+
+    ss.choose_colorset("DEFAULT_COLORS")
+    mply.mode = "banker"
+    mply.gameboard = ss.g.get('gameboard')
+    mply.attach(midgame())
+    def render() -> None: # A full frame from scratch, every layer dirty
+        mply.invalidate()
+        mply.get_gameboard()
+    results["board render"] = best_time(render, 200)
+    return results
+
+def check_timings(results: dict) -> list:
+    """
+    Compares timings to this machine's baseline, recording one if there is none. Returns a message per regression\n
+    """
+    if not os.path.exists(BASELINE_PATH):
+        write_baseline(results)
+        return []
+    with open(BASELINE_PATH) as file:
+        baseline = json.load(file)
+    return [f"{name}: {seconds * 1e6:.1f}us, baseline {baseline[name] * 1e6:.1f}us (+{seconds / baseline[name] - 1:.0%})"
+            for name, seconds in results.items() if name in baseline and seconds > baseline[name] * (1 + TOLERANCE)]
+
+def write_baseline(results: dict) -> None:
+    """
+    Records these timings as this machine's baseline\n
+    """
+    with open(BASELINE_PATH, "w") as file:
+        json.dump(results, file, indent=1)
+    print(f"Recorded timing baseline to {BASELINE_PATH}.")
+
+if __name__ == "__main__":
+    if "--record" in sys.argv:
+        record()
+        sys.exit()
+    start = time.perf_counter()
+    failures = check_rules()
+    print(f"Golden games: {'OK' if not failures else f'{len(failures)} differ'} ({time.perf_counter() - start:.1f}s)")
+    for failure in failures:
+        print("  " + failure)
+    results = benchmarks()
+    for name, seconds in results.items():
+        print(f"{name:<20} {seconds * 1e6:10.2f}us")
+    if "--baseline" in sys.argv:
+        write_baseline(results)
+        slow = []
+    else:
+        slow = check_timings(results)
+    for message in slow:
+        print("Slower: " + message)
+    sys.exit(1 if failures or slow else 0)
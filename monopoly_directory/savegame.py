@@ -0,0 +1,248 @@
+# Save and load a whole game: the engine (see gamelog.encode_snapshot), the history panel and each
+# client's inventory, loans and trades, in a small versioned binary format. Saves are encoded on the
+# calling thread, which is quick, and written by a background thread through a temp file and a rename,
+# so a crash mid-write never leaves a broken save behind. The subsystem RNG streams (utils/rng.py) are saved
+# too, so a loaded game rolls and deals exactly what the saved one would have.
+import os
+import struct
+import threading
+import time
+from monopoly_directory.engine import MonopolyEngine
+from monopoly_directory.gamelog import encode_snapshot, decode_snapshot
+from modules_directory.loan import Loan
+import modules_directory.trading as trading
+from utils import rng
+
+SAVE_VERSION = 3
+SAVE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "saves")
+AUTOSAVE = os.path.join(SAVE_DIR, "autosave.tmsave")
+
+HEADER = struct.Struct("<4sBIB") # magic, version, snapshot length, clients
+COUNT = struct.Struct("<H")
+LENGTH = struct.Struct("<I")
+QUANTITY = struct.Struct("<i")
+LOAN_RECORD = struct.Struct("<?idd") # high interest, term, principal, amount due
+TRADE_RECORD = struct.Struct("<IBi") # number, counterparty, cash paid by the offerer
+
+pending = {} # Path -> newest encoded save not yet written
+pending_lock = threading.Condition()
+writer = None # Background thread writing pending saves
+writing = False # Whether the writer is in the middle of a write
+FLUSH_POLL = 0.5 # Seconds between checks, while flushing, that the writer is still alive
+log = lambda message: None # Takes a message about a save that could not be written, for the Banker's output
+
+def pack_str(s: str) -> bytes:
+    data = s.encode()
+    return COUNT.pack(len(data)) + data
+
+def unpack_str(data: bytes, offset: int) -> tuple:
+    """
+    Returns (string, offset after it)\n
+    """
+    length = COUNT.unpack_from(data, offset)[0]
+    offset += COUNT.size
+    return data[offset:offset + length].decode(), offset + length
+
+def encode(engine: MonopolyEngine, history: list, clients: list) -> bytes:
+    """
+    Description:
+        Packs a whole game into a save.
+    Parameters:
+        engine (MonopolyEngine): Game rules state: players, board, deck order, turn and RNG.
+        history (list): History panel lines.
+        clients (list): Banker's clients, for their inventories, loans and trades.
+    Returns:
+        bytes: The save.
+    """
+    snapshot = encode_snapshot(engine)
+    out = bytearray(HEADER.pack(b"TMSV", SAVE_VERSION, len(snapshot), len(clients)))
+    out += snapshot
+    out += COUNT.pack(len(history))
+    for line in history:
+        out += pack_str(line)
+    streams = rng.getstate()
+    out += LENGTH.pack(len(streams)) + streams
+    for client in clients:
+        items = client.inventory.getinventory() if client.inventory is not None else {}
+        out += COUNT.pack(len(items))
+        for category, quantities in items.items():
+            out += pack_str(category) + COUNT.pack(len(quantities))
+            for item, quantity in quantities.items():
+                out += pack_str(item) + QUANTITY.pack(quantity)
+        out += COUNT.pack(len(client.loans))
+        for loan in client.loans:
+            out += LOAN_RECORD.pack(loan.interest_rate == 1.025, loan.term, loan.principal, loan.amount_due)
+        out += COUNT.pack(len(client.trades)) # Offers made. Offers received are the other players' offers made.
+        for trade in client.trades:
+            out += TRADE_RECORD.pack(trade.number, trade.counterparty, trade.cash)
+            out += bytes((len(trade.give),)) + bytes(trade.give) + bytes((len(trade.get),)) + bytes(trade.get)
+            for items in (trade.give_items, trade.get_items):
+                out += COUNT.pack(len(items))
+                for item, quantity in items.items():
+                    out += pack_str(item) + QUANTITY.pack(quantity)
+    return bytes(out)
+
+def decode(data: bytes, clients: list) -> tuple:
+    """
+    Description:
+        Unpacks a save. The clients' inventories, loans and trades are restored in place.
+    Parameters:
+        data (bytes): Save from encode().
+        clients (list): Banker's clients, in the same seats as when the game was saved.
+    Returns:
+        tuple: (MonopolyEngine, history lines)
+    """
+    magic, version, length, count = HEADER.unpack_from(data)
+    if magic != b"TMSV" or version != SAVE_VERSION:
+        raise ValueError(f"Unsupported save file (version {version}).")
+    if count != len(clients):
+        raise ValueError(f"Save has {count} players, but {len(clients)} are connected.")
+    offset = HEADER.size
+    engine = decode_snapshot(data[offset:offset + length])
+    offset += length
+    history = []
+    lines = COUNT.unpack_from(data, offset)[0]
+    offset += COUNT.size
+    for _ in range(lines):
+        line, offset = unpack_str(data, offset)
+        history.append(line)
+    length = LENGTH.unpack_from(data, offset)[0]
+    offset += LENGTH.size
+    rng.setstate(data[offset:offset + length])
+    offset += length
+    for client in clients:
+        items = {}
+        categories = COUNT.unpack_from(data, offset)[0]
+        offset += COUNT.size
+        for _ in range(categories):
+            category, offset = unpack_str(data, offset)
+            items[category] = {}
+            entries = COUNT.unpack_from(data, offset)[0]
+            offset += COUNT.size
+            for _ in range(entries):
+                item, offset = unpack_str(data, offset)
+                items[category][item] = QUANTITY.unpack_from(data, offset)[0]
+                offset += QUANTITY.size
+        if client.inventory is not None:
+            client.inventory.items = items
+        client.loans = []
+        loans = COUNT.unpack_from(data, offset)[0]
+        offset += COUNT.size
+        for _ in range(loans):
+            high, term, principal, amount_due = LOAN_RECORD.unpack_from(data, offset)
+            offset += LOAN_RECORD.size
+            loan = Loan(principal, high)
+            loan.term, loan.principal, loan.amount_due = term, int(principal), amount_due
+            client.loans.append(loan)
+        client.trades, client.requests = [], []
+        trades = COUNT.unpack_from(data, offset)[0]
+        offset += COUNT.size
+        for _ in range(trades):
+            number, counterparty, cash = TRADE_RECORD.unpack_from(data, offset)
+            offset += TRADE_RECORD.size
+            sides = []
+            for _ in range(2):
+                sides.append(list(data[offset + 1:offset + 1 + data[offset]]))
+                offset += 1 + len(sides[-1])
+            for _ in range(2):
+                items = {}
+                entries = COUNT.unpack_from(data, offset)[0]
+                offset += COUNT.size
+                for _ in range(entries):
+                    item, offset = unpack_str(data, offset)
+                    items[item] = QUANTITY.unpack_from(data, offset)[0]
+                    offset += QUANTITY.size
+                sides.append(items)
+            client.trades.append(trading.Trade(number, client.id, counterparty, cash, *sides))
+    for client, p in zip(clients, engine.players):
+        client.PlayerObject = p
+    for client in clients:
+        for trade in client.trades:
+            clients[trade.counterparty].requests.append(trade)
+            trading.next_trade = max(trading.next_trade, trade.number + 1)
+    return engine, history
+
+def write_file(path: str, data: bytes) -> None:
+    """
+    Writes a file atomically: a reader sees the old file or the new one, never half of one\n
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp = path + ".tmp"
+    with open(temp, "wb") as file:
+        file.write(data)
+    os.replace(temp, path)
+
+def write_pending() -> None:
+    """
+    Background writer: writes the newest pending save of each path. Saves made while one is
+    being written replace each other, so a slow disk never holds up or queues behind the game.
+    A failed write is logged and dropped, the next save of that path tries again.\n
+    """
+    global writing
+    while True:
+        with pending_lock:
+            while not pending:
+                pending_lock.wait()
+            path, data = pending.popitem()
+            writing = True
+        try:
+            write_file(path, data)
+        except Exception as e: # Keep the writer alive, or every later save would pile up unwritten
+            try:
+                log(f"Could not save to {path}: {e}")
+            except Exception:
+                pass
+        finally:
+            with pending_lock:
+                writing = False
+                pending_lock.notify_all()
+
+def save(engine: MonopolyEngine, history: list, clients: list, path: str = AUTOSAVE) -> None:
+    """
+    Description:
+        Saves a game. Encoding happens now, so the save is consistent; writing happens on a background thread.
+    Parameters:
+        engine (MonopolyEngine): Game to save.
+        history (list): History panel lines.
+        clients (list): Banker's clients.
+        path (str): Save file, defaults to saves/autosave.tmsave.
+    Returns:
+        None
+    """
+    global writer
+    data = encode(engine, history, clients)
+    with pending_lock:
+        pending[path] = data
+        if writer is None or not writer.is_alive():
+            writer = threading.Thread(target=write_pending, daemon=True)
+            writer.start()
+        pending_lock.notify_all()
+
+def flush(timeout: float = None) -> bool:
+    """
+    Wait until every pending save is on disk (e.g. before exiting). Returns whether it got there:
+    False if the writer is gone or the timeout (seconds, None for no limit) ran out first.\n
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with pending_lock:
+        while pending or writing:
+            if writer is None or not writer.is_alive():
+                return False
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            pending_lock.wait(FLUSH_POLL if remaining is None else min(remaining, FLUSH_POLL))
+    return True
+
+def load(clients: list, path: str = AUTOSAVE) -> tuple:
+    """
+    Description:
+        Loads a game saved with save(). The clients' inventories, loans and trades are restored in place.
+    Parameters:
+        clients (list): Banker's clients, in the same seats as when the game was saved.
+        path (str): Save file.
+    Returns:
+        tuple: (MonopolyEngine, history lines)
+    """
+    with open(path, "rb") as file:
+        return decode(file.read(), clients)
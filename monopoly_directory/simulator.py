@@ -0,0 +1,377 @@
+# Headless Monte Carlo simulator for balancing house rules. Thousands of games are advanced in lockstep with NumPy,
+# and batches are spread across cores with a process pool.
+#
+#   python -m monopoly_directory.simulator --games 100000 --players 4 --cash 1500
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from monopoly_directory.properties import static_table, NAMES, CODES
+from monopoly_directory.engine import COLOR_GROUPS, RAILROADS, UTILITIES, INCOME_TAX, LUXURY_TAX, GO_SALARY
+
+# Square kinds
+NONE, STREET, RAILROAD, UTILITY, CHANCE, CHEST, TAX, GO_TO_JAIL = range(8)
+JAIL = 10
+
+# Static property table, shared with Board so the simulator plays on the same board as the game
+_table = static_table()
+PRICE = _table["price"].astype(np.int64)
+HOUSE_PRICE = _table["house_price"].astype(np.int64)
+RENT = _table["rents"].astype(np.int64)
+RAILROAD_RENT = RENT[5, 1:5] # Rent with 1-4 railroads owned
+UTILITY_MULTIPLIER = RENT[12, 1:3] # Dice multiplier with 1-2 utilities owned
+TAX_AMOUNT = np.zeros(40, dtype=np.int64)
+KIND = np.full(40, NONE, dtype=np.int8)
+for _i in range(40):
+    _owner = CODES[_i]
+    if _owner == -1:
+        KIND[_i] = RAILROAD if _i in RAILROADS else UTILITY if _i in UTILITIES else STREET
+    elif _owner == -3:
+        KIND[_i] = CHEST
+    elif _owner == -4:
+        KIND[_i] = CHANCE
+    elif _owner == -5 or _owner == -9:
+        KIND[_i] = TAX
+        TAX_AMOUNT[_i] = INCOME_TAX if _owner == -5 else LUXURY_TAX
+    elif _owner == -7:
+        KIND[_i] = GO_TO_JAIL
+RAILROAD_MASK = np.isin(np.arange(40), RAILROADS)
+UTILITY_MASK = np.isin(np.arange(40), UTILITIES)
+GROUPS = [np.array(group) for group in COLOR_GROUPS]
+
+DEFAULT_RULES = {
+    "cash": 1500, # Starting cash
+    "go_salary": GO_SALARY,
+    "jail_fine": 50,
+    "buy_reserve": 0, # Players buy any property that leaves them more than this much cash
+    "build_reserve": 200, # ...and build evenly on complete color groups while keeping this much
+    "story_cost": 0, # Shop's "Build a Story" price (raises a hotel's rent modifier by 1), 0 to disable
+    "max_stories": 2,
+    "max_turns": 1000 # Games still running after this many turns count as unfinished
+}
+
+def run_batch(games: int, players: int, rules: dict, seed) -> dict:
+    """
+    Description:
+        Plays a batch of games in lockstep. Every step, the current player of each unfinished game rolls once,
+        so all dice, card draws, movement and rent for the batch are computed as whole-array operations.
+        Bots buy whatever they can afford above buy_reserve and build evenly on complete color groups.
+    Parameters:
+        games (int): Number of games in the batch.
+        players (int): Players per game.
+        rules (dict): DEFAULT_RULES, with any overrides.
+        seed: Seed (or numpy SeedSequence) for this batch's PCG64 generator.
+    Returns:
+        dict: Raw per-batch results, combined by simulate().
+    """
+    rules = {**DEFAULT_RULES, **rules}
+    rng = np.random.Generator(np.random.PCG64(seed))
+    G, P = games, players
+    rows = np.arange(G)
+    pos = np.zeros((G, P), dtype=np.int64)
+    cash = np.full((G, P), rules["cash"], dtype=np.int64)
+    alive = np.ones((G, P), dtype=bool)
+    jailed = np.zeros((G, P), dtype=bool)
+    jail_turns = np.zeros((G, P), dtype=np.int64)
+    jail_cards = np.zeros((G, P), dtype=np.int64)
+    owner = np.full((G, 40), -1, dtype=np.int64)
+    houses = np.zeros((G, 40), dtype=np.int64)
+    modifier = np.ones((G, 40), dtype=np.int64)
+    cur = np.zeros(G, dtype=np.int64)
+    doubles = np.zeros(G, dtype=np.int64)
+    turns = np.zeros(G, dtype=np.int64)
+    done = np.zeros(G, dtype=bool)
+    # Decks are cycled like Cards: the drawn card goes to the bottom, so a shuffled order plus a pointer is enough
+    chance_deck = rng.permuted(np.tile(np.arange(1, 17), (G, 1)), axis=1)
+    chest_deck = rng.permuted(np.tile(np.arange(1, 17), (G, 1)), axis=1)
+    chance_top = np.zeros(G, dtype=np.int64)
+    chest_top = np.zeros(G, dtype=np.int64)
+    income = np.zeros(40, dtype=np.int64) # Rent collected per property
+    invested = np.zeros(40, dtype=np.int64) # Purchase price, houses and stories per property
+    bought = np.zeros(40, dtype=np.int64)
+    bankruptcies = np.zeros(G, dtype=np.int64)
+
+    def move(g, c, new, salary_if_passed):
+        """Move players to new squares, paying Go salary for card moves that wrap around like Board.update_location."""
+        old = pos[g, c]
+        passed = salary_if_passed & (old > new) & (new != JAIL) & (new != old - 3)
+        cash[g[passed], c[passed]] += rules["go_salary"]
+        pos[g, c] = new
+
+    def send_to_jail(g, c):
+        pos[g, c] = JAIL
+        jailed[g, c] = True
+        jail_turns[g, c] = 0
+
+    def repairs(g, c, per_house, per_hotel):
+        mine = owner[g] == c[:, None]
+        h = np.where(mine, houses[g], 0)
+        cost = np.where(h == 5, per_hotel, h * per_house).sum(axis=1)
+        cash[g, c] -= cost
+
+    def others(g, c):
+        """Number of other players still in each game"""
+        return alive[g].sum(axis=1) - 1
+
+    def draw_chance(g, c, total):
+        """Cards.draw_chance for many games at once. Returns the rent rule each player is now under."""
+        card = chance_deck[g, chance_top[g] % 16]
+        chance_top[g] += 1
+        p = pos[g, c]
+        rule = np.zeros(len(g), dtype=np.int64) # 1: double railroad rent, 2: utility at 10x dice
+        target = np.full(len(g), -1, dtype=np.int64)
+        target[card == 1] = 39
+        target[card == 2] = 0
+        target[card == 3] = 24
+        target[card == 4] = 11
+        railroad = (card == 5) | (card == 6)
+        nearest_rr = np.where((p < 5) | (p > 35), 5, np.where(p < 15, 15, np.where(p < 25, 25, 35)))
+        target[railroad] = nearest_rr[railroad]
+        rule[railroad] = 1
+        utility = card == 7
+        target[utility] = np.where((p < 12) | (p > 28), 12, 28)[utility]
+        rule[utility] = 2
+        target[card == 10] = p[card == 10] - 3
+        target[card == 14] = 5
+        moved = target >= 0
+        move(g[moved], c[moved], target[moved], True)
+        cash[g, c] += np.where(card == 8, 50, 0) + np.where(card == 16, 150, 0) - np.where(card == 13, 15, 0)
+        jail_cards[g[card == 9], c[card == 9]] += 1
+        jail = card == 11
+        send_to_jail(g[jail], c[jail])
+        fix = card == 12
+        repairs(g[fix], c[fix], 25, 150)
+        pay_each = card == 15
+        gp, cp = g[pay_each], c[pay_each]
+        cash[gp] += np.where(alive[gp], 50, 0)
+        cash[gp, cp] -= 50 * (others(gp, cp) + 1)
+        return rule, moved & ~jail
+
+    def draw_chest(g, c):
+        """Cards.draw_community_chest for many games at once."""
+        card = chest_deck[g, chest_top[g] % 16]
+        chest_top[g] += 1
+        to_go = card == 1
+        move(g[to_go], c[to_go], np.zeros(to_go.sum(), dtype=np.int64), True)
+        gain = {2: 200, 3: -50, 4: 50, 7: 100, 8: 20, 10: 100, 11: -100, 12: -50, 13: 25, 15: 10, 16: 100}
+        delta = np.zeros(len(g), dtype=np.int64)
+        for number, amount in gain.items():
+            delta[card == number] = amount
+        cash[g, c] += delta
+        jail_cards[g[card == 5], c[card == 5]] += 1
+        jail = card == 6
+        send_to_jail(g[jail], c[jail])
+        collect = card == 9
+        gp, cp = g[collect], c[collect]
+        cash[gp] -= np.where(alive[gp], 10, 0)
+        cash[gp, cp] += 10 * (others(gp, cp) + 1)
+        fix = card == 14
+        repairs(g[fix], c[fix], 40, 240)
+
+    def resolve(g, c, total):
+        """Resolve the squares players landed on: cards, taxes and jail first (a card may move them again), then property."""
+        rule = np.zeros(len(g), dtype=np.int64)
+        pending = np.ones(len(g), dtype=bool)
+        for _ in range(2): # Chance's "go back 3" can land on another card or tax square
+            kind = KIND[pos[g, c]]
+            tax = pending & (kind == TAX)
+            cash[g[tax], c[tax]] -= TAX_AMOUNT[pos[g[tax], c[tax]]]
+            jail = pending & (kind == GO_TO_JAIL)
+            send_to_jail(g[jail], c[jail])
+            chest = pending & (kind == CHEST)
+            draw_chest(g[chest], c[chest])
+            chance = pending & (kind == CHANCE)
+            chance_rule, chance_moved = draw_chance(g[chance], c[chance], total[chance])
+            rule[chance] = chance_rule
+            pending = np.zeros(len(g), dtype=bool)
+            pending[np.nonzero(chance)[0][chance_moved]] = True
+        on_property = ~jailed[g, c] & np.isin(KIND[pos[g, c]], (STREET, RAILROAD, UTILITY))
+        g, c, total, rule = g[on_property], c[on_property], total[on_property], rule[on_property]
+        loc = pos[g, c]
+        holder = owner[g, loc]
+        buy = (holder == -1) & (cash[g, c] - PRICE[loc] > rules["buy_reserve"])
+        owner[g[buy], loc[buy]] = c[buy]
+        cash[g[buy], c[buy]] -= PRICE[loc[buy]]
+        np.add.at(invested, loc[buy], PRICE[loc[buy]])
+        np.add.at(bought, loc[buy], 1)
+        pay = (holder >= 0) & (holder != c)
+        g, c, total, rule, loc, holder = g[pay], c[pay], total[pay], rule[pay], loc[pay], holder[pay]
+        kind = KIND[loc]
+        rent = RENT[loc, houses[g, loc]] * modifier[g, loc]
+        railroads = (owner[g][:, RAILROAD_MASK] == holder[:, None]).sum(axis=1)
+        rent = np.where(kind == RAILROAD, RAILROAD_RENT[np.maximum(railroads, 1) - 1] * np.where(rule == 1, 2, 1), rent)
+        utilities = (owner[g][:, UTILITY_MASK] == holder[:, None]).sum(axis=1)
+        rent = np.where(kind == UTILITY, np.where(rule == 2, 10, UTILITY_MULTIPLIER[np.maximum(utilities, 1) - 1]) * total, rent)
+        cash[g, c] -= rent
+        np.add.at(cash, (g, holder), rent)
+        np.add.at(income, loc, rent)
+
+    def build(g, c):
+        """Build one house on every property of each complete color group the player can afford to."""
+        for group in GROUPS:
+            complete = (owner[g][:, group] == c[:, None]).all(axis=1)
+            level = houses[g][:, group].min(axis=1)
+            cost = HOUSE_PRICE[group].sum()
+            ok = complete & (level < 5) & (cash[g, c] - cost >= rules["build_reserve"])
+            gb, cb = g[ok], c[ok]
+            houses[gb[:, None], group[None, :]] += 1
+            cash[gb, cb] -= cost
+            invested[group] += HOUSE_PRICE[group] * len(gb)
+            if rules["story_cost"]:
+                story_cost = rules["story_cost"] * len(group)
+                ok = complete & (level == 5) & (modifier[g][:, group].min(axis=1) <= rules["max_stories"]) & (cash[g, c] - story_cost >= rules["build_reserve"])
+                gs, cs = g[ok], c[ok]
+                modifier[gs[:, None], group[None, :]] += 1
+                cash[gs, cs] -= story_cost
+                invested[group] += rules["story_cost"] * len(gs)
+
+    def settle_debts(g):
+        """Players below zero sell their houses at half price, and go bankrupt if that isn't enough."""
+        broke_g, broke_c = np.nonzero((cash[g] < 0) & alive[g])
+        broke_g = g[broke_g]
+        if len(broke_g) == 0:
+            return
+        mine = owner[broke_g] == broke_c[:, None]
+        house_value = (np.where(mine, houses[broke_g], 0) * HOUSE_PRICE // 2).sum(axis=1)
+        sells = cash[broke_g, broke_c] + house_value >= 0
+        for gi, ci, value, sell, own in zip(broke_g, broke_c, house_value, sells, mine):
+            houses[gi, own] = 0
+            if sell:
+                cash[gi, ci] += value
+            else:
+                alive[gi, ci] = False
+                owner[gi, own] = -1
+                modifier[gi, own] = 1
+                bankruptcies[gi] += 1
+
+    while not done.all():
+        g = np.nonzero(~done)[0]
+        c = cur[g]
+        dice = rng.integers(1, 7, size=(2, len(g)))
+        total = dice[0] + dice[1]
+        double = dice[0] == dice[1]
+        in_jail = jailed[g, c]
+        card = in_jail & (jail_cards[g, c] > 0) # Use a Get Out of Jail Free card before rolling
+        jail_cards[g[card], c[card]] -= 1
+        jailed[g[card], c[card]] = False
+        rolling_in_jail = in_jail & ~card
+        jail_turns[g, c] += rolling_in_jail
+        third = rolling_in_jail & ~double & (jail_turns[g, c] >= 3)
+        cash[g[third], c[third]] -= rules["jail_fine"]
+        leaves = rolling_in_jail & (double | third)
+        jailed[g[leaves], c[leaves]] = False
+        stays = rolling_in_jail & ~leaves
+        doubles[g] = np.where(double & ~rolling_in_jail, doubles[g] + 1, 0)
+        speeding = doubles[g] == 3
+        send_to_jail(g[speeding], c[speeding])
+        moving = ~stays & ~speeding
+        gm, cm, tm = g[moving], c[moving], total[moving]
+        passed = pos[gm, cm] + tm > 39
+        cash[gm[passed], cm[passed]] += rules["go_salary"]
+        pos[gm, cm] = (pos[gm, cm] + tm) % 40
+        resolve(gm, cm, tm)
+        can_build = alive[g, c] & (cash[g, c] >= 0)
+        build(g[can_build], c[can_build])
+        settle_debts(g)
+        # Doubles roll again, everyone else hands the turn on
+        again = double & moving & ~rolling_in_jail & ~jailed[g, c] & alive[g, c]
+        next_g = g[~again]
+        doubles[next_g] = 0
+        turns[next_g] += 1
+        nxt = cur[next_g].copy()
+        found = np.zeros(len(next_g), dtype=bool)
+        for k in range(1, P + 1):
+            candidate = (cur[next_g] + k) % P
+            hit = ~found & alive[next_g, candidate]
+            nxt[hit] = candidate[hit]
+            found |= hit
+        cur[next_g] = nxt
+        done[g] = (alive[g].sum(axis=1) <= 1) | (turns[g] >= rules["max_turns"])
+    finished = alive.sum(axis=1) <= 1
+    winner = np.where(finished, alive.argmax(axis=1), -1)
+    return {"lengths": turns, "finished": finished, "winners": winner, "bankruptcies": bankruptcies,
+            "income": income, "invested": invested, "bought": bought, "games": G, "players": P}
+
+def simulate(games: int = 10000, players: int = 4, rules: dict = None, batch_size: int = 2000,
+             processes: int = None, seed: int = 0) -> dict:
+    """
+    Description:
+        Runs many games, split into batches that are played in parallel by a process pool.
+    Parameters:
+        games (int): Total number of games.
+        players (int): Players per game.
+        rules (dict): Overrides for DEFAULT_RULES.
+        batch_size (int): Games each worker plays in lockstep.
+        processes (int): Worker processes, defaults to the number of cores.
+        seed (int): Master seed. Each batch gets an independent stream spawned from it.
+    Returns:
+        dict: Game lengths, bankruptcy rates, win rates per seat and ROI per property (see report()).
+    """
+    rules = rules or {}
+    sizes = [batch_size] * (games // batch_size) + ([games % batch_size] if games % batch_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as pool:
+        batches = list(pool.map(run_batch, sizes, [players] * len(sizes), [rules] * len(sizes), seeds))
+    lengths = np.concatenate([b["lengths"] for b in batches])
+    finished = np.concatenate([b["finished"] for b in batches])
+    winners = np.concatenate([b["winners"] for b in batches])
+    bankruptcies = np.concatenate([b["bankruptcies"] for b in batches])
+    income = sum(b["income"] for b in batches)
+    invested = sum(b["invested"] for b in batches)
+    bought = sum(b["bought"] for b in batches)
+    purchasable = PRICE > 0
+    roi = np.full(40, np.nan)
+    roi[purchasable] = np.divide(income[purchasable], invested[purchasable],
+                                 out=np.full(purchasable.sum(), np.nan), where=invested[purchasable] > 0)
+    done_lengths = lengths[finished]
+    return {
+        "games": games,
+        "players": players,
+        "rules": {**DEFAULT_RULES, **rules},
+        "seconds": time.perf_counter() - start,
+        "lengths": lengths,
+        "finished_rate": finished.mean(),
+        "length_percentiles": dict(zip((5, 25, 50, 75, 95), np.percentile(done_lengths, (5, 25, 50, 75, 95)))) if len(done_lengths) else {},
+        "length_histogram": np.histogram(done_lengths, bins=20) if len(done_lengths) else None,
+        "bankruptcies_per_game": bankruptcies.mean(),
+        "bankruptcy_rate": bankruptcies.sum() / (games * players),
+        "win_rate_by_seat": np.bincount(winners[winners >= 0], minlength=players) / games,
+        "income": income,
+        "invested": invested,
+        "bought": bought,
+        "roi": roi
+    }
+
+def report(results: dict) -> str:
+    """
+    Description:
+        Formats simulate() results as a plain text report.
+    """
+    lines = [f"{results['games']} games, {results['players']} players, {results['seconds']:.1f}s "
+             f"({results['lengths'].sum() / max(results['seconds'], 1e-9):,.0f} turns/s)",
+             f"Rules: {results['rules']}",
+             f"Finished within {results['rules']['max_turns']} turns: {results['finished_rate']:.1%}",
+             "Game length (turns) percentiles: " + ", ".join(f"p{k}={v:.0f}" for k, v in results["length_percentiles"].items()),
+             f"Bankruptcies per game: {results['bankruptcies_per_game']:.2f} (rate per player {results['bankruptcy_rate']:.1%})",
+             "Win rate by seat: " + ", ".join(f"{i + 1}: {rate:.1%}" for i, rate in enumerate(results["win_rate_by_seat"])),
+             "",
+             f"{'#':>2} {'Property':<22} {'Bought':>8} {'Rent':>12} {'Invested':>12} {'ROI':>7}"]
+    for i in np.nonzero(PRICE > 0)[0]:
+        lines.append(f"{i:>2} {NAMES[i]:<22} {results['bought'][i]:>8} {results['income'][i]:>12} "
+                     f"{results['invested'][i]:>12} {results['roi'][i]:>7.2f}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate many Monopoly games to compare house rules.")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=2000, help="games per worker batch")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    for rule, default in DEFAULT_RULES.items():
+        parser.add_argument("--" + rule.replace("_", "-"), type=int, default=default)
+    args = parser.parse_args()
+    overrides = {rule: getattr(args, rule) for rule in DEFAULT_RULES}
+    print(report(simulate(args.games, args.players, overrides, args.batch, args.processes, args.seed)))
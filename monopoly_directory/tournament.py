@@ -0,0 +1,393 @@
+# Tournaments between bot strategies. Games are scheduled over a process pool, played on the headless engine
+# with seeds derived from the tournament's seed, and rated with multiplayer Elo: each finishing order counts as
+# one result between every pair at the table.
+#
+#   python -m monopoly_directory.tournament --entrants random easy normal hard --format swiss --rounds 6 --workers 8
+#   python -m monopoly_directory.tournament --format round-robin --table 4 --checkpoint cup.json
+#   python banker.py -tournament ...                                                          (same thing)
+#
+# Round robin plays every combination of --table entrants, once per seat rotation, as a single round. Swiss
+# pairs entrants by points (then rating) each round, avoiding rematches where it can. The games of a round are
+# independent, so a round keeps every worker busy until its last games.
+#
+# The checkpoint (JSON) is rewritten after every few games. Run the same command again to resume: finished
+# games are kept and ratings are recomputed from them in game order, so a resumed tournament ends the same as
+# an uninterrupted one. Bots search to a time budget, so for exactly reproducible games give them more time
+# (--budget) than they need to reach their depth.
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from monopoly_directory.bots import Bot, DIFFICULTIES
+from monopoly_directory.engine import MonopolyEngine, ROLL, BUY, DECLINE, BUILD, END_TURN, PAY_FINE, ROLL_PHASE, BUY_PHASE, GAME_OVER
+from monopoly_directory import liquidation, savegame
+from utils.rng import derive
+
+FORMATS = ("round-robin", "swiss")
+CHECKPOINT_VERSION = 1
+CHECKPOINT_EVERY = 5.0 # Seconds between checkpoint writes while a round is being played
+INITIAL_RATING = 1500.0
+K_FACTOR = 32.0 # Rating points at stake in a two player game. Shared between the pairs at bigger tables.
+
+class RandomBot:
+    """
+    Baseline strategy: buys, builds and pays out of jail at random\n
+    """
+    def __init__(self, seed: int) -> None:
+        self.rng = random.Random(seed)
+
+    def play_turn(self, engine: MonopolyEngine, me: int, apply=None) -> int:
+        """
+        Plays actions for a player until their turn is over, like Bot.play_turn. Returns the number of actions taken\n
+        """
+        apply = apply or engine.apply
+        steps = 0
+        while engine.phase != GAME_OVER and engine.turn == me and engine.players[me].order != -1:
+            p = engine.players[me]
+            if p.cash < 0:
+                liquidation.resolve(engine, me)
+            elif engine.phase == ROLL_PHASE:
+                apply(PAY_FINE if p.jail and p.cash >= 50 and self.rng.random() < 0.5 else ROLL)
+            elif engine.phase == BUY_PHASE:
+                apply(BUY if p.cash > engine.board.locations[p.location].purchasePrice and self.rng.random() < 0.7 else DECLINE)
+            else:
+                builds = [action for action in engine.legal_actions(me) if action[0] == BUILD]
+                apply(*(self.rng.choice(builds) if builds and self.rng.random() < 0.3 else (END_TURN,)))
+            steps += 1
+        return steps
+
+STRATEGIES = ("random",) + tuple(DIFFICULTIES) # Bots play at their difficulty's search depth
+
+def make_player(strategy: str, seed: int, budget: float = None):
+    """
+    A player for a strategy: a RandomBot, or a Bot searching to the strategy's depth\n
+    @budget: seconds per bot decision, defaults to the bots' own\n
+    """
+    if strategy == "random":
+        return RandomBot(seed)
+    depth = DIFFICULTIES[strategy]
+    return Bot(depth) if budget is None else Bot(depth, budget)
+
+def places(engine: MonopolyEngine, eliminated: list) -> list:
+    """
+    Finishing place of each seat, 1 for the winner. Players still in a stopped game are placed by net worth
+    (equal worth, equal place), ahead of those who went bankrupt, who are placed by how long they lasted.\n
+    @eliminated: seats in the order they went bankrupt\n
+    """
+    standing = sorted((p.order for p in engine.active_players()), key=engine.net_worth, reverse=True)
+    place = [0] * len(engine.players)
+    for i, seat in enumerate(standing):
+        previous = standing[i - 1] if i else None
+        place[seat] = place[previous] if previous is not None and engine.net_worth(previous) == engine.net_worth(seat) else i + 1
+    for i, seat in enumerate(reversed(eliminated)):
+        place[seat] = len(standing) + i + 1
+    return place
+
+def play_match(game: dict, budget: float = None, max_turns: int = 1000) -> dict:
+    """
+    Description:
+        Plays one tournament game. Runs in the worker processes.
+    Parameters:
+        game (dict): index, seed and seats (strategy per seat), see schedule().
+        budget (float): Seconds per bot decision, defaults to the bots' own.
+        max_turns (int): Games still running after this many turns are stopped and placed by net worth.
+    Returns:
+        dict: index, places (per seat), turns, finished and seconds.
+    """
+    seats = game["seats"]
+    engine = MonopolyEngine(seats, seed=game["seed"])
+    players = [make_player(strategy, derive(f"player:{seat}", game["seed"]), budget) for seat, strategy in enumerate(seats)]
+    eliminated = []
+    start = time.perf_counter()
+    while engine.phase != GAME_OVER and engine.turns < max_turns:
+        me, turns = engine.turn, engine.turns
+        players[me].play_turn(engine, me)
+        if engine.turn == me and engine.turns == turns and engine.phase != GAME_OVER: # Bot gave up, as a timed out player would be
+            liquidation.resolve(engine, me)
+            if engine.turn == me and engine.players[me].order != -1:
+                engine.skip_turn()
+        eliminated += [p for p in range(len(seats)) if engine.players[p].order == -1 and p not in eliminated]
+    return {"index": game["index"], "places": places(engine, eliminated), "turns": engine.turns,
+            "finished": engine.phase == GAME_OVER, "seconds": time.perf_counter() - start}
+
+def scores(places: list) -> list:
+    """
+    Each seat's share of its pairings won (1 for beating everyone, ties count half)\n
+    """
+    n = len(places)
+    return [sum(1.0 if mine < theirs else 0.5 if mine == theirs else 0.0 for j, theirs in enumerate(places) if j != i) / (n - 1)
+            for i, mine in enumerate(places)]
+
+def rate(ratings: dict, seats: list, places: list, k: float = K_FACTOR) -> None:
+    """
+    Elo update for one game, every pair at the table being one result worth K / (players - 1)\n
+    """
+    n = len(seats)
+    before = [ratings[s] for s in seats]
+    for i, seat in enumerate(seats):
+        delta = 0.0
+        for j in range(n):
+            if j != i:
+                expected = 1.0 / (1.0 + 10 ** ((before[j] - before[i]) / 400))
+                actual = 1.0 if places[i] < places[j] else 0.5 if places[i] == places[j] else 0.0
+                delta += actual - expected
+        ratings[seat] += k / (n - 1) * delta
+
+class Tournament:
+    """
+    Schedule, results and ratings of a tournament, and its checkpoint\n
+    """
+    def __init__(self, entrants: list, format: str = "swiss", rounds: int = 5, table: int = 2, repeats: int = None,
+                 seed: int = 0, max_turns: int = 1000, budget: float = None, k: float = K_FACTOR) -> None:
+        """
+        @entrants: strategy names from STRATEGIES, each at most once\n
+        @format: "round-robin" or "swiss"\n
+        @rounds: Swiss rounds, ignored for round robin\n
+        @table: players per game\n
+        @repeats: games per table, each with the seats rotated once more. Defaults to the table size, so everyone sits everywhere.\n
+        """
+        self.config = {"entrants": list(entrants), "format": format, "rounds": rounds if format == "swiss" else 1, "table": table,
+                       "repeats": repeats or table, "seed": seed, "max_turns": max_turns, "budget": budget, "k": k}
+        self.rounds = [] # Per round: games (see schedule) and results by game index
+        self.ratings = {}
+        self.points = {}
+        self.wins = {}
+        self.played = {}
+        self.recount()
+
+    def validate(self) -> str:
+        """
+        Returns an error message if the configuration can't be played, None if it can\n
+        """
+        entrants, table = self.config["entrants"], self.config["table"]
+        unknown = [e for e in entrants if e not in STRATEGIES]
+        if unknown:
+            return f"Unknown strategies: {', '.join(unknown)}. Choose from {', '.join(STRATEGIES)}."
+        if len(set(entrants)) != len(entrants):
+            return "Each strategy can only be entered once."
+        if self.config["format"] not in FORMATS:
+            return f"Format must be one of {', '.join(FORMATS)}."
+        if not 2 <= table <= 8:
+            return "Tables seat 2 to 8 players."
+        if len(entrants) < table:
+            return f"Need at least {table} entrants for tables of {table}."
+        return None
+
+    def game_seed(self, index: int) -> int:
+        """
+        Seed of the index'th game, from the tournament seed\n
+        """
+        return derive(f"tournament:{index}", self.config["seed"])
+
+    def schedule(self) -> list:
+        """
+        Games of the next round, [{index, seed, seats}], each table played repeats times with the seats rotated\n
+        """
+        table, repeats = self.config["table"], self.config["repeats"]
+        if self.config["format"] == "round-robin":
+            tables = list(itertools.combinations(self.config["entrants"], table))
+        else:
+            tables = self.pair()
+        first = sum(len(r["games"]) for r in self.rounds)
+        games = []
+        for seats in tables:
+            for turn in range(repeats):
+                rotation = turn % table
+                index = first + len(games)
+                games.append({"index": index, "seed": self.game_seed(index), "seats": list(seats[rotation:] + seats[:rotation])})
+        return games
+
+    def standings(self) -> list:
+        """
+        Entrants best first: by points, then rating, then name\n
+        """
+        return sorted(self.config["entrants"], key=lambda e: (-self.points[e], -self.ratings[e], e))
+
+    def pair(self) -> list:
+        """
+        Swiss tables for the next round: down the standings, each table filled with the next entrants who have met
+        its players least often. Entrants left over when the tables are full sit the round out.\n
+        """
+        table = self.config["table"]
+        met = {}
+        for r in self.rounds:
+            for game in r["games"]:
+                for a, b in itertools.combinations(sorted(game["seats"]), 2):
+                    met[a, b] = met.get((a, b), 0) + 1
+        waiting = self.standings()
+        # Byes go to whoever has played most, lowest in the standings first
+        byes = len(waiting) % table
+        resting = sorted(waiting[::-1], key=lambda e: -self.played[e])[:byes] if byes else []
+        waiting = [e for e in waiting if e not in resting]
+        tables = []
+        while waiting:
+            seats = [waiting.pop(0)]
+            while len(seats) < table:
+                best = min(waiting, key=lambda e: (sum(met.get(tuple(sorted((e, s))), 0) for s in seats), waiting.index(e)))
+                waiting.remove(best)
+                seats.append(best)
+            tables.append(tuple(seats))
+        return tables
+
+    def recount(self) -> None:
+        """
+        Points and ratings from scratch, replaying the results of every finished round in game order\n
+        """
+        entrants = self.config["entrants"]
+        self.ratings = dict.fromkeys(entrants, INITIAL_RATING)
+        self.points = dict.fromkeys(entrants, 0.0)
+        self.wins = dict.fromkeys(entrants, 0)
+        self.played = dict.fromkeys(entrants, 0)
+        for r in self.rounds:
+            if len(r["results"]) == len(r["games"]):
+                self.score(r)
+
+    def score(self, r: dict) -> None:
+        """
+        Adds a finished round's results to the points and ratings, in game order\n
+        """
+        for game in r["games"]:
+            result = r["results"][str(game["index"])]
+            seats, place = game["seats"], result["places"]
+            for seat, points in zip(seats, scores(place)):
+                self.points[seat] += points
+                self.played[seat] += 1
+            for seat, p in zip(seats, place):
+                self.wins[seat] += p == 1
+            rate(self.ratings, seats, place, self.config["k"])
+
+    def finished(self) -> bool:
+        """
+        Whether every round has been scheduled and played\n
+        """
+        return len(self.rounds) == self.config["rounds"] and all(len(r["results"]) == len(r["games"]) for r in self.rounds)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the checkpoint, replacing the old one in one step\n
+        """
+        data = {"version": CHECKPOINT_VERSION, "config": self.config, "rounds": self.rounds,
+                "standings": [{"entrant": e, "points": self.points[e], "rating": round(self.ratings[e], 1),
+                               "wins": self.wins[e], "played": self.played[e]} for e in self.standings()]}
+        savegame.write_file(path, json.dumps(data, indent=1).encode())
+
+    @classmethod
+    def load(cls, path: str) -> "Tournament":
+        """
+        Tournament from a checkpoint, ratings recomputed from its results. Raises ValueError if it can't be read.\n
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != CHECKPOINT_VERSION:
+                raise ValueError(f"Checkpoint version {data.get('version')} is not supported.")
+            tournament = cls(**data["config"])
+            tournament.rounds = data["rounds"]
+        except (OSError, KeyError, TypeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Could not read checkpoint {path}: {e}")
+        tournament.recount()
+        return tournament
+
+    def run(self, workers: int = 1, checkpoint: str = None, on_game = None, on_round = None) -> None:
+        """
+        Description:
+            Plays the rest of the tournament, resuming a part played round if there is one.
+        Parameters:
+            workers (int): Processes playing games at once, 1 to play in this process.
+            checkpoint (str): File to save progress to. Optional.
+            on_game (function): Takes each game and its result as they finish. Optional.
+            on_round (function): Takes the round number once a round is scored. Optional.
+        """
+        pool = ProcessPoolExecutor(workers) if workers > 1 else None
+        options = {"budget": self.config["budget"], "max_turns": self.config["max_turns"]}
+        saved = time.monotonic()
+        try:
+            while not self.finished():
+                if not self.rounds or len(self.rounds[-1]["results"]) == len(self.rounds[-1]["games"]):
+                    self.rounds.append({"games": self.schedule(), "results": {}})
+                r = self.rounds[-1]
+                games = {game["index"]: game for game in r["games"] if str(game["index"]) not in r["results"]}
+                if pool is not None:
+                    played = as_completed([pool.submit(play_match, game, **options) for game in games.values()])
+                    played = (future.result() for future in played)
+                else:
+                    played = (play_match(game, **options) for game in games.values())
+                for result in played:
+                    r["results"][str(result["index"])] = result
+                    if on_game is not None:
+                        on_game(games[result["index"]], result)
+                    if checkpoint and time.monotonic() - saved >= CHECKPOINT_EVERY:
+                        self.save(checkpoint)
+                        saved = time.monotonic()
+                self.score(r)
+                if checkpoint:
+                    self.save(checkpoint)
+                    saved = time.monotonic()
+                if on_round is not None:
+                    on_round(len(self.rounds))
+        finally:
+            if checkpoint and not self.finished():
+                self.save(checkpoint) # Keep what was played before the interruption, before waiting on the workers
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+def main(argv: list = None) -> int:
+    """
+    Command line entry point, for python -m monopoly_directory.tournament and banker.py -tournament. Returns the exit code\n
+    """
+    parser = argparse.ArgumentParser(description="Rate Monopoly bot strategies against each other.")
+    parser.add_argument("--entrants", nargs="+", default=list(STRATEGIES), help=f"strategies to enter, from {', '.join(STRATEGIES)}")
+    parser.add_argument("--format", choices=FORMATS, default="swiss")
+    parser.add_argument("--rounds", type=int, default=5, help="Swiss rounds")
+    parser.add_argument("--table", type=int, default=2, help="players per game")
+    parser.add_argument("--repeats", type=int, default=None, help="games per table, seats rotated each time (default: the table size)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes playing games at once")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=1000)
+    parser.add_argument("--budget", type=float, default=None, help="seconds per bot decision")
+    parser.add_argument("--k", type=float, default=K_FACTOR, help="Elo K factor")
+    parser.add_argument("--checkpoint", help="save progress here, and resume from it if it exists")
+    parser.add_argument("--quiet", action="store_true", help="only print the standings")
+    args = parser.parse_args(argv)
+    tournament = Tournament(args.entrants, args.format, args.rounds, args.table, args.repeats, args.seed, args.max_turns, args.budget, args.k)
+    error = tournament.validate()
+    if error:
+        print(error)
+        return 1
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        try:
+            resumed = Tournament.load(args.checkpoint)
+        except ValueError as e:
+            print(e)
+            return 1
+        if resumed.config != tournament.config:
+            print(f"{args.checkpoint} is a checkpoint of a different tournament. Use the same options, or another --checkpoint.")
+            return 1
+        tournament = resumed
+        print(f"Resuming from {args.checkpoint}: {sum(len(r['results']) for r in tournament.rounds)} games already played.")
+    def show_game(game: dict, result: dict) -> None:
+        order = sorted(zip(result["places"], game["seats"]))
+        print(f"game {game['index']:>5}: " + ", ".join(f"{place}. {seat}" for place, seat in order) +
+              f" ({result['turns']} turns, {result['seconds']:.1f}s)" + ("" if result["finished"] else " (stopped)"))
+    def show_round(number: int) -> None:
+        print(f"After round {number} of {tournament.config['rounds']}:")
+        for i, entrant in enumerate(tournament.standings()):
+            print(f"{i + 1:>3}. {entrant:<10} {tournament.points[entrant]:6.1f} points  {tournament.ratings[entrant]:7.1f} rating  "
+                  f"{tournament.wins[entrant]:>4} wins in {tournament.played[entrant]} games")
+    start = time.perf_counter()
+    try:
+        tournament.run(args.workers, args.checkpoint, None if args.quiet else show_game, None if args.quiet else show_round)
+    except KeyboardInterrupt:
+        print("Interrupted." + (" Run the same command again to resume." if args.checkpoint else ""))
+        return 130
+    if args.quiet:
+        show_round(len(tournament.rounds))
+    print(f"{sum(len(r['results']) for r in tournament.rounds)} games in {time.perf_counter() - start:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# Turbo mode: complete bot-only games as fast as the engine plays them, to soak-test the engine, the game
+# log and saves before a release. Nothing is drawn and nobody is notified or waited on. Each game's only
+# output is its event log (gamelog.py), which is replayed and checked against the finished game, and the
+# game is round-tripped through a save every --save-every turns.
+#
+#   python -m monopoly_directory.turbo --games 200 --workers 4 --report turbo.jsonl
+#   python banker.py -turbo --games 200 --workers 4                                    (same thing)
+#
+# Games are spread over --workers processes. Each worker plays its games one after another, so a game's
+# wall time is its own. Memory high-water is the worker's peak RSS so far, or the game's own peak
+# allocations with --trace-memory (exact, but about ten times slower).
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from monopoly_directory.bots import Bot, DIFFICULTIES
+from monopoly_directory.engine import MonopolyEngine, GAME_OVER
+from monopoly_directory.gamelog import GameLog, encode_snapshot, verify, recover
+from monopoly_directory import savegame
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+def rss_high_water() -> int:
+    """
+    Peak resident memory of this process in KB, None where it can't be read\n
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak # Bytes on macOS, KB elsewhere
+
+def play_game(seed: int, players: int = 4, difficulty: str = "easy", budget: float = None, max_turns: int = 1000,
+              log_dir: str = None, save_every: int = 0, trace_memory: bool = False) -> dict:
+    """
+    Description:
+        Plays one bot-only game to the end (or max_turns), logging it, then checks the log replays to the same game.
+    Parameters:
+        seed (int): Game seed.
+        players (int): Bots in the game.
+        difficulty (str): Key of bots.DIFFICULTIES.
+        budget (float): Seconds per bot decision, defaults to the bots' own.
+        max_turns (int): Games still running after this many turns are stopped.
+        log_dir (str): Where the game log goes.
+        save_every (int): Turns between save round trips, 0 for none.
+        trace_memory (bool): Measure the game's own peak allocations with tracemalloc.
+    Returns:
+        dict: seed, finished, winner, turns, actions, seconds, turns_per_second, memory_kb, snapshots (checked by replay), saves.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    bot = Bot(DIFFICULTIES[difficulty]) if budget is None else Bot(DIFFICULTIES[difficulty], budget)
+    engine = MonopolyEngine([f"Bot {i + 1}" for i in range(players)], seed=seed)
+    path = os.path.join(log_dir or tempfile.gettempdir(), f"turbo-{seed}.tmlog")
+    log = GameLog.create(engine, path)
+    start = time.perf_counter()
+    actions, saves, saved_at = 0, 0, 0
+    while engine.phase != GAME_OVER and engine.turns < max_turns:
+        actions += bot.play_turn(engine, engine.turn)
+        if save_every and engine.turns - saved_at >= save_every:
+            saved_at = engine.turns
+            loaded, _ = savegame.decode(savegame.encode(engine, [], []), [])
+            assert encode_snapshot(loaded) == encode_snapshot(engine), f"Game {seed}: save round trip differs at turn {engine.turns}"
+            saves += 1
+    seconds = time.perf_counter() - start
+    log.snapshot(engine)
+    log.close()
+    memory = tracemalloc.get_traced_memory()[1] // 1024 if trace_memory else rss_high_water()
+    if trace_memory:
+        tracemalloc.stop()
+    snapshots = verify(path)
+    recovered = recover(path)
+    recovered.log.close()
+    assert encode_snapshot(recovered) == encode_snapshot(engine), f"Game {seed}: recovered game differs"
+    return {"seed": seed, "finished": engine.phase == GAME_OVER, "winner": engine.winner, "turns": engine.turns, "actions": actions,
+            "seconds": seconds, "turns_per_second": engine.turns / seconds if seconds else 0.0, "memory_kb": memory,
+            "snapshots": snapshots, "saves": saves}
+
+def run(games: int = 100, workers: int = 1, seed: int = 0, report: str = None, keep_logs: bool = False, on_game = None, **options) -> dict:
+    """
+    Description:
+        Plays many bot-only games, spread over worker processes.
+    Parameters:
+        games (int): Games to play.
+        workers (int): Processes playing at once, 1 to play in this process.
+        seed (int): Seed of the first game, the others follow on.
+        report (str): File to write each game's result to, one JSON object per line. Optional.
+        keep_logs (bool): Keep the game logs (in logs/turbo-<time>/) instead of deleting them.
+        on_game (function): Takes each game's result as it finishes. Optional.
+        options: Passed on to play_game.
+    Returns:
+        dict: games, finished, turns, actions, seconds (wall), turns_per_second, slowest (game seconds), memory_kb (highest).
+    """
+    if keep_logs:
+        log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "logs", time.strftime("turbo-%Y%m%d-%H%M%S"))
+        os.makedirs(log_dir, exist_ok=True)
+    else:
+        log_dir = tempfile.mkdtemp(prefix="turbo-")
+    options["log_dir"] = log_dir
+    game = partial(play_game, **options)
+    results = []
+    out = open(report, "w") if report else None
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        played = pool.map(game, range(seed, seed + games), chunksize=max(1, games // (workers * 4))) if pool else map(game, range(seed, seed + games))
+        for result in played:
+            results.append(result)
+            if out is not None:
+                out.write(json.dumps(result) + "\n")
+            if on_game is not None:
+                on_game(result)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if out is not None:
+            out.close()
+        if not keep_logs:
+            shutil.rmtree(log_dir, ignore_errors=True)
+    seconds = time.perf_counter() - start
+    turns = sum(r["turns"] for r in results)
+    memory = [r["memory_kb"] for r in results if r["memory_kb"] is not None]
+    return {"games": len(results), "finished": sum(r["finished"] for r in results), "turns": turns,
+            "actions": sum(r["actions"] for r in results), "seconds": seconds, "turns_per_second": turns / seconds if seconds else 0.0,
+            "slowest": max((r["seconds"] for r in results), default=0.0), "memory_kb": max(memory, default=None)}
+
+def main(argv: list = None) -> int:
+    """
+    Command line entry point, for python -m monopoly_directory.turbo and banker.py -turbo. Returns the exit code\n
+    """
+    parser = argparse.ArgumentParser(description="Play bot-only Monopoly games as fast as possible, as a soak test.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1, help="processes playing games at once")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--difficulty", choices=DIFFICULTIES, default="easy")
+    parser.add_argument("--budget", type=float, default=None, help="seconds per bot decision")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=1000)
+    parser.add_argument("--save-every", type=int, default=100, help="turns between save round trips, 0 for none")
+    parser.add_argument("--trace-memory", action="store_true", help="measure each game's own peak allocations (slower)")
+    parser.add_argument("--report", help="write each game's result to this file, one JSON object per line")
+    parser.add_argument("--keep-logs", action="store_true", help="keep the game logs in logs/turbo-<time>/")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args(argv)
+    def show(result: dict) -> None:
+        memory = f"{result['memory_kb'] / 1024:.1f}MB" if result["memory_kb"] is not None else "-"
+        print(f"game {result['seed']:>5}: {result['turns']:>5} turns in {result['seconds']:6.2f}s, "
+              f"{result['turns_per_second']:8,.0f} turns/s, memory {memory}" + ("" if result["finished"] else " (stopped)"))
+    try:
+        summary = run(args.games, args.workers, args.seed, args.report, args.keep_logs, None if args.quiet else show,
+                      players=args.players, difficulty=args.difficulty, budget=args.budget, max_turns=args.max_turns,
+                      save_every=args.save_every, trace_memory=args.trace_memory)
+    except AssertionError as e:
+        print(f"Soak test failed: {e}")
+        return 1
+    memory = f"{summary['memory_kb'] / 1024:.1f}MB" if summary["memory_kb"] is not None else "-"
+    print(f"{summary['games']} games ({summary['finished']} finished), {summary['turns']} turns, {summary['actions']} actions in {summary['seconds']:.1f}s")
+    print(f"{summary['turns_per_second']:,.0f} turns/s, slowest game {summary['slowest']:.2f}s, memory high-water {memory}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
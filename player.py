@@ -10,6 +10,7 @@ import utils.screenspace as ss
 import modules_directory.inventory as inv
 
 from time import sleep
+from utils.oof_scheduler import OofScheduler, DEFAULT_INTERVAL
 from utils.utils import validate_address, validate_port, validate_name
 from modules_directory.loan import main as load_loan_menu
 
@@ -26,6 +27,10 @@ NET_COMMANDS_ENABLED = False
 TERMINALS = [ss.Terminal(1, (2, 2)), ss.Terminal(2, (ss.cols+3, 2)), ss.Terminal(3, (2, ss.rows+3)), ss.Terminal(4, (ss.cols+3, ss.rows+3))]
 active_terminal = TERMINALS[0]
 inventory = inv.Inventory() # global inventory object for all modules to access
+# The server socket carries one request and its reply at a time, so only one thread may use it at once.
+# The input thread holds this lock except while it waits at its prompt, which is when the out-of-focus
+# scheduler (and the notification listener) get their turn.
+server_lock = threading.Lock()
 
 def banker_check(local: bool = False) -> None:
     """
@@ -204,41 +209,27 @@ def handshake(sock: socket.socket, name: str) -> str:
     else:
         ss.print_w_dots(ss.COLORS.RED+"Handshake failed. Reason: Connected to wrong foreign socket.")
 
-def print_queue():
+def oof_visible(t: ss.Terminal) -> bool:
     """
-    Responsible for updating all Terminal screens with persistent modules, i.e. modules that may be updated while not as the active terminal.
-    Ran in its independent thread.
+    Whether an out-of-focus terminal can currently be seen, and so is worth refreshing.
     """
-    while True: # TODO: updating certain terminals with networking commands CAN crash the game because the player
-                # receives a message for some module that is not the terminal being updated in this loop, or vice versa.
-                # 
-                # Steps to recreate:
-                # Run a module that has a oof callable that is not the active terminal, and then, in another terminal,
-                # run a module that has a different oof callable. Have the other 2 terminals also have oof callables.
-                # Then, run a command that updates the active terminal. The game may crash because the data is not in sync.
-                #  
-                # The data becomes out of sync, or not a 1-to-1 mapping. A better solution is to have a queue of messages 
-                # to parse through as they're received, and then update the terminal with the correct data based on a 
-                # tag or identifier. 
-        if screen == 'terminal': # Only update if we are in the terminal screen.
-            # sleep(1)
-            # net.mtp = True # Pause the main thread from sending messages while we update terminals
-            # sleep(1)
-            for t in TERMINALS:
-                if t.status == "DISABLED" or t.status == "BUSY": # Skip disabled or (just in case) busy terminals.
-                    continue
-                sleep(0.5)
-                # Also important to delay to ensure calls to banker are not overwhelming.
-                if not t.oof_callable == None and t.index != active_terminal.index: # Only update if the terminal is not active and has an out-of-focus callable.
-                    data = t.oof_callable() # Call the out-of-focus function to get the new data.
-                    t.check_new_data(data) # Check if new data is available.
-                    if t.has_new_data and t.oof_callable is not None: # Only update terminal if there is new data, to avoid unnecessary prints.
-                        t.clear() # Clear the terminal before updating it.
-                        t.update(data, padding=False) # Update the terminal with new data.
-                        t.has_new_data = False # Reset the flag.
-                else: 
-                    continue # No need to update if no callable or terminal is active.
-            net.mtp = False # Resume the main thread after updating terminals
+    # oof() functions talk to the server, so they only run while server_lock is free (see OofScheduler.refresh).
+    # TODO: tagged replies would let them run while a command is in progress too.
+    return screen == 'terminal' and t.index != active_terminal.index and t.status not in ("DISABLED", "BUSY")
+
+oof_scheduler = OofScheduler(oof_visible, server_lock) # Responsible for updating all Terminal screens with persistent modules, i.e. modules that may be updated while not as the active terminal.
+
+def set_oof(t: ss.Terminal, run = None) -> None:
+    """
+    Sets a terminal's out-of-focus callable to the oof function of the module that owns run, and 
+    registers it with the scheduler. Clears it if there is no such function (or run is None).
+    """
+    module = sys.modules.get(run.__module__) if run else None
+    t.oof_callable = getattr(module, 'oof', None)
+    if t.oof_callable is None:
+        oof_scheduler.unregister(t)
+    else:
+        oof_scheduler.register(t, getattr(module, 'oof_interval', DEFAULT_INTERVAL))
 
 def start_notification_listener(my_socket: socket.socket) -> None:
     """
@@ -282,7 +273,8 @@ def start_notification_listener(my_socket: socket.socket) -> None:
             elif(term[0] == "disable"):
                 TERMINALS[int(term[1])].disable()
             elif(term[0] == "enable"):
-                TERMINALS[int(term[1])].enable(True, sockets[1], player_id)
+                with server_lock:
+                    TERMINALS[int(term[1])].enable(True, sockets[1], player_id)
         elif "ATTACK:" in notif:
             for t in TERMINALS:
                 if not t.status == "DISABLED":  # If terminal is not busy
@@ -296,7 +288,8 @@ def start_notification_listener(my_socket: socket.socket) -> None:
             i = __import__('attack_modules.' + attack_game, fromlist=[''])
             penalty = i.play(t, amount);
             #problem with socket
-            net.send_message(sockets[1], f"{player_id}attack {player_id} lose {penalty} {attacker}")
+            with server_lock:
+                net.send_message(sockets[1], f"{player_id}attack {player_id} lose {penalty} {attacker}")
         elif "MPLY:" in notif: # Get the Monopoly board state. Overwrite the entire screen.
             gameboard = notif[5:]
             ss.clear_screen()
@@ -313,6 +306,7 @@ def start_notification_listener(my_socket: socket.socket) -> None:
                 # ss.update_terminal(active_terminal.index, active_terminal.index)
                 active_terminal.indicate_keyboard_hook(off=True) # workaround to get green 'active terminal' bars surrounding it
                 ss.set_cursor(0, ss.INPUTLINE)
+                oof_scheduler.wake()
 
 import importlib
 def get_module_commands() -> dict: 
@@ -335,6 +329,16 @@ def get_module_commands() -> dict:
                 pairs[module.command] = module.run # Add the command and its corresponding function to the dictionary
     return pairs
 
+def prompt_input() -> str:
+    """
+    Waits for a line at the main prompt. The server socket is free for other threads while waiting (see server_lock).
+    """
+    server_lock.release()
+    try:
+        return input(ss.COLORS.backBLACK+'\r').lower().strip()
+    finally:
+        server_lock.acquire()
+
 def get_input() -> None:
     """
     Main loop for input handling while in the terminal screen. Essentially just takes input from user, 
@@ -345,7 +349,8 @@ def get_input() -> None:
     """
     global active_terminal, screen, player_id
     cmds = get_module_commands()
-    threading.Thread(target=print_queue, daemon=True).start()
+    oof_scheduler.start()
+    server_lock.acquire()
 
     stdIn = ""
     skip_initial_input = False
@@ -357,7 +362,7 @@ def get_input() -> None:
             # I turned off my brain while writing this part. The player can essentially send any command here
             # and it is only slightly regulated by the server. Better client-side handling is needed. TODO
             if not skip_initial_input:
-                stdIn = input(ss.COLORS.backBLACK+'\r').lower().strip()
+                stdIn = prompt_input()
             skip_initial_input = False
             if stdIn.isspace() or stdIn == "":
                 # On empty input make sure to jump back on the console line instead of printing anew
@@ -387,7 +392,7 @@ def get_input() -> None:
             if active_terminal.persistent and last_terminal != active_terminal.index:
                 stdIn = active_terminal.command
             else:
-                stdIn = input(ss.COLORS.backBLACK+'\r').lower().strip()
+                stdIn = prompt_input()
 
             last_terminal = active_terminal.index
             
@@ -399,6 +404,7 @@ def get_input() -> None:
                     active_terminal = TERMINALS[n-1] # Update active terminal, n-1 because list is 0-indexed
                     active_terminal.change_border_color(ss.COLORS.GREEN)
                     ss.overwrite(ss.COLORS.RESET + ss.COLORS.GREEN + "Active terminal set to " + str(n) + ".")
+                    oof_scheduler.wake() # The previously active terminal is out of focus now
                     continue
                 else:
                     ss.overwrite(ss.COLORS.RESET + ss.COLORS.RED + "Include a number between 1 and 4 (inclusive) after 'term' to set the active terminal.")
@@ -418,7 +424,7 @@ def get_input() -> None:
                 help_cmd = stdIn.split(" ")
                 if(4 > len(help_cmd) > 1 and help_cmd[1] in cmds.keys()):
                     active_terminal.command = "help" # Set the command for the active terminal
-                    active_terminal.oof_callable = None # Help does not need an out-of-focus callable
+                    set_oof(active_terminal) # Help does not need an out-of-focus callable
                     cmds["help"](player_id=player_id, server=sockets[1], active_terminal=active_terminal, param=help_cmd[1:]) # Call the function with the required parameters
                     continue
                 else: 
@@ -430,7 +436,7 @@ def get_input() -> None:
                 active_terminal.clear()
                 active_terminal.update("")
                 active_terminal.display()
-                active_terminal.oof_callable = None
+                set_oof(active_terminal)
                 active_terminal.persistent = False
                 active_terminal.command = ""
                 ss.overwrite(ss.COLORS.GREEN + "Terminal cleared.")
@@ -446,7 +452,7 @@ def get_input() -> None:
                         break
                 if usable:
                     active_terminal.command = stdIn # Set the command for the active terminal
-                    active_terminal.oof_callable = cmds[stdIn] if hasattr(cmds[stdIn], 'oof') else None # Set the out of focus callable function if it exists
+                    set_oof(active_terminal, cmds[stdIn]) # Set the out of focus callable function if it exists
                     cmds[stdIn](player_id=player_id, server=sockets[1], active_terminal=active_terminal) # Call the function with the required parameters
                     ss.overwrite(ss.COLORS.RESET)
                     continue
@@ -492,6 +498,7 @@ def get_input() -> None:
                     for t in TERMINALS:
                         t.display()
                     ss.update_terminal(active_terminal.index, active_terminal.index)
+                    oof_scheduler.wake()
                 elif stdIn.startswith("kill"):
                     if(len(stdIn.split(" ")) == 3):
                         net.send_message(sockets[1], f'{player_id}' + stdIn)
@@ -509,6 +516,7 @@ def get_input() -> None:
                     ss.overwrite(ss.COLORS.RED + "Invalid command. Type 'help' for a list of commands.")
                     continue
 
+    server_lock.release()
     if stdIn == "exit" and game_running:
         ss.overwrite('\n' + ' ' * ss.WIDTH)
         ss.overwrite(ss.COLORS.RED + "You are still in a game!")
@@ -0,0 +1,47 @@
+import socket
+import sys
+import utils.networking as net
+import utils.screenspace as ss
+from utils.utils import validate_address, validate_port
+
+# Watch a game without playing in it: python spectator.py [ip] [port]
+# The port is the one the Banker was started on. Spectators connect three ports above it and only ever receive,
+# first the whole board, then what changed on it (see utils/spectators.py).
+
+SPECTATOR_PORT_OFFSET = 3
+
+def watch(address: str, port: int) -> None:
+    """
+    Shows a Banker's board until the Banker goes away.
+
+    Parameters:
+        address (str): Banker's IP address, or localhost.
+        port (int): Port the Banker was started on.
+
+    Returns:
+        None
+    """
+    with socket.create_connection((address, port + SPECTATOR_PORT_OFFSET)) as banker:
+        ss.clear_screen()
+        while True:
+            try:
+                message = net.receive_message(banker)
+            except (ValueError, OSError): # An empty read is the Banker closing the connection
+                break
+            if message.startswith("SPEC:"):
+                sys.stdout.write(message[len("SPEC:"):])
+                sys.stdout.flush()
+    print(ss.set_cursor_str(0, 41) + ss.MYCOLORS.RESET + "The game has ended or the Banker closed the connection.")
+
+if __name__ == "__main__":
+    ss.choose_colorset("DEFAULT_COLORS")
+    address = sys.argv[1] if len(sys.argv) > 1 else input("Banker's IP address (or localhost): ")
+    while address != "localhost" and not validate_address(address):
+        address = input("Invalid address. Banker's IP address (or localhost): ")
+    port = sys.argv[2] if len(sys.argv) > 2 else input("Banker's port: ")
+    while not validate_port(port):
+        port = input("Banker's port: ")
+    try:
+        watch(address, int(port))
+    except OSError:
+        print(f"Could not connect to a Banker at {address} port {port}.")
@@ -0,0 +1,203 @@
+import threading
+import time
+from utils.turn_controller import TimerWheel
+
+AUCTION_LENGTH = 60.0 # Seconds an auction runs before any extension
+SNIPE_WINDOW = 10.0 # A bid with less than this many seconds left extends the auction back to SNIPE_WINDOW
+MIN_INCREMENT = 10 # A bid must beat the current one by at least this much
+MAX_LOTS = 4 # Open auctions at once, the trading screen has room for four
+
+class Lot:
+    """
+    One auction. asset is ("property", location) or ("item", category, item, quantity).
+    price is the reserve until someone bids, then the highest bid.
+    """
+    def __init__(self, number: int, seller: int, asset: tuple, name: str, reserve: int, ends: float) -> None:
+        self.number = number
+        self.seller = seller
+        self.asset = asset
+        self.name = name
+        self.price = reserve
+        self.bidder = -1 # Highest bidder, -1 for none yet
+        self.ends = ends # time.monotonic() when the auction closes
+        self.timer = None # Closing timer on the wheel
+        self.watchers = {seller} # Players told about every bid
+        self.extensions = 0 # Times a late bid pushed the end back
+
+    def remaining(self) -> int:
+        """Returns: int: Whole seconds left, rounded up."""
+        return max(0, int(self.ends - time.monotonic() + 0.999))
+
+class AuctionHouse:
+    """
+    Runs every open auction from one thread and one timer wheel, however many lots are open.
+
+    Opening, bidding and watching are quick and safe from any thread. Bid notifications to watchers
+    are queued and sent by the auction thread, so a bid never waits on a player's connection. When a
+    lot's timer fires it is closed to new bids, then settle(lot) does the sale (on the game actor, so
+    cash and the asset move together or not at all) and seller, winner and watchers are told the result.
+
+    A bid in the last SNIPE_WINDOW seconds pushes the end back to SNIPE_WINDOW from now, so everyone
+    watching gets a chance to answer it.
+    """
+    def __init__(self, settle = None, notify = None, log = None, length: float = AUCTION_LENGTH) -> None:
+        """
+        Parameters:
+            settle (function): Takes a closed Lot with a bidder and does the sale. Returns None, or why it failed.
+            notify (function): Takes a player id and a message, sends it over the notification channel.
+            log (function): Takes a message, for the Banker's output. Optional.
+            length (float): Seconds each auction runs.
+        """
+        self.settle = settle
+        self.notify = notify or (lambda player, message: None)
+        self.log = log or (lambda message: None)
+        self.length = length
+        self.condition = threading.Condition()
+        self.wheel = TimerWheel()
+        self.lots = {} # Lot number -> open Lot
+        self.outbox = [] # (player, message) waiting to be sent
+        self.next_number = 1
+        self.thread = None
+        self.sold = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Starts the auction thread."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True, name="AuctionHouse")
+            self.thread.start()
+
+    def open(self, seller: int, asset: tuple, name: str, reserve: int) -> str:
+        """
+        Puts an asset up for auction. The caller checks the seller has it to sell.
+
+        Returns:
+            str: Why the lot could not be opened, or None.
+        """
+        with self.condition:
+            if any(lot.seller == seller for lot in self.lots.values()):
+                return "You already have an open auction."
+            if asset[0] == "property" and any(lot.asset == asset for lot in self.lots.values()):
+                return f"{name} is already up for auction."
+            if len(self.lots) >= MAX_LOTS:
+                return "The auction house is full, try again later."
+            if reserve < 0:
+                return "The reserve can't be negative."
+            lot = Lot(self.next_number, seller, asset, name, reserve, time.monotonic() + self.length)
+            self.next_number += 1
+            lot.timer = self.wheel.schedule(self.length, lambda: self.close(lot))
+            self.lots[lot.number] = lot
+            self.condition.notify()
+        self.log(f"Auction {lot.number} opened: {name}, reserve ${reserve}.")
+        return None
+
+    def bid(self, number: int, bidder: int, amount: int, cash: int) -> str:
+        """
+        Places a bid.
+
+        Parameters:
+            number (int): Lot number.
+            bidder (int): Player id.
+            amount (int): Bid.
+            cash (int): The bidder's cash now. Checked again when the lot is settled.
+
+        Returns:
+            str: Why the bid was refused, or None.
+        """
+        with self.condition:
+            lot = self.lots.get(number)
+            if lot is None:
+                return "That auction has closed."
+            if bidder == lot.seller:
+                return "You can't bid on your own auction."
+            minimum = lot.price if lot.bidder == -1 else lot.price + MIN_INCREMENT
+            if amount < minimum:
+                return f"Bids must be at least ${minimum}."
+            if amount > cash:
+                return "You don't have enough cash for that bid."
+            outbid = lot.bidder
+            lot.price, lot.bidder = amount, bidder
+            lot.watchers.add(bidder)
+            left = lot.ends - time.monotonic()
+            if left < SNIPE_WINDOW: # Late bid: give everyone else time to answer it
+                lot.ends += SNIPE_WINDOW - left
+                lot.extensions += 1
+                self.wheel.cancel(lot.timer)
+                lot.timer = self.wheel.schedule(SNIPE_WINDOW, lambda: self.close(lot))
+            message = f"Auction {lot.number} ({lot.name}): ${amount} bid, {lot.remaining()}s left."
+            self.outbox += [(player, message) for player in lot.watchers if player not in (bidder, outbid)]
+            if outbid not in (-1, bidder):
+                self.outbox.append((outbid, f"You were outbid on {lot.name}: " + message))
+            self.condition.notify()
+        return None
+
+    def watch(self, number: int, player: int) -> Lot:
+        """
+        Subscribes a player to a lot's bids.
+
+        Returns:
+            Lot: The lot, or None if it has closed.
+        """
+        with self.condition:
+            lot = self.lots.get(number)
+            if lot is not None:
+                lot.watchers.add(player)
+            return lot
+
+    def open_lots(self) -> list:
+        """Returns: list: Open lots, oldest first."""
+        with self.condition:
+            return sorted(self.lots.values(), key=lambda lot: lot.number)
+
+    def lot_of(self, seller: int) -> Lot:
+        """Returns: Lot: The seller's open lot, or None."""
+        with self.condition:
+            return next((lot for lot in self.lots.values() if lot.seller == seller), None)
+
+    def stats(self) -> dict:
+        """Returns: dict: open, sold and failed lots."""
+        with self.condition:
+            return {"open": len(self.lots), "sold": self.sold, "failed": self.failed}
+
+    def run(self) -> None:
+        """Auction loop. Sleeps until a lot is due to close or there are notifications to send."""
+        while True:
+            with self.condition:
+                while not self.outbox:
+                    next_tick = self.wheel.next_tick()
+                    if next_tick is not None and next_tick <= time.monotonic():
+                        break
+                    self.condition.wait(None if next_tick is None else next_tick - time.monotonic())
+                due = self.wheel.advance()
+                outbox, self.outbox = self.outbox, []
+            for player, message in outbox:
+                self.send(player, message)
+            for callback in due:
+                callback()
+
+    def close(self, lot: Lot) -> None:
+        """Timer callback: closes a lot to bids, settles it and tells everyone involved. Runs without the lock held."""
+        with self.condition:
+            if self.lots.pop(lot.number, None) is None:
+                return
+        if lot.bidder == -1:
+            result = f"Auction {lot.number} ({lot.name}) closed with no bids."
+        else:
+            error = self.settle(lot) if self.settle is not None else None
+            with self.condition:
+                self.sold += error is None
+                self.failed += error is not None
+            if error is None:
+                result = f"Auction {lot.number}: {lot.name} sold for ${lot.price}."
+            else:
+                result = f"Auction {lot.number}: the sale of {lot.name} fell through. {error}"
+        self.log(result)
+        for player in lot.watchers:
+            self.send(player, result)
+
+    def send(self, player: int, message: str) -> None:
+        """Sends one notification. A player who has gone away doesn't stop the others being told."""
+        try:
+            self.notify(player, message)
+        except Exception:
+            self.log(f"Could not notify player {player}: {message}")
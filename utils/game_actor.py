@@ -0,0 +1,101 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+class GameActor:
+    """
+    Owns a game's state: every mutation is a command run on the actor's own thread, one at a time,
+    in the order they were submitted. Threads that only need to read use view(), an immutable
+    snapshot republished after each command, and never see a game halfway through a change.
+
+    Commands may submit or call other commands. From the actor's own thread they simply run inline.
+    """
+    def __init__(self, snapshot = None, name: str = "GameActor") -> None:
+        """
+        Parameters:
+            snapshot (function): Returns an immutable view of the game, called on the actor thread after each command. Optional.
+            name (str): Thread name.
+        """
+        self.snapshot = snapshot
+        self.name = name
+        self.commands = queue.SimpleQueue()
+        self.thread = None
+        self.state = None # Latest view, replaced (never modified) after each command
+        self.processed = 0 # Commands run
+        self.listeners = [] # Functions called on the actor thread after each command, before the view is republished
+        self.listener_errors = 0
+
+    def start(self) -> None:
+        """Starts the actor thread, if it isn't running already."""
+        if self.thread is None:
+            self.publish()
+            self.thread = threading.Thread(target=self.run, daemon=True, name=self.name)
+            self.thread.start()
+
+    def stop(self) -> None:
+        """Stops the actor once the commands already submitted have run."""
+        if self.thread is not None:
+            self.commands.put(None)
+            if threading.current_thread() is not self.thread:
+                self.thread.join()
+            self.thread = None
+
+    def on_actor(self) -> bool:
+        """Returns: bool: Whether the calling thread is the actor thread, or there is no actor thread (not started)."""
+        return self.thread is None or threading.current_thread() is self.thread
+
+    def submit(self, function, *args, **kwargs) -> Future:
+        """
+        Queues a command without waiting for it.
+
+        Returns:
+            Future: Resolves to the command's return value, or raises its exception.
+        """
+        future = Future()
+        if self.on_actor():
+            self.execute(future, function, args, kwargs)
+        else:
+            self.commands.put((future, function, args, kwargs))
+        return future
+
+    def call(self, function, *args, **kwargs):
+        """Runs a command on the actor and waits for it. Returns its return value, raises its exception."""
+        return self.submit(function, *args, **kwargs).result()
+
+    def view(self):
+        """Returns: The latest immutable snapshot of the game (see snapshot in __init__). Safe from any thread."""
+        return self.state
+
+    def run(self) -> None:
+        """Actor loop: runs commands one at a time until stop()."""
+        while True:
+            command = self.commands.get()
+            if command is None:
+                return
+            self.execute(*command)
+
+    def execute(self, future: Future, function, args: tuple, kwargs: dict) -> None:
+        """Runs one command and republishes the view."""
+        if not future.set_running_or_notify_cancel():
+            return
+        result, error = None, None
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            error = e
+        self.processed += 1
+        for listener in self.listeners:
+            try:
+                listener()
+            except Exception: # A broken listener must not stop the actor or fail the command
+                self.listener_errors += 1
+        self.publish() # Before resolving, so the caller already sees the command's effects in view()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def publish(self) -> None:
+        """Replaces the view with a fresh snapshot."""
+        if self.snapshot is not None:
+            self.state = self.snapshot()
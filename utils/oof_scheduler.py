@@ -0,0 +1,146 @@
+import threading
+import time
+
+DEFAULT_INTERVAL = 1.0 # Seconds between refreshes of a terminal whose data keeps changing
+MAX_INTERVAL = 8.0 # Slowest a terminal is polled once its data has stopped changing
+BACKOFF = 2.0 # Interval multiplier for each refresh that returned the same data
+RECENT = 10.0 # Seconds a terminal counts as "recently changed", which wins ties between due terminals
+
+class OofScheduler:
+    """
+    Refreshes out-of-focus (OOF) terminals, i.e. terminals running a module with an oof() function
+    that are not the active terminal.
+
+    Each registered terminal has its own refresh interval. The interval resets to the base whenever
+    the module returns new data, and backs off (up to MAX_INTERVAL) while the data stays the same.
+    Terminals that can't be seen right now (active, disabled, busy, or the player is on the gameboard)
+    are not polled at all. With nothing registered the thread waits on a condition, using no CPU.
+
+    Runs in its own daemon thread, so the input thread never waits on an oof() call. oof() functions share
+    the server socket with the input thread, so each call is made holding the socket's lock. A terminal
+    that comes due while someone else holds it is tried again one base interval later.
+    """
+    def __init__(self, eligible, lock = None):
+        """
+        Parameters:
+            eligible (function): Takes a Terminal and returns whether it should be refreshed right now.
+            lock (threading.Lock): Held by whoever is using the server socket. Optional.
+        """
+        self.eligible = eligible
+        self.lock = lock
+        self.entries = {} # Terminal index -> scheduling state and stats
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def start(self) -> None:
+        """Starts the scheduler thread, if it isn't running already."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def register(self, terminal, interval: float = DEFAULT_INTERVAL) -> None:
+        """
+        Schedules a terminal's oof_callable, starting with a refresh one interval from now.
+
+        Parameters:
+            terminal (Terminal): Terminal with oof_callable set.
+            interval (float): Base refresh interval for this terminal, in seconds.
+        """
+        with self.condition:
+            self.entries[terminal.index] = {
+                "terminal": terminal,
+                "base": interval,
+                "interval": interval,
+                "due": time.monotonic() + interval,
+                "last_change": time.monotonic(),
+                "refreshes": 0, # oof() calls
+                "redraws": 0, # Refreshes that returned new data
+                "skipped": 0, # Times the terminal was due but not visible, or the server socket was in use
+                "errors": 0,
+                "busy_time": 0.0 # Seconds spent in oof() and redrawing
+            }
+            self.condition.notify()
+
+    def unregister(self, terminal) -> None:
+        """Stops refreshing a terminal."""
+        with self.condition:
+            self.entries.pop(terminal.index, None)
+
+    def wake(self) -> None:
+        """
+        Makes every terminal due now at its base interval. Call when visibility changes, e.g. after
+        switching the active terminal or returning from the gameboard.
+        """
+        with self.condition:
+            now = time.monotonic()
+            for entry in self.entries.values():
+                entry["interval"] = entry["base"]
+                entry["due"] = now
+            self.condition.notify()
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Terminal index -> {command, interval, refreshes, redraws, skipped, errors, busy_time}.
+        """
+        with self.condition:
+            return {index: {"command": e["terminal"].command, "interval": e["interval"], "refreshes": e["refreshes"],
+                            "redraws": e["redraws"], "skipped": e["skipped"], "errors": e["errors"],
+                            "busy_time": e["busy_time"]} for index, e in self.entries.items()}
+
+    def run(self) -> None:
+        """Scheduler loop. Sleeps until the next terminal is due and refreshes it."""
+        while True:
+            with self.condition:
+                while True:
+                    if not self.entries:
+                        self.condition.wait() # Nothing to do until something registers
+                        continue
+                    now = time.monotonic()
+                    # Earliest due first. Among terminals due at the same time, the most recently changed goes first.
+                    entry = min(self.entries.values(), key=lambda e: (e["due"], -e["last_change"]))
+                    if entry["due"] <= now:
+                        break
+                    self.condition.wait(entry["due"] - now)
+                terminal = entry["terminal"]
+                if not self.eligible(terminal):
+                    entry["skipped"] += 1
+                    entry["due"] = now + MAX_INTERVAL # wake() brings it back as soon as it can be seen
+                    continue
+            self.refresh(entry)
+
+    def refresh(self, entry: dict) -> None:
+        """Calls a terminal's oof_callable and redraws the terminal if the data changed. Runs without the condition held."""
+        terminal = entry["terminal"]
+        if self.lock is not None and not self.lock.acquire(blocking=False):
+            with self.condition: # Socket in use, e.g. by a command on the input thread
+                entry["skipped"] += 1
+                entry["due"] = time.monotonic() + entry["base"]
+            return
+        start = time.monotonic()
+        changed = False
+        try:
+            try:
+                data = terminal.oof_callable()
+            finally:
+                if self.lock is not None:
+                    self.lock.release()
+            terminal.check_new_data(data)
+            if terminal.has_new_data:
+                changed = True
+                terminal.clear() # Clear the terminal before updating it.
+                terminal.update(data, padding=False)
+                terminal.has_new_data = False
+        except Exception:
+            entry["errors"] += 1
+        now = time.monotonic()
+        with self.condition:
+            entry["refreshes"] += 1
+            entry["busy_time"] += now - start
+            if changed:
+                entry["redraws"] += 1
+                entry["last_change"] = now
+                entry["interval"] = entry["base"]
+            else:
+                entry["interval"] = min(entry["interval"] * BACKOFF, MAX_INTERVAL)
+            entry["due"] = now + entry["interval"]
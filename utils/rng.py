@@ -0,0 +1,166 @@
+# Named random number streams. Every subsystem draws from its own stream (rng.stream("slots"),
+# rng.stream("fishing")...), each seeded from one master seed and the stream's name, so a whole session
+# is reproduced by reusing the master seed, and one subsystem drawing more numbers never shifts another.
+#
+# The master seed comes from the TM_SEED environment variable, or rng.seed(), or is picked at random.
+# Either way it is in rng.master_seed, so it can be printed with a bug report.
+import hashlib
+import os
+import random
+import struct
+import threading
+
+MT_STATE = struct.Struct("<624IIBd") # random.Random state: Mersenne Twister words, position, has gauss_next, gauss_next
+PCG_STATE = struct.Struct("<QQQQBI") # PCG64 state and increment (as 64 bit halves), has_uint32, uinteger
+STREAMS_HEADER = struct.Struct("<QHHH") # master seed, spawn prefixes, Python streams, NumPy streams
+SPAWN_COUNT = struct.Struct("<I")
+
+master_seed = None
+streams = {} # Name -> random.Random
+generators = {} # Name -> numpy.random.Generator
+spawned = {} # Prefix -> number of generators spawned with that prefix
+lock = threading.Lock()
+
+def derive(name: str, master: int = None) -> int:
+    """
+    64 bit seed for a stream, from the master seed and the stream's name\n
+    @master: seed to derive from instead of the master seed, e.g. a tournament's own\n
+    """
+    digest = hashlib.sha256(f"{master_seed if master is None else master}:{name}".encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+def seed(value: int = None) -> int:
+    """
+    Description:
+        Sets the master seed and resets every stream, so they restart from the new seed.
+    Parameters:
+        value (int): Master seed, picked at random if None.
+    Returns:
+        int: The master seed in use.
+    """
+    global master_seed
+    with lock:
+        master_seed = value if value is not None else int.from_bytes(os.urandom(8), "little")
+        streams.clear()
+        generators.clear()
+        spawned.clear()
+    return master_seed
+
+def stream(name: str) -> random.Random:
+    """
+    Description:
+        The named stream, created on first use. Use it like the random module: rng.stream("cards").shuffle(deck).
+    Parameters:
+        name (str): Subsystem name.
+    Returns:
+        random.Random: The stream.
+    """
+    r = streams.get(name)
+    if r is None:
+        with lock:
+            r = streams.setdefault(name, random.Random(derive(name)))
+    return r
+
+def generator(name: str):
+    """
+    Description:
+        Named NumPy stream (PCG64), for batch users like the simulator. Seeded the same way as stream().
+    Parameters:
+        name (str): Subsystem name. Separate from the stream() names.
+    Returns:
+        numpy.random.Generator: The stream.
+    """
+    import numpy as np # Only the batch users need NumPy
+    g = generators.get(name)
+    if g is None:
+        with lock:
+            g = generators.setdefault(name, np.random.Generator(np.random.PCG64(derive("numpy:" + name))))
+    return g
+
+def spawn(prefix: str) -> random.Random:
+    """
+    Description:
+        A new private generator, e.g. one per game. The nth spawn of a prefix is the same for a given master seed.
+    Parameters:
+        prefix (str): What the generators are for, e.g. "game".
+    Returns:
+        random.Random: Generator owned by the caller, not kept in the stream table.
+    """
+    with lock:
+        n = spawned.get(prefix, 0)
+        spawned[prefix] = n + 1
+    return random.Random(derive(f"{prefix}#{n}"))
+
+def pack_random(r: random.Random) -> bytes:
+    """
+    State of a random.Random as bytes, see unpack_random\n
+    """
+    version, state, gauss = r.getstate()
+    return MT_STATE.pack(*state, gauss is not None, gauss or 0.0)
+
+def unpack_random(r: random.Random, data: bytes, offset: int = 0) -> None:
+    """
+    Restores a random.Random's state from pack_random's output\n
+    """
+    state = MT_STATE.unpack_from(data, offset)
+    r.setstate((3, tuple(state[:625]), state[626] if state[625] else None))
+
+def getstate() -> bytes:
+    """
+    Description:
+        Packs the master seed and the state of every stream, for snapshots and save files.
+    Returns:
+        bytes: State, see setstate.
+    """
+    with lock:
+        counts = list(spawned.items())
+        named = list(streams.items())
+        batch = list(generators.items())
+    out = bytearray(STREAMS_HEADER.pack(master_seed, len(counts), len(named), len(batch)))
+    for prefix, n in counts:
+        out += bytes((len(prefix),)) + prefix.encode() + SPAWN_COUNT.pack(n)
+    for name, r in named:
+        out += bytes((len(name),)) + name.encode() + pack_random(r)
+    for name, g in batch:
+        state = g.bit_generator.state
+        pcg = state["state"]
+        out += bytes((len(name),)) + name.encode()
+        out += PCG_STATE.pack(pcg["state"] >> 64, pcg["state"] & (2**64 - 1), pcg["inc"] >> 64, pcg["inc"] & (2**64 - 1),
+                              state["has_uint32"], state["uinteger"])
+    return bytes(out)
+
+def setstate(data: bytes) -> None:
+    """
+    Description:
+        Restores the master seed and every stream from getstate's output. Streams not in it restart from their seed.
+    Parameters:
+        data (bytes): State from getstate.
+    Returns:
+        None
+    """
+    value, prefixes, named, batch = STREAMS_HEADER.unpack_from(data)
+    seed(value)
+    offset = STREAMS_HEADER.size
+    for _ in range(prefixes):
+        length = data[offset]
+        prefix = data[offset + 1:offset + 1 + length].decode()
+        offset += 1 + length
+        spawned[prefix] = SPAWN_COUNT.unpack_from(data, offset)[0]
+        offset += SPAWN_COUNT.size
+    for _ in range(named):
+        length = data[offset]
+        name = data[offset + 1:offset + 1 + length].decode()
+        offset += 1 + length
+        unpack_random(stream(name), data, offset)
+        offset += MT_STATE.size
+    for _ in range(batch):
+        length = data[offset]
+        name = data[offset + 1:offset + 1 + length].decode()
+        offset += 1 + length
+        state_high, state_low, inc_high, inc_low, has_uint32, uinteger = PCG_STATE.unpack_from(data, offset)
+        offset += PCG_STATE.size
+        g = generator(name)
+        g.bit_generator.state = {"bit_generator": "PCG64", "state": {"state": state_high << 64 | state_low, "inc": inc_high << 64 | inc_low},
+                                 "has_uint32": has_uint32, "uinteger": uinteger}
+
+seed(int(os.environ["TM_SEED"]) if os.environ.get("TM_SEED") else None)
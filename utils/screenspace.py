@@ -14,6 +14,7 @@ import re
 import keyboard
 import time
 import textwrap
+import unicodedata
 
 # Each quadrant is half the width and height of the screen 
 global rows, cols
@@ -116,9 +117,9 @@ class Terminal:
 
         self.padded_data = padding
 
-        # These lines are taking any additional string fragments that use "set_cursor_string()" from 
-        # style.py and update the x,y coordinates to the current quadrant.
-        self.data = self.translate_coords(data)
+        # The payload is kept as sent. display() places its compiled draw ops into this quadrant,
+        # so "set_cursor_string()" coordinates are offset without rewriting the string.
+        self.data = data
         self.display()
     
     def check_new_data(self, new_data: str):
@@ -144,19 +145,11 @@ class Terminal:
         """
         print(COLORS.RESET, end='') # Reset color before printing
         if self.data and not callable(self.data):
-            if self.data:
-                line_list = self.data.split('\n')
-                if len(line_list) > rows and self.padded_data:
-                    line_list = line_list[:rows] # Truncate if necessary bc someone might send a long string
-                for i in range(len(line_list)):
-                    set_cursor(self.x,self.y+i)
-                    if self.padded_data: 
-                        line_list[i] = line_list[i] + " " * (cols - len(line_list[i])) # Pad with spaces if necessary
-
-                    print(line_list[i][:cols] if len(line_list[i]) > cols and self.padded_data else line_list[i]) # Truncate if necessary bc someone might send a long string
-                for i in range(len(line_list), rows):
-                    set_cursor(self.x,self.y+i)
-                    print(" " * cols)
+            ops, line_count = compile_payload(self.data, self.padded_data)
+            out = [blit(ops, self.x, self.y)]
+            for i in range(line_count, rows):
+                out.append(f"\033[{self.y+i};{self.x}H" + " " * cols)
+            print("".join(out))
         elif callable(self.data):
             self.data()
         else:
@@ -174,9 +167,15 @@ class Terminal:
         set_cursor(0,INPUTLINE)
     
     def translate_coords(self, data) -> str:
-        pattern = r'\033\[(\d+);(\d+)H'
-        data = re.sub(pattern, lambda m: replace_sequence(m, self.x, self.y), data)
-        return data
+        """
+        Description:
+            Places a payload into this quadrant without drawing it, for modules that write to stdout themselves.
+        Parameters:
+            data (str): The payload, using "set_cursor_string()" coordinates relative to the quadrant.
+        Returns:
+            str: The payload with every line and cursor sequence offset into the quadrant.
+        """
+        return blit(compile_payload(data, False)[0], self.x, self.y)
 
     def clear(self):
         """Prints a blank screen in the terminal."""
@@ -322,21 +321,245 @@ def notification(message: str, n: int, color: str, custom_x: int, custom_y: int)
     writeto += p
     return writeto + set_cursor_str(0, INPUTLINE)
 
-def replace_sequence(match, x, y):
+CURSOR_SEQUENCE = re.compile(r'\033\[(\d+);(\d+)H')
+SGR_SEQUENCE = re.compile(r'\033\[([0-9;]*)m')
+COMPILED_CACHE_SIZE = 128
+compiled_payloads = {} # (payload, padded) -> (draw ops, line count). Shared by every quadrant, since ops carry no offset.
+
+def compile_payload(data: str, padded: bool) -> tuple:
+    """
+    Description:
+        Parses a module payload once into draw ops, so placing it in a quadrant is only an offset.
+        Each line starts at its own row, and every "set_cursor_str()" sequence starts a new op.
+        Results are cached on the payload, so repeated frames (menus, art) are never parsed twice.
+    Parameters:
+        data (str): The payload, lines separated by newlines.
+        padded (bool): Pad (and truncate) each line to the quadrant width, and the payload to its height.
+    Returns:
+        tuple: (ops, line_count). Each op is (row, col, text, attrs) relative to the quadrant, where attrs 
+            are the color sequences in effect when the op starts, so an op can be drawn on its own.
+    """
+    key = (data, padded)
+    compiled = compiled_payloads.get(key)
+    if compiled is not None:
+        return compiled
+    ops = []
+    sgr = ""
+    lines = data.split('\n')
+    if len(lines) > rows and padded:
+        lines = lines[:rows] # Truncate if necessary bc someone might send a long string
+    for i, line in enumerate(lines):
+        if padded:
+            line = (line + " " * (cols - len(line)))[:cols]
+        parts = CURSOR_SEQUENCE.split(line) # [text, row, col, text, row, col, text, ...]
+        row, col = i, 0
+        for j in range(0, len(parts), 3):
+            if j:
+                row, col = int(parts[j-2]), int(parts[j-1])
+            text = parts[j]
+            if text:
+                ops.append((row, col, text, sgr))
+                if '\033[' in text:
+                    for m in SGR_SEQUENCE.finditer(text):
+                        sgr = "" if m.group(1) in ("", "0") else sgr + m.group(0)
+    compiled = (ops, len(lines))
+    if len(compiled_payloads) >= COMPILED_CACHE_SIZE:
+        compiled_payloads.clear()
+    compiled_payloads[key] = compiled
+    return compiled
+
+def blit(ops: list, x: int, y: int) -> str:
+    """
+    Description:
+        Draws compiled ops at a quadrant's top left corner.
+    Parameters:
+        ops (list): Draw ops from compile_payload().
+        x (int), y (int): Offset to apply to every op.
+    Returns:
+        str: The printable payload.
+    """
+    return "".join([f"\033[{row + y};{col + x}H{text}" for row, col, text, _ in ops])
+
+# Matches one CSI escape (params, command), any other escape, a control character, or a run of plain text.
+ANSI_TOKEN = re.compile(r'\033\[([0-9;?]*)([@-~])|(\033.?)|([\n\r\t\b\f\v\a])|([^\033\n\r\t\b\f\v\a]+)')
+CURSOR_NEUTRAL_CSI = "JKhlt" # Erase, mode and window commands, which do not move the cursor
+ANSI_MAX_COL = 200 # Widest screen we draw (Banker). Text past this wraps, so the cursor is no longer known.
+ansi_stats = {"calls": 0, "bytes_in": 0, "bytes_out": 0} # Running totals for every optimize_ansi() call
+
+class AnsiOptimizer:
+    """
+    Rewrites ANSI output so it draws the same thing with fewer bytes.
+
+    Tracks the cursor and the SGR (color) state as the output would leave them. Cursor moves and 
+    color changes are held back until text is actually printed, so runs of moves collapse into one, 
+    moves to where the cursor already is and colors that are already set are dropped, and each move 
+    is written as whichever of an absolute or relative sequence is shorter.
+
+    Only absolute cursor positions (ESC[row;colH) and relative moves are ever emitted, so the result 
+    can still be offset into a quadrant by Terminal.translate_coords.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the tracked state, e.g. after something else has written to the screen."""
+        self.cursor = None # (row, col) the terminal cursor is at, None if unknown
+        self.sgr = None # (fg, bg, attrs) the terminal is drawing with, None if unknown
+        self.want_cursor = None
+        self.want_sgr = None
+
+    def optimize(self, data: str) -> str:
+        """
+        Parameters:
+            data (str): ANSI output, as it would be printed.
+        Returns:
+            str: Equivalent output without redundant escape sequences.
+        """
+        out = []
+        for m in ANSI_TOKEN.finditer(data):
+            params, command, other, control, text = m.groups()
+            if text is not None:
+                self.flush(out)
+                out.append(text)
+                if self.cursor is not None:
+                    width = len(text) if text.isascii() else sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in text)
+                    col = self.cursor[1] + width
+                    self.cursor = (self.cursor[0], col) if col <= ANSI_MAX_COL else None
+                self.want_cursor = self.cursor
+            elif (command == "H" or command == "f") and "?" not in params:
+                row, _, col = params.partition(";")
+                self.want_cursor = (max(int(row or 1), 1), max(int(col or 1), 1))
+            elif command == "m" and "?" not in params:
+                base = self.want_sgr
+                if base is None and params.split(";")[0] in ("", "0"): # A reset makes the state known again
+                    base = (None, None, frozenset())
+                wanted = parse_sgr(params, base) if base is not None else None
+                if wanted is None: # Attribute we do not model, keep it verbatim and stop tracking colors
+                    self.pass_through(out, m.group(0), True)
+                    self.sgr = None
+                self.want_sgr = wanted
+            elif command is not None and command in "ABCD" and self.want_cursor is not None and "?" not in params:
+                n = max(int(params or 1), 1)
+                row, col = self.want_cursor
+                self.want_cursor = {"A": (max(row - n, 1), col), "B": (row + n, col), 
+                                    "C": (row, col + n), "D": (row, max(col - n, 1))}[command]
+            elif command is not None:
+                self.pass_through(out, m.group(0), command in CURSOR_NEUTRAL_CSI)
+            else: # Newlines and other control characters. Terminal.display places each line itself, so the column is unknown.
+                self.pass_through(out, other if other is not None else control)
+        self.flush(out)
+        return "".join(out)
+
+    def pass_through(self, out: list, sequence: str, keeps_cursor: bool = False) -> None:
+        """Emit a sequence the optimizer does not rewrite, with the state it expects."""
+        self.flush(out)
+        out.append(sequence)
+        if not keeps_cursor:
+            self.cursor = None
+            self.want_cursor = None
+
+    def flush(self, out: list) -> None:
+        """Emit the pending color change and cursor move, if they change anything."""
+        if self.want_sgr is not None and self.want_sgr != self.sgr:
+            out.append(sgr_diff(self.sgr, self.want_sgr))
+            self.sgr = self.want_sgr
+        if self.want_cursor is not None and self.want_cursor != self.cursor:
+            out.append(cursor_move(self.cursor, self.want_cursor))
+            self.cursor = self.want_cursor
+
+def parse_sgr(params: str, state: tuple) -> tuple:
+    """
+    Applies an SGR parameter string to a (fg, bg, attrs) state. Returns None for parameters it does not model.
+    """
+    fg, bg, attrs = state
+    codes = params.split(";") if params else ["0"]
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        if code in ("", "0"):
+            fg, bg, attrs = None, None, frozenset()
+        elif code in ("38", "48"):
+            kind = codes[i + 1] if i + 1 < len(codes) else ""
+            length = 2 if kind == "5" else 4 if kind == "2" else 0
+            if length == 0 or i + length >= len(codes):
+                return None
+            color = code + ";" + ";".join(codes[i + 1:i + length + 1])
+            if code == "38":
+                fg = color
+            else:
+                bg = color
+            i += length
+        elif code == "39":
+            fg = None
+        elif code == "49":
+            bg = None
+        elif code.isdigit() and (30 <= int(code) <= 37 or 90 <= int(code) <= 97):
+            fg = code
+        elif code.isdigit() and (40 <= int(code) <= 47 or 100 <= int(code) <= 107):
+            bg = code
+        elif code.isdigit() and 1 <= int(code) <= 9:
+            attrs = attrs | {code}
+        elif code == "22":
+            attrs = attrs - {"1", "2"}
+        elif code.isdigit() and 23 <= int(code) <= 29:
+            attrs = attrs - {str(int(code) - 20)}
+        else:
+            return None
+        i += 1
+    return (fg, bg, frozenset(attrs))
+
+def sgr_diff(current: tuple, wanted: tuple) -> str:
+    """
+    Shortest SGR sequence taking the terminal from the current (fg, bg, attrs) state to the wanted one.
+    """
+    fg, bg, attrs = wanted
+    if current is None or not current[2] <= attrs or (current[0] is not None and fg is None) or (current[1] is not None and bg is None):
+        codes = ["0"] + sorted(attrs) + [c for c in (fg, bg) if c is not None] # Something has to be switched off, so start from a reset
+    else:
+        codes = sorted(attrs - current[2]) + [c for c, old in ((fg, current[0]), (bg, current[1])) if c != old]
+    return "\033[" + ";".join(codes) + "m"
+
+def cursor_move(current: tuple, wanted: tuple) -> str:
+    """
+    Shortest sequence moving the cursor from current to wanted (row, col). Current may be None (unknown).
+    """
+    row, col = wanted
+    best = f"\033[{row};{col}H"
+    if current is None:
+        return best
+    if current[0] == row:
+        n = col - current[1]
+        candidate = f"\033[{abs(n) if abs(n) != 1 else ''}{'C' if n > 0 else 'D'}"
+    elif current[1] == col:
+        n = row - current[0]
+        candidate = f"\033[{abs(n) if abs(n) != 1 else ''}{'B' if n > 0 else 'A'}"
+    else:
+        return best
+    return candidate if len(candidate) < len(best) else best
+
+def optimize_ansi(data: str) -> str:
+    """
+    Strips redundant escape sequences from a standalone piece of output (a Banker payload, or a local 
+    terminal write), assuming nothing about the cursor or colors beforehand. Updates ansi_stats.
+
+    Parameters:
+        data (str): ANSI output.
+    Returns:
+        str: Equivalent, usually much shorter, output.
+    """
+    optimized = AnsiOptimizer().optimize(data)
+    ansi_stats["calls"] += 1
+    ansi_stats["bytes_in"] += len(data.encode('utf-8'))
+    ansi_stats["bytes_out"] += len(optimized.encode('utf-8'))
+    return optimized
+
+def ansi_savings() -> float:
     """
-    Replaces the x and y coordinates in the matched string with the new x and y coordinates.
-    Useful when updating the cursor position in a string, allowing for set_cursor_str() to 
-    be used in any quadrant.
+    Returns the fraction of bytes (0.0 - 1.0) optimize_ansi() has saved so far.
     """
-    # Extract the number N from the matched string
-    nx = int(match.group(2))
-    ny = int(match.group(1))
-
-    # Calculate the new x and y coordinates
-    new_x = nx + x
-    new_y = ny + y
-    # Return the new sequence
-    return f"\033[{new_y};{new_x}H"
+    if ansi_stats["bytes_in"] == 0:
+        return 0.0
+    return 1 - ansi_stats["bytes_out"] / ansi_stats["bytes_in"]
 
 def update_terminal(n: int, o: int): # TODO not working at the moment
     """
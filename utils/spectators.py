@@ -0,0 +1,201 @@
+import collections
+import select
+import socket
+import threading
+import utils.networking as net
+
+MAX_SPECTATORS = 500 # Per Banker. select() can't watch many more sockets on every platform.
+MAX_BACKLOG = 1 << 20 # Bytes queued for one spectator before they are dropped back to a full frame
+WELCOME = "Spectating. Waiting for the game to start..."
+
+class Spectator:
+    """One read-only connection and the messages waiting to be written to it."""
+    def __init__(self, sock: socket.socket, address: tuple) -> None:
+        self.socket = sock
+        self.address = address
+        self.outbox = collections.deque() # Encoded messages, shared with the other spectators
+        self.offset = 0 # Bytes of outbox[0] already written
+        self.queued = 0 # Bytes waiting in outbox
+        self.stale = True # Needs a full frame: just joined, or fell too far behind to follow the changes
+
+class SpectatorHub:
+    """
+    Fans the board out to read-only spectators. Spectators connect to their own port, from before the game
+    starts (they are shown WELCOME until it does), and are only ever written to.
+
+    After every game change update() is called on the game actor. It renders what changed on the board
+    (history and leaderboard included) once, encodes it once and queues the same bytes for every spectator.
+    One thread writes the queues out with non-blocking sockets, so a slow spectator never holds up the game
+    or the other spectators. A spectator whose queue grows past MAX_BACKLOG has it dropped and is sent a full
+    frame once they have caught up, then the changes again.
+    """
+    def __init__(self, request_update = None, log = None, backlog: int = MAX_BACKLOG) -> None:
+        """
+        Parameters:
+            request_update (function): Asks for update() to be called soon, on the game actor. Called when
+                a spectator needs a full frame. Optional.
+            log (function): Takes a message, for the Banker's output. Optional.
+            backlog (int): Bytes queued per spectator before they are dropped back to a full frame.
+        """
+        self.request_update = request_update or (lambda: None)
+        self.log = log or (lambda message: None)
+        self.backlog = backlog
+        self.lock = threading.Lock()
+        self.spectators = []
+        self.version = None # Game state version of the last changes sent
+        self.seen = {} # What the last changes sent left on screen, see monopoly.get_changes
+        self.listener = None
+        self.waker, self.wake_signal = socket.socketpair() # Wakes the writer thread when there is something to send
+        self.waker.setblocking(False)
+        self.wake_signal.setblocking(False)
+        self.thread = None
+        self.frames = 0 # Updates encoded
+        self.sent = 0 # Bytes written
+        self.resyncs = 0 # Times a spectator fell behind and was sent a full frame
+
+    def start(self, host: str, port: int) -> None:
+        """Starts listening for spectators, and the writer thread."""
+        if self.thread is None:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listener.bind((host, port))
+            self.listener.listen()
+            self.thread = threading.Thread(target=self.run, daemon=True, name="SpectatorHub")
+            self.thread.start()
+            self.log(f"Spectators can watch at port {port}.")
+
+    def encode(self, text: str) -> bytes:
+        """Returns: bytes: One message in the networking format, ready to be written to any number of spectators."""
+        # receive_message strips whitespace, which would lose a blanked row at the end. The reset ends it on a sequence.
+        return b"".join(net.format_message("SPEC:" + text + "\033[0m"))
+
+    def update(self, version: int, changes, frame) -> None:
+        """
+        Sends spectators the latest board. Call on the game actor after every change.
+
+        Parameters:
+            version (int): Game state version. Nothing is rendered unless it changed or someone needs a full frame.
+            changes (function): Takes the seen dict, returns what changed on the board since (see monopoly.get_changes).
+            frame (function): Returns the whole board.
+        """
+        with self.lock:
+            if not self.spectators:
+                return
+            following = [s for s in self.spectators if not s.stale]
+            joining = [s for s in self.spectators if s.stale and not s.outbox] # A backlog has to clear first
+        if version == self.version and not joining:
+            return
+        diff = changes(self.seen) if version != self.version else "" # Keeps seen in step even with nobody following yet
+        self.version = version
+        diff = self.encode(diff) if diff and following else None
+        full = self.encode(frame()) if joining else None
+        with self.lock:
+            self.frames += (diff is not None) + (full is not None)
+            for spectator in following:
+                if diff is not None and spectator in self.spectators:
+                    self.queue(spectator, diff)
+            for spectator in joining:
+                if spectator in self.spectators:
+                    self.queue(spectator, full)
+                    spectator.stale = False
+        self.wake()
+
+    def queue(self, spectator: Spectator, data: bytes) -> None:
+        """Queues a message for a spectator, or drops them back to a full frame if they are too far behind. Lock held."""
+        if spectator.queued + len(data) > self.backlog and spectator.outbox:
+            while len(spectator.outbox) > (1 if spectator.offset else 0): # Keep a half written message, or the stream breaks
+                spectator.queued -= len(spectator.outbox.pop())
+            spectator.stale = True
+            self.resyncs += 1
+            return
+        spectator.outbox.append(data)
+        spectator.queued += len(data)
+
+    def wake(self) -> None:
+        """Wakes the writer thread."""
+        try:
+            self.wake_signal.send(b"\0")
+        except (BlockingIOError, OSError): # Already awake with a full buffer of wake-ups
+            pass
+
+    def stats(self) -> dict:
+        """Returns: dict: spectators, frames (updates encoded), sent (bytes), resyncs and queued (bytes)."""
+        with self.lock:
+            return {"spectators": len(self.spectators), "frames": self.frames, "sent": self.sent, "resyncs": self.resyncs,
+                    "queued": sum(s.queued for s in self.spectators)}
+
+    def run(self) -> None:
+        """Writer loop: accepts spectators, writes their queues out and notices when they leave."""
+        while True:
+            with self.lock:
+                sockets = {s.socket: s for s in self.spectators}
+                writing = [s.socket for s in self.spectators if s.outbox]
+            readable, writable, _ = select.select([self.listener, self.waker] + list(sockets), writing, [])
+            for sock in readable:
+                if sock is self.listener:
+                    self.accept()
+                elif sock is self.waker:
+                    try:
+                        while self.waker.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    try:
+                        if not sock.recv(4096): # Spectators never send anything, so this is them leaving
+                            self.drop(sockets[sock])
+                    except (BlockingIOError, InterruptedError):
+                        pass
+                    except OSError:
+                        self.drop(sockets[sock])
+            for sock in writable:
+                self.write(sockets[sock])
+
+    def accept(self) -> None:
+        """Takes a new spectator, who gets WELCOME now and the whole board with the next update."""
+        sock, address = self.listener.accept()
+        with self.lock:
+            if len(self.spectators) >= MAX_SPECTATORS:
+                sock.close()
+                return
+            sock.setblocking(False)
+            spectator = Spectator(sock, address)
+            spectator.outbox.append(self.encode(WELCOME))
+            spectator.queued = len(spectator.outbox[0])
+            self.spectators.append(spectator)
+        self.log(f"Spectator joined from {address[0]} ({len(self.spectators)} watching).")
+        self.request_update()
+
+    def write(self, spectator: Spectator) -> None:
+        """Writes as much of a spectator's queue as their connection takes without blocking."""
+        caught_up = False
+        with self.lock:
+            try:
+                while spectator.outbox:
+                    head = spectator.outbox[0]
+                    written = spectator.socket.send(memoryview(head)[spectator.offset:])
+                    self.sent += written
+                    spectator.offset += written
+                    if spectator.offset < len(head):
+                        break
+                    spectator.outbox.popleft()
+                    spectator.queued -= len(head)
+                    spectator.offset = 0
+                caught_up = spectator.stale and not spectator.outbox
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError:
+                caught_up = None
+        if caught_up is None:
+            self.drop(spectator)
+        elif caught_up:
+            self.request_update() # Behind spectator has caught up, send them a full frame
+
+    def drop(self, spectator: Spectator) -> None:
+        """Forgets a spectator who left."""
+        with self.lock:
+            if spectator not in self.spectators:
+                return
+            self.spectators.remove(spectator)
+        spectator.socket.close()
+        self.log(f"Spectator at {spectator.address[0]} left ({len(self.spectators)} watching).")
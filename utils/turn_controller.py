@@ -0,0 +1,185 @@
+import math
+import threading
+import time
+
+TICK = 0.1 # Timer wheel resolution, in seconds
+SLOTS = 512 # Timer wheel size. Timers further out than SLOTS * TICK go around the wheel more than once.
+TURN_TIMEOUT = 180.0 # Seconds a player has to finish their turn before it is skipped, 0 for no limit
+DISCONNECT_GRACE = 2.0 # Seconds before a disconnected player's turn is skipped
+HANDOFF_BUDGET = 0.05 # Seconds a hand-off should take. Slower ones are counted in stats()["over_budget"]
+
+class TimerWheel:
+    """
+    Hashed timer wheel: timers are kept in the slot of the tick they expire on, so scheduling and
+    cancelling are O(1) and each tick only looks at one slot. Not thread-safe on its own, the
+    TurnController calls it under its lock.
+    """
+    def __init__(self, tick: float = TICK, slots: int = SLOTS) -> None:
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.position = 0 # Slot of the current tick
+        self.last_tick = time.monotonic() # When the current tick started
+        self.pending = 0 # Timers scheduled and not yet fired or cancelled
+
+    def schedule(self, delay: float, callback) -> list:
+        """
+        Calls callback (from advance) once delay seconds have passed, rounded up to the next tick.
+
+        Returns:
+            list: Timer handle, for cancel().
+        """
+        now = time.monotonic()
+        if not self.pending: # Idle wheel: restart the ticks from now rather than walk the idle ones
+            self.last_tick = now
+        ticks = max(1, math.ceil((now + delay - self.last_tick) / self.tick))
+        timer = [(ticks - 1) // len(self.slots), callback, True] # Rounds left, callback, active
+        self.slots[(self.position + ticks) % len(self.slots)].append(timer)
+        self.pending += 1
+        return timer
+
+    def cancel(self, timer: list) -> None:
+        """Stops a timer from firing. Cancelled timers are dropped when their slot comes round."""
+        if timer is not None and timer[2]:
+            timer[2] = False
+            self.pending -= 1
+
+    def advance(self, now: float = None) -> list:
+        """
+        Moves the wheel up to now.
+
+        Returns:
+            list: Callbacks of the timers that expired, for the caller to run.
+        """
+        now = time.monotonic() if now is None else now
+        due = []
+        while self.last_tick + self.tick <= now:
+            self.last_tick += self.tick
+            self.position = (self.position + 1) % len(self.slots)
+            slot = self.slots[self.position]
+            if not slot:
+                continue
+            keep = []
+            for timer in slot:
+                if not timer[2]:
+                    continue
+                if timer[0] == 0:
+                    timer[2] = False
+                    self.pending -= 1
+                    due.append(timer[1])
+                else:
+                    timer[0] -= 1
+                    keep.append(timer)
+            self.slots[self.position] = keep
+            if not self.pending:
+                break
+        return due
+
+    def next_tick(self) -> float:
+        """Returns: float: When the next tick is due, or None if no timer is pending."""
+        return self.last_tick + self.tick if self.pending else None
+
+class TurnController:
+    """
+    Hands the turn to the next player as soon as it changes, instead of polling for it.
+
+    Whatever changes the turn calls turn_changed(turn). The controller thread wakes on that
+    immediately and calls hand_off(turn), which notifies the player (or plays a bot's turn).
+    Every turn gets a timeout on a timer wheel. When it fires and the player still holds the turn,
+    skip(turn) is called. A hand_off that raises (the player disconnected) schedules a skip after
+    DISCONNECT_GRACE.
+
+    Hand-off latency (turn_changed to hand_off being called) is recorded, see stats().
+    """
+    def __init__(self, hand_off, skip, timeout: float = TURN_TIMEOUT, log = None) -> None:
+        """
+        Parameters:
+            hand_off (function): Takes the new turn index and notifies that player. Raises if they are gone.
+            skip (function): Takes a turn index and skips that turn.
+            timeout (float): Seconds per turn, 0 for no limit.
+            log (function): Takes a message, for timeouts and disconnects. Optional.
+        """
+        self.hand_off = hand_off
+        self.skip = skip
+        self.timeout = timeout
+        self.log = log or (lambda message: None)
+        self.condition = threading.Condition()
+        self.wheel = TimerWheel()
+        self.changes = [] # (turn, time of change) waiting to be handed off
+        self.turn = None # Turn last handed off
+        self.timer = None # Timeout of the current turn
+        self.thread = None
+        self.latencies = [] # Recent hand-off latencies, in seconds
+        self.handoffs = 0
+        self.over_budget = 0
+        self.timeouts = 0
+        self.disconnects = 0
+
+    def start(self, turn: int) -> None:
+        """Starts the controller thread and hands off the first turn."""
+        self.turn_changed(turn)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def turn_changed(self, turn: int) -> None:
+        """Signals a new turn. Cheap and safe to call from any thread, including from inside hand_off."""
+        with self.condition:
+            self.changes.append((turn, time.monotonic()))
+            self.condition.notify()
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: handoffs, timeouts, disconnects, over_budget, and hand-off latency mean_ms and max_ms.
+        """
+        with self.condition:
+            recent = self.latencies or [0.0]
+            return {"handoffs": self.handoffs, "timeouts": self.timeouts, "disconnects": self.disconnects,
+                    "over_budget": self.over_budget, "mean_ms": sum(recent) / len(recent) * 1000, "max_ms": max(recent) * 1000}
+
+    def run(self) -> None:
+        """Controller loop. Sleeps until the turn changes or a timer is due."""
+        while True:
+            with self.condition:
+                while not self.changes:
+                    next_tick = self.wheel.next_tick()
+                    if next_tick is not None and next_tick <= time.monotonic():
+                        break
+                    self.condition.wait(None if next_tick is None else next_tick - time.monotonic())
+                changes, self.changes = self.changes, []
+                due = self.wheel.advance()
+            for callback in due:
+                callback()
+            if changes:
+                turn, changed_at = changes[-1] # Only the latest turn needs handing off
+                self.begin_turn(turn, changed_at)
+
+    def begin_turn(self, turn: int, changed_at: float) -> None:
+        """Hands a turn off and arms its timeout. Runs on the controller thread, without the lock held."""
+        with self.condition:
+            self.wheel.cancel(self.timer)
+            self.turn = turn
+            self.timer = self.wheel.schedule(self.timeout, lambda: self.expire(turn, "timed out")) if self.timeout else None
+            latency = time.monotonic() - changed_at
+            self.handoffs += 1
+            self.over_budget += latency > HANDOFF_BUDGET
+            self.latencies.append(latency)
+            del self.latencies[:-100]
+        if latency > HANDOFF_BUDGET:
+            self.log(f"Player turn: {turn}. Hand-off took {latency * 1000:.0f}ms.")
+        try:
+            self.hand_off(turn)
+        except Exception:
+            with self.condition:
+                self.disconnects += 1
+                self.wheel.cancel(self.timer)
+                self.timer = self.wheel.schedule(DISCONNECT_GRACE, lambda: self.expire(turn, "disconnected"))
+
+    def expire(self, turn: int, reason: str) -> None:
+        """Timer callback: skips the turn if that player still has it."""
+        with self.condition:
+            if self.turn != turn or self.changes: # The turn moved on in the meantime
+                return
+            self.timeouts += reason == "timed out"
+        self.log(f"Player turn: {turn}. {reason.capitalize()}, skipping.")
+        self.skip(turn)
@@ -23,8 +23,11 @@ class Client:
         self.can_roll = True
         self.num_rolls = 0
         self.terminal_statuses = ["ACTIVE", "ACTIVE", "ACTIVE", "ACTIVE"]
-        self.trades = [{"name":"", "properties":[]}, {"name":"", "properties":[]}, {"name":"", "properties":[]}] # List of trades for this player
+        self.trades = [] # modules_directory.trading.Trade offers this player made, still pending
+        self.requests = [] # Trade offers made to this player, still pending (the same objects as in the offerer's trades)
+        self.loans = [] # modules_directory.loan.Loan objects taken out by this player
         self.PlayerObject = None # Player object for this client
+        self.bot = None # monopoly_directory.bots.Bot playing this seat, None for people
 
 
 # Written by @https://github.com/SerpentBTW